@@ -110,9 +110,9 @@ class EssayGrader:
         return lambda v: self._clip_band(slope * float(v) + intercept)
 
     @torch.no_grad()
-    def _forward_logits(self, text: str) -> torch.Tensor:
+    def _forward_logits_batch(self, texts: list[str]) -> torch.Tensor:
         encoded = self.tokenizer(
-            text,
+            texts,
             return_tensors="pt",
             truncation=True,
             padding=True,
@@ -122,6 +122,9 @@ class EssayGrader:
         outputs = self.model(**encoded)
         return outputs.logits
 
+    def _forward_logits(self, text: str) -> torch.Tensor:
+        return self._forward_logits_batch([text])
+
     def _decode_regression_band(self, logits: torch.Tensor) -> float:
         val = float(logits.detach().cpu().squeeze())
         return self._clip_band(val * MAX_BAND)
@@ -137,11 +140,7 @@ class EssayGrader:
             return self._decode_ordinal_band(logits)
         return self._decode_regression_band(logits)
 
-    def predict(self, essay: str, question: Optional[str] = None) -> GradeResult:
-        """Predict IELTS overall band for one essay."""
-        text = self._build_input_text(essay, question)
-        logits = self._forward_logits(text)
-
+    def _build_result(self, logits: torch.Tensor, essay: str) -> GradeResult:
         raw_band = self._decode_raw_band(logits)
         calibrated_band = self._calibrate_fn(raw_band)
         predicted_band = self._round_to_half(calibrated_band)
@@ -155,19 +154,41 @@ class EssayGrader:
             word_count=len(essay.split()),
         )
 
+    def predict(self, essay: str, question: Optional[str] = None) -> GradeResult:
+        """Predict IELTS overall band for one essay."""
+        text = self._build_input_text(essay, question)
+        return self._build_result(self._forward_logits(text), essay)
+
     def predict_batch(
         self,
         essays: list[str],
         questions: Optional[list[Optional[str]]] = None,
+        batch_size: int = 16,
     ) -> list[GradeResult]:
-        """Predict IELTS bands for a list of essays."""
+        """Predict IELTS bands for a list of essays (results in input order).
+
+        Essays are sorted by token length and graded *batch_size* at a time,
+        so each forward pass pads essays of similar length.
+        """
         if questions is not None and len(questions) != len(essays):
             raise ValueError("questions length must match essays length")
 
-        out: list[GradeResult] = []
-        for idx, essay in enumerate(essays):
-            q = questions[idx] if questions is not None else None
-            out.append(self.predict(essay=essay, question=q))
+        texts = [
+            self._build_input_text(essay, questions[idx] if questions is not None else None)
+            for idx, essay in enumerate(essays)
+        ]
+        lengths = [
+            len(ids)
+            for ids in self.tokenizer(texts, truncation=True, max_length=self.config.max_length)["input_ids"]
+        ] if texts else []
+        order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+        out: list[Optional[GradeResult]] = [None] * len(essays)
+        for start in range(0, len(order), max(1, batch_size)):
+            batch = order[start:start + batch_size]
+            logits = self._forward_logits_batch([texts[i] for i in batch])
+            for row, i in enumerate(batch):
+                out[i] = self._build_result(logits[row:row + 1], essays[i])
         return out
 
 
@@ -35,16 +35,58 @@ class Settings(BaseSettings):
     AI_MODEL_NAME: str = "gemma-3-27b-it"
     EVALUATOR_MODEL_NAME: str = "gemma-4-31b-it"
     EVALUATOR_LLM_TIMEOUT_S: int = 45
+    EVALUATOR_BATCH_CONCURRENCY: int = 4
+    EVALUATOR_BATCH_MAX_ITEMS: int = 200
     TTS_MODEL_NAME: str = "gemini-3.1-flash-tts"
     TTS_VOICE_NAME: str = "alloy"
     TTS_RESPONSE_FORMAT: str = "mp3"
     STT_MODEL_NAME: str = "whisper-1"
     ESSAY_GRADER_MODEL_PATH: str = ""
+    ESSAY_GRADER_BACKEND: str = "torch"  # torch | torch-int8 | onnx | onnx-int8
+    ESSAY_GRADER_ONNX_PATH: str = ""
+    ESSAY_GRADER_WINDOWED: bool = False
+    ESSAY_WINDOW_STRIDE: int = 128
+    ESSAY_MAX_WINDOWS: int = 8
+    ESSAY_GRADER_THREADS: int = 0  # torch intra-op threads; 0 = cores / WEB_CONCURRENCY
+    ESSAY_GRADER_INTEROP_THREADS: int = 1
+    ESSAY_GRADER_INFERENCE_MODE: bool = True
+    ESSAY_BATCH_MAX_SIZE: int = 16
+    ESSAY_BATCH_WAIT_MS: int = 10
+    ESSAY_BULK_MAX_ITEMS: int = 500
+    ESSAY_GRADE_CACHE_SIZE: int = 2048  # in-process LRU entries; 0 disables the cache
     EMBEDDING_MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_THREADS: int = 0
+    EMBEDDING_QUANTIZE: bool = False
+    EMBEDDING_BATCH_SIZE: int = 32
     CHROMA_PERSIST_DIR: str = "./chroma_db"
     PDF_UPLOAD_DIR: str = "./uploaded_files"
     UPLOAD_CLEANUP_RETENTION_HOURS: int = 24
     UPLOAD_CLEANUP_INTERVAL_MINUTES: int = 60
+    UPLOAD_CACHE_RETENTION_HOURS: int = 168
+    EVAL_ARTIFACT_RETENTION_HOURS: int = 720
+    ESSAY_GRADE_CACHE_RETENTION_HOURS: int = 720
+    DRIVE_TEXT_RETENTION_HOURS: int = 720
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_JOB_TIMEOUT_S: int = 600
+    EXTRACTION_JOB_RETENTION_HOURS: int = 168
+    GOOGLE_HTTP_TIMEOUT_S: float = 30.0
+    GOOGLE_HTTP_MAX_CONNECTIONS: int = 20
+    GOOGLE_HTTP_MAX_CONCURRENCY: int = 10
+    GOOGLE_HTTP_MAX_RETRIES: int = 4
+    GOOGLE_HTTP_BACKOFF_BASE_S: float = 0.5
+    CLASSROOM_PAGE_SIZE: int = 100
+    FULL_SYNC_COURSE_CONCURRENCY: int = 5
+    JOB_WORKER_ENABLED: bool = True
+    JOB_POLL_INTERVAL_S: float = 2.0
+    JOB_LEASE_S: int = 300
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_S: float = 30.0
+    JOB_KIND_CONCURRENCY: str = "study_pack:2"  # kind:max, per process
+    STUDY_PACK_STAGE_CONCURRENCY: int = 4  # study-pack stages running at once, per process
+    WARMUP_MODELS: str = "embedder,essay_grader,text_analysis"  # comma-separated; empty disables
+    WARMUP_BLOCKING: bool = False
+    PRELOAD_MODELS: str = "essay_grader"  # loaded once in the gunicorn master, shared by workers
+    WEB_CONCURRENCY: int = 2  # gunicorn workers; the essay grader splits the cores across them
     AUTO_SUMMARIZE_MATERIALS: bool = True
     AUTO_GENERATE_QUIZZES: bool = True
     CHAT_HISTORY_TTL_HOURS: int = 24
@@ -1,11 +1,12 @@
 # Backend/DB/crud.py
 from passlib.context import CryptContext
 from uuid import uuid4
-from sqlalchemy import func
+from sqlalchemy import delete, func, or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from .schemas import Quiz, QuizQuestion, QuizDocument, Course, UserCourse, User, Comment, Document, OTPVerification
+from .schemas import Quiz, QuizQuestion, QuizDocument, QuizAttempt, Chunk, Summary, SummaryChunk, Course, UserCourse, User, Comment, Document, OTPVerification, UploadArtifact, LectureEvalArtifact, ExtractionJob, EssayGradeCache, CourseSyncWatermark, BackgroundJob, DriveFileText
 from .models import QuizCreate
 from datetime import datetime, timedelta, timezone
 from services.google_token_services import refresh_google_token
@@ -231,6 +232,38 @@ async def link_user_to_course(db: AsyncSession, user_id: int, course_id: int):
         db.add(UserCourse(user_id=user_id, course_id=course_id))
         await db.commit()
 
+async def upsert_courses_for_user(db: AsyncSession, user_id: int, courses: list[tuple[str, str]]) -> list[tuple[Course, bool]]:
+    """Create / rename courses from (classroom_id, title) pairs and link them to the user.
+
+    One query for the existing courses, one for the existing links and a
+    single commit. Returns (course, is_new) in input order.
+    """
+    classroom_ids = [classroom_id for classroom_id, _ in courses]
+    result = await db.execute(select(Course).where(Course.classroom_id.in_(classroom_ids)))
+    existing = {course.classroom_id: course for course in result.scalars().all()}
+
+    upserted = []
+    for classroom_id, title in courses:
+        course = existing.get(classroom_id)
+        if course:
+            course.title = title
+            upserted.append((course, False))
+        else:
+            course = Course(classroom_id=classroom_id, title=title)
+            db.add(course)
+            existing[classroom_id] = course
+            upserted.append((course, True))
+    await db.flush()
+
+    course_ids = {course.id for course, _ in upserted}
+    result = await db.execute(
+        select(UserCourse.course_id).where(UserCourse.user_id == user_id, UserCourse.course_id.in_(course_ids))
+    )
+    linked = set(result.scalars().all())
+    db.add_all(UserCourse(user_id=user_id, course_id=course_id) for course_id in course_ids - linked)
+    await db.commit()
+    return upserted
+
 async def get_user_courses(db: AsyncSession, user_id: int):
     stmt = (
         select(Course)
@@ -251,6 +284,80 @@ async def get_document_by_material_id(db: AsyncSession, classroom_material_id: s
     )
     return result.scalars().first()
 
+async def get_documents_by_material_ids(db: AsyncSession, classroom_material_ids: list[str]) -> dict[str, Document]:
+    """Existing documents for these Google Classroom material IDs (one IN query)."""
+    if not classroom_material_ids:
+        return {}
+    result = await db.execute(
+        select(Document).where(Document.classroom_material_id.in_(classroom_material_ids))
+    )
+    return {doc.classroom_material_id: doc for doc in result.scalars().all()}
+
+async def create_documents_bulk(db: AsyncSession, rows: list[dict]) -> list[Document]:
+    """Insert many documents (create_document keyword dicts) with a single commit.
+
+    Pending changes to documents already in the session are committed too.
+    """
+    docs = [Document(**row) for row in rows]
+    db.add_all(docs)
+    await db.commit()
+    return docs
+
+async def clear_document_study_outputs(db: AsyncSession, doc_ids: list[int]) -> None:
+    """Delete the chunks, summaries and auto-generated quizzes built from these documents' text.
+
+    Auto quizzes that students already attempted are only unlinked so their
+    attempts survive. Nothing is committed: the deletes join the caller's
+    transaction.
+    """
+    if not doc_ids:
+        return
+    chunk_ids = (await db.execute(select(Chunk.id).where(Chunk.doc_id.in_(doc_ids)))).scalars().all()
+    if chunk_ids:
+        summary_ids = (
+            await db.execute(select(SummaryChunk.summary_id).where(SummaryChunk.chunk_id.in_(chunk_ids)))
+        ).scalars().all()
+        await db.execute(delete(SummaryChunk).where(or_(SummaryChunk.summary_id.in_(summary_ids), SummaryChunk.chunk_id.in_(chunk_ids))))
+        await db.execute(delete(Summary).where(Summary.id.in_(summary_ids)))
+        await db.execute(delete(Chunk).where(Chunk.id.in_(chunk_ids)))
+
+    auto_quiz_ids = (
+        await db.execute(
+            select(QuizDocument.quiz_id)
+            .join(Quiz, Quiz.id == QuizDocument.quiz_id)
+            .where(QuizDocument.doc_id.in_(doc_ids), Quiz.created_by.is_(None))
+        )
+    ).scalars().all()
+    if not auto_quiz_ids:
+        return
+    attempted = select(QuizAttempt.quiz_id).where(QuizAttempt.quiz_id.in_(auto_quiz_ids))
+    unattempted_ids = (
+        await db.execute(select(Quiz.id).where(Quiz.id.in_(auto_quiz_ids), Quiz.id.not_in(attempted)))
+    ).scalars().all()
+    await db.execute(delete(QuizDocument).where(QuizDocument.doc_id.in_(doc_ids), QuizDocument.quiz_id.in_(auto_quiz_ids)))
+    if unattempted_ids:
+        await db.execute(delete(QuizDocument).where(QuizDocument.quiz_id.in_(unattempted_ids)))
+        await db.execute(delete(QuizQuestion).where(QuizQuestion.quiz_id.in_(unattempted_ids)))
+        await db.execute(delete(Quiz).where(Quiz.id.in_(unattempted_ids)))
+
+async def get_course_sync_watermarks(db: AsyncSession, course_id: int) -> dict[str, datetime]:
+    result = await db.execute(select(CourseSyncWatermark).where(CourseSyncWatermark.course_id == course_id))
+    return {w.item_type: w.last_update_time for w in result.scalars().all()}
+
+async def set_course_sync_watermark(db: AsyncSession, course_id: int, item_type: str, last_update_time: datetime):
+    result = await db.execute(
+        select(CourseSyncWatermark).where(
+            CourseSyncWatermark.course_id == course_id,
+            CourseSyncWatermark.item_type == item_type,
+        )
+    )
+    watermark = result.scalars().first()
+    if watermark:
+        watermark.last_update_time = last_update_time
+    else:
+        db.add(CourseSyncWatermark(course_id=course_id, item_type=item_type, last_update_time=last_update_time))
+    await db.commit()
+
 async def create_document(
     db: AsyncSession,
     course_id: int,
@@ -286,6 +393,349 @@ async def get_documents_by_course_id(db: AsyncSession, course_id: int):
     return result.scalars().all()
 
 
+# ---------------------------
+# EXTRACTION JOB OPERATIONS
+# ---------------------------
+async def create_extraction_job(db: AsyncSession, document_id: Optional[int], source: str) -> ExtractionJob:
+    job = ExtractionJob(
+        document_id=document_id,
+        source=source,
+        status="running",
+        started_at=datetime.now(timezone.utc),
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+async def finish_extraction_job(
+    db: AsyncSession,
+    job: ExtractionJob,
+    chars: Optional[int] = None,
+    error: Optional[str] = None,
+) -> ExtractionJob:
+    job.status = "failed" if error else "done"
+    job.chars = chars
+    job.error = error[:2000] if error else None
+    job.finished_at = datetime.now(timezone.utc)
+    await db.commit()
+    return job
+
+async def get_latest_extraction_job(db: AsyncSession, document_id: int) -> Optional[ExtractionJob]:
+    result = await db.execute(
+        select(ExtractionJob)
+        .where(ExtractionJob.document_id == document_id)
+        .order_by(ExtractionJob.id.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+async def delete_extraction_jobs_older_than(db: AsyncSession, cutoff: datetime) -> int:
+    result = await db.execute(delete(ExtractionJob).where(ExtractionJob.started_at < cutoff))
+    await db.commit()
+    return result.rowcount or 0
+
+
+# ---------------------------
+# BACKGROUND JOB OPERATIONS
+# ---------------------------
+async def enqueue_background_jobs(
+    db: AsyncSession,
+    kind: str,
+    document_ids: list[int],
+    user_id: Optional[int],
+    priority: int,
+    max_attempts: int,
+) -> list[int]:
+    """Queue one job per document, skipping documents that already have an active job of *kind*.
+
+    Returns the document IDs that were newly queued.
+    """
+    keys = {f"{kind}:{doc_id}": doc_id for doc_id in dict.fromkeys(document_ids)}
+    if not keys:
+        return []
+    result = await db.execute(select(BackgroundJob.dedupe_key).where(BackgroundJob.dedupe_key.in_(list(keys))))
+    active = set(result.scalars().all())
+    fresh = {key: doc_id for key, doc_id in keys.items() if key not in active}
+
+    def _job(key: str, doc_id: int) -> BackgroundJob:
+        return BackgroundJob(
+            kind=kind, document_id=doc_id, user_id=user_id, dedupe_key=key,
+            status="queued", priority=priority, max_attempts=max_attempts,
+            run_after=datetime.now(timezone.utc),
+        )
+
+    db.add_all(_job(key, doc_id) for key, doc_id in fresh.items())
+    try:
+        await db.commit()
+        return list(fresh.values())
+    except IntegrityError:
+        # Another process queued some of these meanwhile: fall back to one by one.
+        await db.rollback()
+    queued = []
+    for key, doc_id in fresh.items():
+        db.add(_job(key, doc_id))
+        try:
+            await db.commit()
+            queued.append(doc_id)
+        except IntegrityError:
+            await db.rollback()
+    return queued
+
+def _lease_expired(now: datetime):
+    return (BackgroundJob.status == "running") & (BackgroundJob.lease_expires_at < now)
+
+async def get_claimable_background_job_ids(db: AsyncSession, kinds: list[str], limit: int) -> list[int]:
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(BackgroundJob.id)
+        .where(
+            BackgroundJob.kind.in_(kinds),
+            or_(
+                (BackgroundJob.status == "queued") & (BackgroundJob.run_after <= now),
+                _lease_expired(now) & (BackgroundJob.attempts < BackgroundJob.max_attempts),
+            ),
+        )
+        .order_by(BackgroundJob.priority.desc(), BackgroundJob.run_after, BackgroundJob.id)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+async def claim_background_job(db: AsyncSession, job_id: int, worker_id: str, lease_s: float) -> Optional[BackgroundJob]:
+    """Atomically lease a queued (or lease-expired) job; None if another worker got it first.
+
+    A lease-expired job is only reclaimed while it has attempts left; see
+    fail_exhausted_background_jobs for the rest.
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(BackgroundJob)
+        .where(
+            BackgroundJob.id == job_id,
+            or_(
+                BackgroundJob.status == "queued",
+                _lease_expired(now) & (BackgroundJob.attempts < BackgroundJob.max_attempts),
+            ),
+        )
+        .values(
+            status="running",
+            leased_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_s),
+            started_at=now,
+            attempts=BackgroundJob.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if result.rowcount != 1:
+        return None
+    job = await db.get(BackgroundJob, job_id, populate_existing=True)
+    return job
+
+async def extend_background_job_lease(db: AsyncSession, job_id: int, worker_id: str, lease_s: float) -> bool:
+    result = await db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job_id, BackgroundJob.leased_by == worker_id, BackgroundJob.status == "running")
+        .values(lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_s))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+async def finish_background_job(
+    db: AsyncSession,
+    job_id: int,
+    worker_id: str,
+    error: Optional[str] = None,
+    retry_after_s: Optional[float] = None,
+    count_attempt: bool = True,
+) -> bool:
+    """Mark a job done, failed, or (with *retry_after_s*) queued again for a later attempt.
+
+    Only applies while *worker_id* still holds the job's lease; returns False
+    if the lease was lost (the job expired and may be running elsewhere).
+    """
+    now = datetime.now(timezone.utc)
+    values = dict(leased_by=None, lease_expires_at=None, error=error[:2000] if error else None)
+    if retry_after_s is not None:
+        values.update(status="queued", run_after=now + timedelta(seconds=retry_after_s))
+        if not count_attempt:
+            values["attempts"] = BackgroundJob.attempts - 1
+    else:
+        values.update(status="failed" if error else "done", dedupe_key=None, finished_at=now)
+    result = await db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job_id, BackgroundJob.leased_by == worker_id, BackgroundJob.status == "running")
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+async def fail_exhausted_background_jobs(db: AsyncSession) -> int:
+    """Fail lease-expired jobs that have no attempts left (their worker died mid-run).
+
+    Returns the number of jobs failed.
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(BackgroundJob)
+        .where(_lease_expired(now), BackgroundJob.attempts >= BackgroundJob.max_attempts)
+        .values(
+            status="failed",
+            error="Lease expired on the final attempt",
+            dedupe_key=None,
+            finished_at=now,
+            leased_by=None,
+            lease_expires_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+async def get_background_jobs_for_documents(db: AsyncSession, document_ids: list[int]) -> list[BackgroundJob]:
+    result = await db.execute(
+        select(BackgroundJob)
+        .where(BackgroundJob.document_id.in_(document_ids))
+        .order_by(BackgroundJob.id.desc())
+    )
+    return list(result.scalars().all())
+
+
+# ---------------------------
+# CACHE ROW TOUCHES
+# ---------------------------
+# Cache tables are purged by last_used_at once it falls outside their
+# retention window, so it only needs refreshing every so often rather than
+# on every hit (which would cost a write per cache hit).
+_TOUCH_EVERY_FRACTION_OF_RETENTION = 0.1
+
+async def _touch_last_used(db: AsyncSession, row, retention_hours: float):
+    now = datetime.now(timezone.utc)
+    last_used = row.last_used_at
+    if last_used is not None and last_used.tzinfo is None:
+        last_used = last_used.replace(tzinfo=timezone.utc)
+    if last_used is None or now - last_used >= timedelta(hours=retention_hours * _TOUCH_EVERY_FRACTION_OF_RETENTION):
+        row.last_used_at = now
+        await db.commit()
+    return row
+
+
+# ---------------------------
+# UPLOAD ARTIFACT OPERATIONS
+# ---------------------------
+async def get_upload_artifact(db: AsyncSession, sha256: str) -> Optional[UploadArtifact]:
+    """Look up a cached one-time upload by the SHA-256 of its bytes."""
+    result = await db.execute(select(UploadArtifact).where(UploadArtifact.sha256 == sha256))
+    return result.scalars().first()
+
+async def create_upload_artifact(
+    db: AsyncSession,
+    sha256: str,
+    size_bytes: int,
+    raw_text: Optional[str],
+    chunks: Optional[list] = None,
+) -> UploadArtifact:
+    artifact = UploadArtifact(
+        sha256=sha256,
+        size_bytes=size_bytes,
+        raw_text=raw_text,
+        chunks=chunks,
+        quizzes={},
+    )
+    db.add(artifact)
+    await db.commit()
+    await db.refresh(artifact)
+    return artifact
+
+async def touch_upload_artifact(db: AsyncSession, artifact: UploadArtifact) -> UploadArtifact:
+    return await _touch_last_used(db, artifact, settings.UPLOAD_CACHE_RETENTION_HOURS)
+
+async def delete_upload_artifacts_older_than(db: AsyncSession, cutoff: datetime) -> int:
+    result = await db.execute(delete(UploadArtifact).where(UploadArtifact.last_used_at < cutoff))
+    await db.commit()
+    return result.rowcount or 0
+
+
+# ---------------------------
+# DRIVE FILE TEXT OPERATIONS
+# ---------------------------
+async def get_drive_file_text(db: AsyncSession, content_key: str) -> Optional[DriveFileText]:
+    """Look up text already extracted from the same Drive content."""
+    result = await db.execute(select(DriveFileText).where(DriveFileText.content_key == content_key))
+    return result.scalars().first()
+
+async def create_drive_file_text(db: AsyncSession, **fields) -> DriveFileText:
+    entry = DriveFileText(**fields)
+    db.add(entry)
+    await db.commit()
+    await db.refresh(entry)
+    return entry
+
+async def touch_drive_file_text(db: AsyncSession, entry: DriveFileText) -> DriveFileText:
+    return await _touch_last_used(db, entry, settings.DRIVE_TEXT_RETENTION_HOURS)
+
+async def delete_drive_file_texts_older_than(db: AsyncSession, cutoff: datetime) -> int:
+    result = await db.execute(delete(DriveFileText).where(DriveFileText.last_used_at < cutoff))
+    await db.commit()
+    return result.rowcount or 0
+
+
+# ---------------------------
+# LECTURE EVALUATION ARTIFACT OPERATIONS
+# ---------------------------
+async def get_lecture_eval_artifact(
+    db: AsyncSession, lecture_hash: str, embedder: str
+) -> Optional[LectureEvalArtifact]:
+    result = await db.execute(
+        select(LectureEvalArtifact).where(
+            LectureEvalArtifact.lecture_hash == lecture_hash,
+            LectureEvalArtifact.embedder == embedder,
+        )
+    )
+    return result.scalars().first()
+
+async def create_lecture_eval_artifact(db: AsyncSession, **fields) -> LectureEvalArtifact:
+    artifact = LectureEvalArtifact(**fields)
+    db.add(artifact)
+    await db.commit()
+    await db.refresh(artifact)
+    return artifact
+
+async def touch_lecture_eval_artifact(db: AsyncSession, artifact: LectureEvalArtifact) -> LectureEvalArtifact:
+    return await _touch_last_used(db, artifact, settings.EVAL_ARTIFACT_RETENTION_HOURS)
+
+async def delete_lecture_eval_artifacts_older_than(db: AsyncSession, cutoff: datetime) -> int:
+    result = await db.execute(delete(LectureEvalArtifact).where(LectureEvalArtifact.last_used_at < cutoff))
+    await db.commit()
+    return result.rowcount or 0
+
+
+# ---------------------------
+# ESSAY GRADE CACHE OPERATIONS
+# ---------------------------
+async def get_essay_grade_cache(db: AsyncSession, cache_key: str) -> Optional[EssayGradeCache]:
+    result = await db.execute(select(EssayGradeCache).where(EssayGradeCache.cache_key == cache_key))
+    return result.scalars().first()
+
+async def create_essay_grade_cache(
+    db: AsyncSession, cache_key: str, model_path: str, result: dict
+) -> EssayGradeCache:
+    entry = EssayGradeCache(cache_key=cache_key, model_path=model_path, result=result)
+    db.add(entry)
+    await db.commit()
+    return entry
+
+async def touch_essay_grade_cache(db: AsyncSession, entry: EssayGradeCache) -> EssayGradeCache:
+    return await _touch_last_used(db, entry, settings.ESSAY_GRADE_CACHE_RETENTION_HOURS)
+
+async def delete_essay_grade_cache_older_than(db: AsyncSession, cutoff: datetime) -> int:
+    result = await db.execute(delete(EssayGradeCache).where(EssayGradeCache.last_used_at < cutoff))
+    await db.commit()
+    return result.rowcount or 0
+
+
 # ---------------------------
 # COMMENT OPERATIONS
 # ---------------------------
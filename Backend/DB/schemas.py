@@ -13,6 +13,7 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     JSON,
+    LargeBinary,
     UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
@@ -104,6 +105,14 @@ class Document(Base):
     
     # ⚡ NEW: Added due_date for assignments (coursework)
     due_date = Column(DateTime(timezone=True), nullable=True)
+
+    # Google Classroom updateTime of the source item; edits newer than this are re-synced
+    source_updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Drive metadata of the file raw_text was extracted from (see drive_download_service)
+    drive_file_id = Column(String(128), index=True, nullable=True)
+    drive_md5_checksum = Column(String(64), nullable=True)
+    drive_modified_time = Column(DateTime(timezone=True), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -118,6 +127,19 @@ class Document(Base):
     class Config:
         from_attributes = True
 
+class CourseSyncWatermark(Base):
+    """Newest Classroom updateTime already synced, per course and item type."""
+    __tablename__ = "course_sync_watermarks"
+    __table_args__ = (
+        UniqueConstraint("course_id", "item_type", name="ux_course_sync_watermark_course_type"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
+    item_type = Column(String(50), nullable=False)  # "material" | "announcement" | "coursework"
+    last_update_time = Column(DateTime(timezone=True), nullable=False)
+    synced_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 # ---------------------------
 # Chat Conversations / Messages
 # ---------------------------
@@ -239,6 +261,118 @@ class EvaluationMetric(Base):
     feedback = Column(Text, nullable=True)
     evaluation = relationship("Evaluation", back_populates="metrics")
 
+# ---------------------------
+# Extraction Jobs (process-pool PDF parsing / OCR)
+# ---------------------------
+class ExtractionJob(Base):
+    __tablename__ = "extraction_jobs"
+
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), index=True, nullable=True)
+    source = Column(String(20), nullable=False)              # "local" | "drive" | "upload"
+    status = Column(String(20), nullable=False, default="running", index=True)  # running | done | failed
+    chars = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+# ---------------------------
+# Background Jobs (durable queue, see services/job_queue.py)
+# ---------------------------
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False, index=True)      # "index_document" | "summarize_material" | "generate_quiz"
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), index=True, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    # "<kind>:<document_id>" while queued/running, NULL once finished:
+    # at most one active job per kind and document, across all workers.
+    dedupe_key = Column(String(100), unique=True, nullable=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued | running | done | failed
+    priority = Column(Integer, nullable=False, default=0)       # higher runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    leased_by = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+# ---------------------------
+# Upload Artifacts (content-addressed cache for one-time uploads)
+# ---------------------------
+class UploadArtifact(Base):
+    __tablename__ = "upload_artifacts"
+
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    raw_text = Column(Text, nullable=True)
+    chunks = Column(JSON, nullable=True)     # [{"page": int, "section": str, "text": str}, ...]
+    summary = Column(Text, nullable=True)
+    quizzes = Column(JSON, nullable=True)    # {"<n_items>:<n_options>:<objectives>": [QuizItem, ...]}
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+# ---------------------------
+# Drive File Texts (extracted text shared by every document attaching the same Drive content)
+# ---------------------------
+class DriveFileText(Base):
+    __tablename__ = "drive_file_texts"
+
+    id = Column(Integer, primary_key=True)
+    # "md5:<md5Checksum>" for binary files; "rev:<file id>:<modifiedTime>" for
+    # Google Docs/Slides, which Drive exports without a checksum.
+    content_key = Column(String(255), unique=True, index=True, nullable=False)
+    drive_file_id = Column(String(128), index=True, nullable=False)
+    md5_checksum = Column(String(64), nullable=True)
+    modified_time = Column(DateTime(timezone=True), nullable=True)
+    mime_type = Column(String(255), nullable=True)
+    raw_text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# ---------------------------
+# Lecture Evaluation Artifacts (per-lecture evaluator precomputation)
+# ---------------------------
+class LectureEvalArtifact(Base):
+    __tablename__ = "lecture_eval_artifacts"
+    __table_args__ = (
+        UniqueConstraint("lecture_hash", "embedder", name="ux_lecture_eval_artifact_hash_embedder"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    lecture_hash = Column(String(64), index=True, nullable=False)    # SHA-256 of the versioned lecture text
+    embedder = Column(String(100), nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="SET NULL"), nullable=True)
+    reference_summary = Column(Text, nullable=False)
+    key_points = Column(JSON, nullable=False)     # ["<point>", ...]
+    terms = Column(JSON, nullable=False)          # top lecture terminology
+    reference_tokens = Column(JSON, nullable=True)  # stemmed ROUGE tokens of reference_summary
+    embedding_dim = Column(Integer, nullable=False)
+    # float32 vectors, row-major (n x embedding_dim)
+    lecture_embedding = Column(LargeBinary, nullable=False)
+    reference_embedding = Column(LargeBinary, nullable=False)
+    chunk_embeddings = Column(LargeBinary, nullable=False)
+    key_point_embeddings = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class EssayGradeCache(Base):
+    __tablename__ = "essay_grade_cache"
+
+    id = Column(Integer, primary_key=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)  # see essay_grade_cache_service
+    model_path = Column(String(500), nullable=False)
+    result = Column(JSON, nullable=False)  # GradeResult.to_dict()
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
+
 # ---------------------------
 # Quizzes
 # ---------------------------
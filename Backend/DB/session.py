@@ -39,6 +39,12 @@ async def create_all_tables():
             await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS auto_jobs_enabled BOOLEAN DEFAULT TRUE"))
             await conn.execute(text("UPDATE users SET auth_provider = 'google' WHERE auth_provider IS NULL OR auth_provider = ''"))
             await conn.execute(text("ALTER TABLE users ALTER COLUMN auth_provider SET DEFAULT 'google'"))
+            await conn.execute(text("ALTER TABLE lecture_eval_artifacts ADD COLUMN IF NOT EXISTS reference_tokens JSON"))
+            await conn.execute(text("ALTER TABLE documents ADD COLUMN IF NOT EXISTS source_updated_at TIMESTAMP WITH TIME ZONE"))
+            await conn.execute(text("ALTER TABLE documents ADD COLUMN IF NOT EXISTS drive_file_id VARCHAR(128)"))
+            await conn.execute(text("ALTER TABLE documents ADD COLUMN IF NOT EXISTS drive_md5_checksum VARCHAR(64)"))
+            await conn.execute(text("ALTER TABLE documents ADD COLUMN IF NOT EXISTS drive_modified_time TIMESTAMP WITH TIME ZONE"))
+            await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_documents_drive_file_id ON documents (drive_file_id)"))
         elif settings.DATABASE_URL.startswith("sqlite"):
             result = await conn.execute(text("PRAGMA table_info(users)"))
             user_columns = {row[1] for row in result.fetchall()}
@@ -48,3 +54,18 @@ async def create_all_tables():
                 await conn.execute(text("ALTER TABLE users ADD COLUMN password_hash VARCHAR(255)"))
             if "auto_jobs_enabled" not in user_columns:
                 await conn.execute(text("ALTER TABLE users ADD COLUMN auto_jobs_enabled BOOLEAN NOT NULL DEFAULT 1"))
+            result = await conn.execute(text("PRAGMA table_info(lecture_eval_artifacts)"))
+            artifact_columns = {row[1] for row in result.fetchall()}
+            if "reference_tokens" not in artifact_columns:
+                await conn.execute(text("ALTER TABLE lecture_eval_artifacts ADD COLUMN reference_tokens JSON"))
+            result = await conn.execute(text("PRAGMA table_info(documents)"))
+            document_columns = {row[1] for row in result.fetchall()}
+            if "source_updated_at" not in document_columns:
+                await conn.execute(text("ALTER TABLE documents ADD COLUMN source_updated_at DATETIME"))
+            if "drive_file_id" not in document_columns:
+                await conn.execute(text("ALTER TABLE documents ADD COLUMN drive_file_id VARCHAR(128)"))
+                await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_documents_drive_file_id ON documents (drive_file_id)"))
+            if "drive_md5_checksum" not in document_columns:
+                await conn.execute(text("ALTER TABLE documents ADD COLUMN drive_md5_checksum VARCHAR(64)"))
+            if "drive_modified_time" not in document_columns:
+                await conn.execute(text("ALTER TABLE documents ADD COLUMN drive_modified_time DATETIME"))
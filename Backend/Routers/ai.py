@@ -8,12 +8,10 @@ from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-import os
-import tempfile
 import io
 from typing import Optional
 import json
-from DB.session import get_db
+from DB.session import get_db, AsyncSessionLocal
 from Core.config import settings
 from DB.schemas import (
     Document as DocumentORM,
@@ -24,18 +22,26 @@ from DB.schemas import (
 )
 from DB import crud
 from security.auth_dependency import get_optional_user, CurrentUser
-from services.pdf_processor import extract_text_from_pdf, extract_text_from_pdf_bytes, load_pdf, load_pdf_from_bytes, split_documents
 from services.summarizer_service import summarize_text
 from services.quiz_generator_service import generate_quiz as gen
 from services.quiz_utils import find_quiz_by_doc_and_criteria, build_quiz_items
+from services.extraction_worker import run_in_extraction_pool
+from services.pdf_processor import extract_text_from_pdf_bytes
+from services.upload_cache_service import (
+    get_or_create_upload_artifact,
+    get_cached_quiz,
+    quiz_cache_key,
+    store_upload_quiz,
+    store_upload_summary,
+)
 from models.ai_models import (
     ChatRequest, ChatResponse,
     ChatConversationListResponse, ChatConversationSummary,
     ChatConversationMessagesResponse, ChatMessageOut,
     QuizGenerateRequest, QuizGenerateResponse, QuizItem,
     SummarizeRequest, SummarizeResponse,
-    EvaluateRequest, EvaluateResponse, MetricScore,
-    EssayGradeRequest, EssayGradeResponse,
+    EvaluateRequest, EvaluateResponse, EvaluateBatchRequest, MetricScore,
+    EssayGradeRequest, EssayGradeResponse, EssayBatchGradeRequest,
     IndexDocumentRequest, IndexDocumentResponse,
     TTSRequest, STTResponse,
 )
@@ -45,6 +51,7 @@ from DB.schemas import (
         Summary as SummaryORM,
         SummaryChunk as SummaryChunkORM,
     QuizDocument as QuizDocumentORM,
+    UploadArtifact as UploadArtifactORM,
     )
 
 _auth = Depends(get_optional_user)
@@ -105,27 +112,36 @@ async def _resolve_db_user(
     return await crud.get_user_by_google_id(db, google_id)
 
 
-async def _extract_text_from_uploaded_pdf(file: UploadFile) -> tuple[str, str]:
+async def _read_uploaded_pdf(file: UploadFile) -> bytes:
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
 
     payload = await file.read()
     if not payload:
         raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+    return payload
 
-    # Use PyMuPDF (fitz) with OCR fallback — same robust engine as the course
-    # documents pipeline. Handles image-based slides automatically.
-    text = extract_text_from_pdf_bytes(payload)
-    if not text or not text.strip():
+
+async def _load_uploaded_pdf(file: UploadFile, db: AsyncSession) -> UploadArtifactORM:
+    """Validate a one-time handout upload and return its content-addressed cache entry.
+
+    Identical uploads (same SHA-256) reuse the stored text, chunks and derived
+    artifacts instead of re-running PyMuPDF / OCR.
+    """
+    payload = await _read_uploaded_pdf(file)
+    artifact = await get_or_create_upload_artifact(db, payload)
+    if not artifact.raw_text or not artifact.raw_text.strip():
         raise HTTPException(status_code=422, detail="Could not extract text from uploaded PDF.")
+    return artifact
 
-    # Still write temp file for callers that need it (e.g. evaluate-upload)
-    temp_path = None
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(payload)
-        temp_path = tmp.name
 
-    return text, temp_path
+async def _extract_text_from_uploaded_pdf(file: UploadFile) -> str:
+    """Extract a student submission's text without storing it (never cached)."""
+    payload = await _read_uploaded_pdf(file)
+    text = await run_in_extraction_pool(extract_text_from_pdf_bytes, payload)
+    if not text or not text.strip():
+        raise HTTPException(status_code=422, detail="Could not extract text from uploaded PDF.")
+    return text
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  1. CHATBOT
@@ -446,25 +462,21 @@ async def chat_speech_to_text(
 async def chat_upload(
     file: UploadFile = File(...),
     message: str = Form(...),
+    db: AsyncSession = Depends(get_db),
     user: CurrentUser | None = _auth
 ):
-    """Ephemeral chat with a one-time uploaded PDF (no persistence)."""
+    """Chat with a one-time uploaded PDF.
+
+    The conversation is not saved; only the upload's text and chunks are
+    kept in the content-addressed upload cache (``upload_artifacts``).
+    """
     if not message or not message.strip():
         raise HTTPException(status_code=400, detail="Message is required.")
-    if file.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
 
     try:
-        payload = await file.read()
-        if not payload:
-            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-
-        # Use PyMuPDF (fitz) with OCR fallback for image-based slides
-        docs = load_pdf_from_bytes(payload)
-        if not docs:
-            raise HTTPException(status_code=422, detail="Could not extract text from uploaded PDF.")
-
-        chunks = split_documents(docs)
+        # Chunks are cached per upload hash, so repeat uploads skip PyMuPDF / OCR.
+        artifact = await _load_uploaded_pdf(file, db)
+        chunks = artifact.chunks or []
         if not chunks:
             raise HTTPException(status_code=422, detail="No readable content found in uploaded PDF.")
 
@@ -483,14 +495,14 @@ async def chat_upload(
 
         ranked = sorted(
             chunks,
-            key=lambda c: score_chunk(c.page_content),
+            key=lambda c: score_chunk(c["text"]),
             reverse=True,
         )
         top_chunks = ranked[:4]
-        if not any(score_chunk(c.page_content) for c in top_chunks):
+        if not any(score_chunk(c["text"]) for c in top_chunks):
             top_chunks = chunks[:4]
 
-        context_text = "\n\n---\n\n".join(c.page_content for c in top_chunks)
+        context_text = "\n\n---\n\n".join(c["text"] for c in top_chunks)
 
         from services.chatbot_service import TUTOR_SYSTEM
         from services.openrouter_client import chat_completion
@@ -510,8 +522,9 @@ async def chat_upload(
 
         sources = [
             {
-                "page": c.metadata.get("page"),
-                "snippet": c.page_content[:300],
+                "page": c.get("page"),
+                "section": c.get("section"),
+                "snippet": c["text"][:300],
             }
             for c in top_chunks
         ]
@@ -605,22 +618,27 @@ async def generate_quiz_from_upload(
     objectives: str = Form("General knowledge"),
     n_items: int = Form(5),
     n_options: int = Form(4),
+    db: AsyncSession = Depends(get_db),
     user: CurrentUser | None = _auth
 ):
     try:
-        payload = await file.read()
-        if not payload:
-            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-        # Use PyMuPDF (fitz) with OCR fallback for image-based slides
-        text = extract_text_from_pdf_bytes(payload)
-        if not text or not text.strip():
-            raise HTTPException(status_code=422, detail="Could not extract text from uploaded PDF.")
+        artifact = await _load_uploaded_pdf(file, db)
+        cache_key = quiz_cache_key(n_items, n_options, objectives)
+        cached_items = get_cached_quiz(artifact, cache_key)
+        if cached_items:
+            return {"items": [QuizItem(**i) for i in cached_items]}
+
+        raw_items = gen(passage=artifact.raw_text[:10000], objectives=objectives, n_items=n_items, n_options=n_options)
         # Use Pydantic model for validation before returning
-        raw_items = gen(passage=text[:10000], objectives=objectives, n_items=n_items, n_options=n_options)
         validated = [QuizItem(**i) for i in raw_items]
+        if validated:
+            await store_upload_quiz(db, artifact, cache_key, [i.model_dump() for i in validated])
         return {"items": validated}
     finally:
-        pass
+        try:
+            await file.close()
+        except Exception:
+            pass
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -734,13 +752,23 @@ async def summarize(
     return SummarizeResponse(summary_id=db_summary.id, summary=summary_text)
 
 @router.post("/summarize-upload", response_model=SummarizeResponse)
-async def summarize_uploaded_file(file: UploadFile = File(...), user: CurrentUser | None = _auth):
-    """Summarize a one-time uploaded PDF without saving it to DB or course documents."""
-    temp_path = None
+async def summarize_uploaded_file(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    user: CurrentUser | None = _auth,
+):
+    """Summarize a one-time uploaded PDF without adding it to course documents.
+
+    The summary is stored on the upload's cache entry, so the same file
+    uploaded again is answered without calling the LLM.
+    """
     try:
-        text, temp_path = await _extract_text_from_uploaded_pdf(file)
+        artifact = await _load_uploaded_pdf(file, db)
+        if artifact.summary:
+            return SummarizeResponse(summary_id=None, summary=artifact.summary)
 
-        summary_text = summarize_text(text)
+        summary_text = summarize_text(artifact.raw_text)
+        await store_upload_summary(db, artifact, summary_text)
         return SummarizeResponse(summary_id=None, summary=summary_text)
     except HTTPException:
         raise
@@ -751,8 +779,6 @@ async def summarize_uploaded_file(file: UploadFile = File(...), user: CurrentUse
             await file.close()
         except Exception:
             pass
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
 
 
 @router.post("/evaluate-upload", response_model=EvaluateResponse)
@@ -766,9 +792,8 @@ async def evaluate_uploaded_summary(
     user: CurrentUser | None = _auth,
 ):
     """Evaluate a student summary uploaded as a one-time PDF."""
-    temp_path = None
     try:
-        student_summary, temp_path = await _extract_text_from_uploaded_pdf(file)
+        student_summary = await _extract_text_from_uploaded_pdf(file)
 
         lecture = lecture_text
         if not lecture and document_id:
@@ -780,7 +805,6 @@ async def evaluate_uploaded_summary(
             )
 
         import asyncio
-        from services.evaluator_service import evaluate_summary
 
         key_points_value = None
         if key_points:
@@ -792,10 +816,11 @@ async def evaluate_uploaded_summary(
                 key_points_value = None
 
         result = await asyncio.wait_for(
-            asyncio.to_thread(
-                evaluate_summary,
+            _run_evaluation(
+                db,
                 student_summary=student_summary,
-                lecture_text=lecture,
+                lecture=lecture,
+                document_id=document_id,
                 reference_summary=reference_summary,
                 key_points=key_points_value,
             ),
@@ -815,49 +840,8 @@ async def evaluate_uploaded_summary(
             await file.close()
         except Exception:
             pass
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-
-    raw_scores = result["scores"]
-    overall_score = result["overall"]
-
-    metrics = {
-        name: MetricScore(score=v["score"], feedback=v["detail"])
-        for name, v in raw_scores.items()
-    }
-
-    from DB.schemas import Evaluation as EvaluationORM, EvaluationMetric as EvaluationMetricORM
-
-    db_eval = EvaluationORM(
-        document_id=document_id,
-        student_summary=student_summary,
-        lecture_text=lecture,
-        overall_score=overall_score,
-        method="hybrid",
-    )
-    db.add(db_eval)
-    await db.flush()
-
-    for metric_name, metric in metrics.items():
-        db_metric = EvaluationMetricORM(
-            evaluation_id=db_eval.id,
-            metric_name=metric_name,
-            score=metric.score,
-            feedback=metric.feedback,
-        )
-        db.add(db_metric)
-
-    await db.commit()
-    await db.refresh(db_eval)
 
-    return EvaluateResponse(
-        evaluation_id=db_eval.id,
-        overall_score=overall_score,
-        overall_feedback=result.get("overall_feedback"),
-        metrics=metrics,
-        reference_summary=result.get("reference_summary"),
-        key_points=result.get("key_points"),
-    )
+    return await _persist_evaluation(db, document_id, student_summary, lecture, result)
 
 
 def _parse_id_list(raw_ids: str) -> list[int]:
@@ -977,6 +961,83 @@ async def quiz_status(
 #  4.  EVALUATION  —  6-dimension hybrid student summary evaluator
 # ══════════════════════════════════════════════════════════════════════════════
 
+async def _persist_evaluation(
+    db: AsyncSession,
+    document_id: Optional[int],
+    student_summary: str,
+    lecture: str,
+    result: dict,
+) -> EvaluateResponse:
+    """Store an evaluator result and shape it as the API response."""
+    # Service returns: {scores: {name: {score, detail}}, overall, reference_summary, key_points}
+    from DB.schemas import Evaluation as EvaluationORM, EvaluationMetric as EvaluationMetricORM
+
+    metrics = {
+        name: MetricScore(score=v["score"], feedback=v["detail"])
+        for name, v in result["scores"].items()
+    }
+
+    db_eval = EvaluationORM(
+        document_id=document_id,
+        student_summary=student_summary,
+        lecture_text=lecture,
+        overall_score=result["overall"],
+        method="hybrid",
+    )
+    db.add(db_eval)
+    await db.flush()
+
+    for name, m in metrics.items():
+        db.add(EvaluationMetricORM(
+            evaluation_id=db_eval.id,
+            metric_name=name,
+            score=m.score,
+            feedback=m.feedback,
+        ))
+
+    await db.commit()
+    await db.refresh(db_eval)
+
+    return EvaluateResponse(
+        evaluation_id=db_eval.id,
+        overall_score=result["overall"],
+        overall_feedback=result.get("overall_feedback"),
+        metrics=metrics,
+        reference_summary=result.get("reference_summary"),
+        key_points=result.get("key_points"),
+    )
+
+
+async def _run_evaluation(
+    db: AsyncSession,
+    student_summary: str,
+    lecture: str,
+    document_id: Optional[int] = None,
+    reference_summary: Optional[str] = None,
+    key_points: Optional[list[str]] = None,
+) -> dict:
+    """Evaluate one summary, reusing the cached per-lecture artifacts."""
+    import asyncio
+    from services.evaluator_service import evaluate_summary
+    from services.evaluation_cache_service import get_lecture_artifacts
+
+    artifacts = await get_lecture_artifacts(
+        db,
+        lecture,
+        document_id=document_id,
+        reference_summary=reference_summary,
+        key_points=key_points,
+    )
+    # evaluate_summary is sync (blocking HTTP + embedding);
+    # offload to a thread so we don't block the async event loop.
+    return await asyncio.to_thread(
+        evaluate_summary,
+        student_summary=student_summary,
+        lecture_text=lecture,
+        artifacts=artifacts,
+    )
+
+
 @router.post("/evaluate", response_model=EvaluateResponse)
 async def evaluate(req: EvaluateRequest, db: AsyncSession = Depends(get_db), user: CurrentUser | None = _auth):
     """Evaluate a student summary against a lecture / document across 6 metrics.
@@ -994,14 +1055,12 @@ async def evaluate(req: EvaluateRequest, db: AsyncSession = Depends(get_db), use
 
     try:
         import asyncio
-        from services.evaluator_service import evaluate_summary
-        # evaluate_summary is sync (blocking HTTP + time.sleep retries);
-        # offload to a thread so we don't block the async event loop.
         result = await asyncio.wait_for(
-            asyncio.to_thread(
-                evaluate_summary,
+            _run_evaluation(
+                db,
                 student_summary=req.student_summary,
-                lecture_text=lecture,
+                lecture=lecture,
+                document_id=req.document_id,
                 reference_summary=req.reference_summary,
                 key_points=req.key_points,
             ),
@@ -1015,46 +1074,135 @@ async def evaluate(req: EvaluateRequest, db: AsyncSession = Depends(get_db), use
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    # ── Transform service output to response model ──────────────────────────
-    # Service returns: {scores: {name: {score, detail}}, overall, reference_summary, key_points}
-    raw_scores = result["scores"]        # {metric: {score, detail}}
-    overall_score = result["overall"]
+    return await _persist_evaluation(db, req.document_id, req.student_summary, lecture, result)
 
-    metrics = {
-        name: MetricScore(score=v["score"], feedback=v["detail"])
-        for name, v in raw_scores.items()
-    }
 
-    # ── Persist to DB ─────────────────────────────────────────────────────
-    from DB.schemas import Evaluation as EvaluationORM, EvaluationMetric as EvaluationMetricORM
+@router.post("/evaluate/stream")
+async def evaluate_stream(req: EvaluateRequest, db: AsyncSession = Depends(get_db), user: CurrentUser | None = _auth):
+    """Evaluate a student summary, streaming each metric as Server-Sent Events.
 
-    db_eval = EvaluationORM(
-        document_id=req.document_id,
-        student_summary=req.student_summary,
-        lecture_text=lecture,
-        overall_score=overall_score,
-        method="hybrid",
+    ``metric`` events arrive as soon as each score is known (deterministic
+    metrics first, LLM-backed ones when their calls return); a final ``done``
+    event carries the persisted evaluation.  Metrics already sent are kept by
+    the client even if a later step fails.
+    """
+    lecture = req.lecture_text
+    if not lecture and req.document_id:
+        lecture = await _get_document_text(req.document_id, db)
+    if not lecture:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide either 'lecture_text' or 'document_id'.",
+        )
+
+    from services.async_utils import iterate_in_thread
+    from services.evaluation_cache_service import load_cached_lecture_artifacts, store_lecture_artifacts
+    from services.evaluator_service import combine_scores, iter_evaluation_events
+
+    custom_ground_truth = req.reference_summary is not None or req.key_points is not None
+    cached = None if custom_ground_truth else await load_cached_lecture_artifacts(db, lecture)
+
+    async def event_generator():
+        scores = {}
+        artifacts = cached
+        try:
+            events = iterate_in_thread(lambda: iter_evaluation_events(
+                req.student_summary,
+                lecture,
+                reference_summary=req.reference_summary,
+                key_points=req.key_points,
+                artifacts=cached,
+            ))
+            async for event, payload in events:
+                if event == "artifacts":
+                    artifacts = payload
+                    continue
+                name, score, detail = payload
+                scores[name] = (score, detail)
+                yield f"data: {json.dumps({'type': 'metric', 'metric': name, 'score': score, 'feedback': detail})}\n\n"
+
+            async with AsyncSessionLocal() as stream_db:
+                if cached is None and not custom_ground_truth:
+                    await store_lecture_artifacts(stream_db, artifacts, req.document_id)
+                response = await _persist_evaluation(
+                    stream_db, req.document_id, req.student_summary, lecture, combine_scores(scores, artifacts)
+                )
+            yield f"data: {json.dumps({'type': 'done', 'evaluation': response.model_dump()})}\n\n"
+        except Exception as stream_error:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(stream_error), 'metrics_sent': len(scores)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
     )
-    db.add(db_eval)
-    await db.flush()
 
-    for name, m in metrics.items():
-        db.add(EvaluationMetricORM(
-            evaluation_id=db_eval.id,
-            metric_name=name,
-            score=m.score,
-            feedback=m.feedback,
-        ))
 
-    await db.commit()
-    await db.refresh(db_eval)
+@router.post("/evaluate/batch")
+async def evaluate_batch(req: EvaluateBatchRequest, db: AsyncSession = Depends(get_db), user: CurrentUser | None = _auth):
+    """Evaluate a whole class of summaries against one lecture / document.
 
-    return EvaluateResponse(
-        evaluation_id=db_eval.id,
-        overall_score=overall_score,
-        metrics=metrics,
-        reference_summary=result.get("reference_summary"),
-        key_points=result.get("key_points"),
+    The lecture artifacts are loaded once, all summaries are embedded in one
+    batch and coherence LLM calls run with bounded concurrency.  Events are
+    streamed as Server-Sent Events: ``lecture_ready`` (reference summary and
+    key points) once the lecture is prepared, then ``result`` per student
+    (with its ``index``) in completion order, then ``done``.
+    """
+    if len(req.summaries) > settings.EVALUATOR_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.EVALUATOR_BATCH_MAX_ITEMS} summaries per batch.",
+        )
+    lecture = req.lecture_text
+    if not lecture and req.document_id:
+        lecture = await _get_document_text(req.document_id, db)
+    if not lecture:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide either 'lecture_text' or 'document_id'.",
+        )
+
+    from services.evaluation_cache_service import get_lecture_artifacts
+    from services.batch_evaluation_service import iter_batch_evaluations
+
+    students = [item.student_summary for item in req.summaries]
+
+    async def event_generator():
+        evaluated = 0
+        try:
+            async with AsyncSessionLocal() as stream_db:
+                # Preparing the lecture may call the LLM for a reference
+                # summary; it runs inside the stream so the response starts
+                # right away.
+                artifacts = await get_lecture_artifacts(
+                    stream_db,
+                    lecture,
+                    document_id=req.document_id,
+                    reference_summary=req.reference_summary,
+                    key_points=req.key_points,
+                )
+                yield f"data: {json.dumps({'type': 'lecture_ready', 'reference_summary': artifacts.reference_summary, 'key_points': artifacts.key_points})}\n\n"
+
+                async for index, result in iter_batch_evaluations(students, artifacts):
+                    response = await _persist_evaluation(
+                        stream_db, req.document_id, students[index], lecture, result
+                    )
+                    evaluated += 1
+                    payload = {
+                        "type": "result",
+                        "index": index,
+                        "student_id": req.summaries[index].student_id,
+                        "evaluation": response.model_dump(exclude={"reference_summary", "key_points"}),
+                    }
+                    yield f"data: {json.dumps(payload)}\n\n"
+            yield f"data: {json.dumps({'type': 'done', 'evaluated': evaluated, 'reference_summary': artifacts.reference_summary, 'key_points': artifacts.key_points})}\n\n"
+        except Exception as stream_error:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(stream_error), 'evaluated': evaluated})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
     )
 
 
@@ -1063,18 +1211,14 @@ async def evaluate(req: EvaluateRequest, db: AsyncSession = Depends(get_db), use
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.post("/grade-essay", response_model=EssayGradeResponse)
-async def grade_essay(req: EssayGradeRequest, user: CurrentUser | None = _auth):
+async def grade_essay(req: EssayGradeRequest, db: AsyncSession = Depends(get_db), user: CurrentUser | None = _auth):
     """Predict IELTS overall band for a single essay."""
     try:
-        import asyncio
-        from services.essay_grader_service import grade_essay as grade_single
+        from services.essay_grade_cache_service import grade_essay_cached
 
-        # Model inference is sync and potentially heavy; run in worker thread.
-        result = await asyncio.to_thread(
-            grade_single,
-            essay_text=req.essay_text,
-            question=req.question,
-        )
+        # Resubmissions come from the grade cache; new essays share batched
+        # forward passes with concurrent requests (see EssayBatcher).
+        result = await grade_essay_cached(db, essay_text=req.essay_text, question=req.question)
         return EssayGradeResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1084,21 +1228,16 @@ async def grade_essay(req: EssayGradeRequest, user: CurrentUser | None = _auth):
 async def grade_essay_uploaded_file(
     file: UploadFile = File(...),
     question: str | None = Form(None),
+    db: AsyncSession = Depends(get_db),
     user: CurrentUser | None = _auth,
 ):
     """Predict IELTS overall band for an essay uploaded as a PDF."""
-    temp_path = None
     try:
-        essay_text, temp_path = await _extract_text_from_uploaded_pdf(file)
+        essay_text = await _extract_text_from_uploaded_pdf(file)
 
-        import asyncio
-        from services.essay_grader_service import grade_essay as grade_single
+        from services.essay_grade_cache_service import grade_essay_cached
 
-        result = await asyncio.to_thread(
-            grade_single,
-            essay_text=essay_text,
-            question=question,
-        )
+        result = await grade_essay_cached(db, essay_text=essay_text, question=question)
         return EssayGradeResponse(**result)
     except HTTPException:
         raise
@@ -1109,8 +1248,67 @@ async def grade_essay_uploaded_file(
             await file.close()
         except Exception:
             pass
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+
+
+def _stream_essay_grades(essays: list[str], questions: list, labels: list) -> StreamingResponse:
+    """SSE stream of bulk grading results: one ``result`` / ``error`` per essay, then ``done``."""
+    from services.async_utils import iterate_in_thread
+    from services.essay_grader_service import iter_grade_essays
+
+    async def event_generator():
+        graded = failed = 0
+        try:
+            async for index, outcome in iterate_in_thread(lambda: iter_grade_essays(essays, questions)):
+                if "error" in outcome:
+                    failed += 1
+                    payload = {"type": "error", "index": index, "essay_id": labels[index], "message": outcome["error"]}
+                else:
+                    graded += 1
+                    payload = {"type": "result", "index": index, "essay_id": labels[index], "result": outcome}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield f"data: {json.dumps({'type': 'done', 'graded': graded, 'failed': failed})}\n\n"
+        except Exception as stream_error:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(stream_error)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+    )
+
+
+@router.post("/grade-essay/batch")
+async def grade_essay_batch(req: EssayBatchGradeRequest, user: CurrentUser | None = _auth):
+    """Grade a set of essays in length-sorted batches, streaming results as SSE."""
+    if len(req.essays) > settings.ESSAY_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.ESSAY_BULK_MAX_ITEMS} essays per batch.")
+    return _stream_essay_grades(
+        [item.essay_text for item in req.essays],
+        [item.question if item.question is not None else req.question for item in req.essays],
+        [item.essay_id for item in req.essays],
+    )
+
+
+@router.post("/grade-essay/batch-upload")
+async def grade_essay_batch_upload(
+    files: list[UploadFile] = File(...),
+    question: str | None = Form(None),
+    user: CurrentUser | None = _auth,
+):
+    """Grade many essays uploaded as PDFs (one essay per file), streaming results as SSE."""
+    if len(files) > settings.ESSAY_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.ESSAY_BULK_MAX_ITEMS} essays per batch.")
+    essays = []
+    try:
+        for file in files:
+            essays.append(await _extract_text_from_uploaded_pdf(file))
+    finally:
+        for file in files:
+            try:
+                await file.close()
+            except Exception:
+                pass
+    return _stream_essay_grades(essays, [question] * len(essays), [f.filename for f in files])
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1135,11 +1333,14 @@ async def index_document(req: IndexDocumentRequest, db: AsyncSession = Depends(g
         if not text or not text.strip():
             raise HTTPException(status_code=422, detail="No extractable text found.")
 
+        import asyncio
         from services.pdf_processor import index_text_for_course
-        chunks = index_text_for_course(
+        chunks = await asyncio.to_thread(
+            index_text_for_course,
             text,
             req.course_id,
             document_id=doc.id,
+            pdf_path=doc.s3_path,
         )
         return IndexDocumentResponse(
             message="Document indexed successfully",
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from DB.session import get_db
 from DB.schemas import Document
+from DB import crud
 
 router = APIRouter()
 
@@ -19,6 +20,29 @@ async def download_document(doc_id: int, db: AsyncSession = Depends(get_db)):
 
     return FileResponse(path=doc.s3_path, filename=doc.title, media_type="application/pdf")
 
+@router.get("/{doc_id}/extraction")
+async def get_extraction_status(doc_id: int, db: AsyncSession = Depends(get_db)):
+    """Report whether a document's text is ready or still being extracted."""
+    result = await db.execute(select(Document).where(Document.id == doc_id))
+    doc = result.scalars().first()
+    if not doc: raise HTTPException(status_code=404, detail="Document not found")
+
+    job = await crud.get_latest_extraction_job(db, doc_id)
+    has_text = bool(doc.raw_text and doc.raw_text.strip())
+    return {
+        "document_id": doc_id,
+        "status": "ready" if has_text else (job.status if job else "pending"),
+        "job": {
+            "id": job.id,
+            "source": job.source,
+            "status": job.status,
+            "chars": job.chars,
+            "error": job.error,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        } if job else None,
+    }
+
 @router.get("/{course_id}")
 async def list_documents(course_id: int, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Document).where(Document.course_id == course_id))
@@ -9,7 +9,8 @@ Endpoints:
   GET  /api/sync/documents/{course_id} → list synced documents for a course
 """
 import asyncio
-from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException
+from datetime import datetime, timezone
+from fastapi import APIRouter, Body, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -18,249 +19,196 @@ from DB import crud
 from DB.schemas import (
     Document as DocumentORM,
     Chunk as ChunkORM,
-    Summary as SummaryORM,
     SummaryChunk as SummaryChunkORM,
-    Quiz as QuizORM,
-    QuizQuestion as QuizQuestionORM,
     QuizDocument as QuizDocumentORM,
 )
-from services.google_classroom_service import GoogleClassroomService
-from services.drive_download_service import ensure_document_text
-from services.pdf_processor import index_text_for_course
-from services.summarizer_service import summarize_text
-from services.quiz_generator_service import generate_quiz
-from services.quiz_utils import find_quiz_by_doc_and_criteria
+from services.google_classroom_service import ClassroomFetchError, GoogleClassroomService, parse_update_time
+from services.async_utils import merge_async_iterators
+from services.job_queue import enqueue_jobs
+from services.sync_jobs import STUDY_PACK
 from Core.config import settings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 router = APIRouter()
 google_service = GoogleClassroomService()
 
-_auto_quiz_inflight: set[int] = set()
-_auto_quiz_lock = asyncio.Lock()
-_AUTO_QUIZ_N_ITEMS = 5
-_AUTO_QUIZ_N_OPTIONS = 4
-
-
-async def _auto_jobs_enabled(db: AsyncSession, user_id: int | None) -> bool:
-    if not user_id:
-        return True
-    user = await crud.get_user_by_id(db, user_id)
-    if not user:
-        return False
-    flag = getattr(user, "auto_jobs_enabled", True)
-    return True if flag is None else bool(flag)
-
-
-async def _background_index_documents(new_doc_ids: list, user_id: int | None):
-    """Background task: download Drive files and index them into ChromaDB."""
-    if not new_doc_ids:
-        return
-    async with AsyncSessionLocal() as db:
-        if not await _auto_jobs_enabled(db, user_id):
-            return
-        for doc_id in new_doc_ids:
-            if not await _auto_jobs_enabled(db, user_id):
-                print("ℹ️  Auto-index stopped: user logged out")
-                break
-            try:
-                result = await db.execute(select(DocumentORM).where(DocumentORM.id == doc_id))
-                doc = result.scalars().first()
-                if not doc or not doc.google_drive_url:
-                    continue
-                text = await ensure_document_text(doc, db)
-                if not text or not text.strip():
-                    continue
-                await asyncio.to_thread(
-                    index_text_for_course,
-                    text,
-                    doc.course_id,
-                    document_id=doc.id,
-                )
-                print(f"✅ Auto-indexed doc {doc_id} for course {doc.course_id}")
-            except Exception as e:
-                print(f"⚠️  Auto-index skipped doc {doc_id}: {e}")
-
-
-async def _background_auto_summarize_materials(new_doc_ids: list, user_id: int | None):
-    """Background task: auto-summarize new material documents once."""
-    if not new_doc_ids or not settings.AUTO_SUMMARIZE_MATERIALS:
-        return
-    print(f"📋 Auto-summary task started for {len(new_doc_ids)} document(s)")
-
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-
-    async with AsyncSessionLocal() as db:
-        for doc_id in new_doc_ids:
-            if not await _auto_jobs_enabled(db, user_id):
-                print("ℹ️  Auto-summary stopped: user logged out")
-                break
-            try:
-                result = await db.execute(select(DocumentORM).where(DocumentORM.id == doc_id))
-                doc = result.scalars().first()
-                if not doc or doc.doc_type != "material":
-                    continue
-
-                existing_summary = (
-                    await db.execute(
-                        select(SummaryORM)
-                        .join(SummaryChunkORM, SummaryORM.id == SummaryChunkORM.summary_id)
-                        .join(ChunkORM, SummaryChunkORM.chunk_id == ChunkORM.id)
-                        .where(ChunkORM.doc_id == doc_id)
-                        .limit(1)
-                    )
-                ).scalars().first()
-                if existing_summary:
-                    print(f"ℹ️  Auto-summary skipped doc {doc_id}: summary already exists")
-                    continue
-
-                text = ""
-                if doc.raw_text:
-                    text = doc.raw_text
-                elif doc.google_drive_url or doc.s3_path:
-                    try:
-                        text = await ensure_document_text(doc, db)
-                    except Exception as e:
-                        print(f"⚠️  Auto-summary text extraction failed for doc {doc_id}: {e}")
-
-                if not text or not text.strip():
-                    print(f"⚠️  Auto-summary skipped doc {doc_id}: no extractable text")
-                    continue
-                print(f"🧠 Auto-summary started doc {doc_id}: {doc.title}")
-                summary_text = await asyncio.to_thread(
-                    summarize_text,
-                    text[:15000],
-                )
-                db_summary = SummaryORM(text=summary_text, method="llm")
-                db.add(db_summary)
-                await db.flush()
-
-                existing_chunks = (
-                    await db.execute(
-                        select(ChunkORM)
-                        .where(ChunkORM.doc_id == doc_id)
-                        .order_by(ChunkORM.sequence_number)
-                    )
-                ).scalars().all()
-
-                if not existing_chunks:
-                    raw_chunks = splitter.split_text(text)
-                    existing_chunks = []
-                    for i, chunk_text in enumerate(raw_chunks):
-                        chunk = ChunkORM(
-                            doc_id=doc_id,
-                            sequence_number=i,
-                            text=chunk_text,
-                        )
-                        db.add(chunk)
-                        existing_chunks.append(chunk)
-                    await db.flush()
-
-                for chunk in existing_chunks:
-                    db.add(SummaryChunkORM(summary_id=db_summary.id, chunk_id=chunk.id))
-
-                await db.commit()
-                print(f"✅ Auto-summarized doc {doc_id}")
-            except Exception as e:
-                await db.rollback()
-                print(f"⚠️  Auto-summary skipped doc {doc_id}: {e}")
-
-
-async def _background_auto_generate_quizzes(new_doc_ids: list, user_id: int | None):
-    """Background task: auto-generate quizzes for new material documents once."""
-    if not new_doc_ids or not settings.AUTO_GENERATE_QUIZZES:
-        return
-    print(f"🧪 Auto-quiz task started for {len(new_doc_ids)} document(s)")
-
-    async with AsyncSessionLocal() as db:
-        for doc_id in new_doc_ids:
-            if not await _auto_jobs_enabled(db, user_id):
-                print("ℹ️  Auto-quiz stopped: user logged out")
-                break
-            reserved = False
-            async with _auto_quiz_lock:
-                if doc_id in _auto_quiz_inflight:
-                    print(f"ℹ️  Auto-quiz skipped doc {doc_id}: already in progress")
-                    continue
-                _auto_quiz_inflight.add(doc_id)
-                reserved = True
-            try:
-                result = await db.execute(select(DocumentORM).where(DocumentORM.id == doc_id))
-                doc = result.scalars().first()
-                if not doc or doc.doc_type != "material":
-                    continue
-
-                existing_quiz = await find_quiz_by_doc_and_criteria(
-                    db,
-                    doc_id=doc_id,
-                    n_items=_AUTO_QUIZ_N_ITEMS,
-                    n_options=_AUTO_QUIZ_N_OPTIONS,
-                )
-                if existing_quiz:
-                    print(f"ℹ️  Auto-quiz skipped doc {doc_id}: quiz already exists")
-                    continue
-
-                text = ""
-                if doc.raw_text:
-                    text = doc.raw_text
-                elif doc.google_drive_url or doc.s3_path:
-                    try:
-                        text = await ensure_document_text(doc, db)
-                    except Exception as e:
-                        print(f"⚠️  Auto-quiz text extraction failed for doc {doc_id}: {e}")
-
-                if not text or not text.strip():
-                    print(f"⚠️  Auto-quiz skipped doc {doc_id}: no extractable text")
-                    continue
-
-                print(f"🧠 Auto-quiz started doc {doc_id}: {doc.title}")
-                raw_items = await asyncio.to_thread(
-                    generate_quiz,
-                    passage=text[:15000],
-                    n_items=_AUTO_QUIZ_N_ITEMS,
-                    n_options=_AUTO_QUIZ_N_OPTIONS,
-                )
-                if not raw_items:
-                    print(f"⚠️  Auto-quiz skipped doc {doc_id}: no valid questions")
-                    continue
-
-                db_quiz = QuizORM(course_id=doc.course_id, created_by=None)
-                db.add(db_quiz)
-                await db.flush()
-
-                question_count = 0
-                for item in raw_items:
-                    options = item.get("options") or []
-                    answer_index = item.get("answer_index")
-                    if answer_index is None or answer_index < 0 or answer_index >= len(options):
-                        continue
-                    correct_answer = options[answer_index]
-                    db.add(
-                        QuizQuestionORM(
-                            quiz_id=db_quiz.id,
-                            question=item.get("stem", ""),
-                            type="mcq",
-                            options=options,
-                            correct_answer=correct_answer,
-                        )
-                    )
-                    question_count += 1
 
-                if question_count == 0:
-                    await db.rollback()
-                    print(f"⚠️  Auto-quiz skipped doc {doc_id}: no valid questions")
-                    continue
+def _document_row(kind: str, item: dict, course_id: int) -> dict:
+    """create_document kwargs for one Classroom item of the given kind."""
+    drive_url = google_service.extract_drive_url(item.get("materials", []))
+    if kind == "material":
+        row = dict(
+            course_id=course_id, classroom_material_id=item["id"],
+            title=item.get("title", "Untitled Material"), doc_type="material",
+            google_drive_url=drive_url, raw_text=item.get("description"),
+        )
+    elif kind == "announcement":
+        raw_text = item.get("text", "")
+        row = dict(
+            course_id=course_id, classroom_material_id=item["id"],
+            title=raw_text[:200] if raw_text else "Untitled Announcement", doc_type="announcement",
+            google_drive_url=drive_url, raw_text=raw_text,
+        )
+    else:
+        row = dict(
+            course_id=course_id, classroom_material_id=item["id"],
+            title=item.get("title", "Untitled Assignment"), doc_type="coursework",
+            google_drive_url=drive_url,
+            raw_text=item.get("description"),
+            due_date=google_service._parse_google_due_date(item.get("dueDate"), item.get("dueTime")),
+        )
+    row["source_updated_at"] = parse_update_time(item)
+    return row
+
 
-                db.add(QuizDocumentORM(quiz_id=db_quiz.id, doc_id=doc.id))
-                await db.commit()
-                print(f"✅ Auto-quiz generated doc {doc_id}")
-            except Exception as e:
-                await db.rollback()
-                print(f"⚠️  Auto-quiz skipped doc {doc_id}: {e}")
-            finally:
-                if reserved:
-                    async with _auto_quiz_lock:
-                        _auto_quiz_inflight.discard(doc_id)
+def _as_utc(value: datetime | None) -> datetime | None:
+    # SQLite hands timezone-aware columns back naive; they are stored as UTC.
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _apply_edit(doc: DocumentORM, row: dict) -> bool:
+    """Refresh *doc* from a newer version of its Classroom item; True if its Drive file changed.
+
+    A Drive-backed document's raw_text is the text extracted from its file,
+    so the item's description only replaces it when there is no Drive file
+    (announcements always keep their own text).
+    """
+    drive_changed = doc.google_drive_url != row["google_drive_url"]
+    for field in ("title", "google_drive_url", "due_date", "source_updated_at"):
+        if field in row:
+            setattr(doc, field, row[field])
+    if not row["google_drive_url"] or row["doc_type"] == "announcement":
+        doc.raw_text = row["raw_text"]
+    elif drive_changed:
+        # Extract the new file's text on the next study-pack run.
+        doc.raw_text = None
+    if drive_changed:
+        # The locally cached PDF and Drive metadata belong to the old file.
+        doc.s3_path = None
+        doc.drive_file_id = None
+        doc.drive_md5_checksum = None
+        doc.drive_modified_time = None
+    return drive_changed
+
+
+async def _fetch_courses_or_502(access_token: str) -> list[dict]:
+    try:
+        return await google_service.fetch_courses(access_token)
+    except ClassroomFetchError as e:
+        # A partial course list would sync (and report) only some courses.
+        raise HTTPException(status_code=502, detail=f"Could not fetch the course list from Google Classroom: {e}")
+
+
+async def _sync_course_documents(
+    course_sync: dict,
+    access_token: str,
+    semaphore: asyncio.Semaphore,
+    full_refresh: bool = False,
+) -> dict:
+    """
+    Incrementally sync one course's materials, announcements and coursework.
+
+    Runs in its own DB session so courses can be synced concurrently (bounded
+    by *semaphore*). Only items whose updateTime is newer than the course's
+    stored watermark are fetched (all of them with *full_refresh* or on the
+    first sync). Each page costs one IN query for the matching documents and
+    one commit: new items are inserted, edited items refresh their document.
+    Watermarks only advance once every page of that item type was fetched.
+    """
+    db_course_id = course_sync["course_id"]
+    classroom_id = course_sync["classroom_id"]
+    counts = {"material": 0, "announcement": 0, "coursework": 0}
+    skipped = 0
+    updated = 0
+    drive_doc_ids = []
+    material_docs = []
+    seen = set()
+    newest = {}
+    failed = False
+
+    async with semaphore, AsyncSessionLocal() as db:
+        watermarks = {} if full_refresh else await crud.get_course_sync_watermarks(db, db_course_id)
+        since = {kind: _as_utc(watermarks.get(kind)) for kind in counts}
+
+        # Pages of all three item types stream in concurrently and are
+        # delta-synced as they arrive (see GoogleClassroomService.iter_pages).
+        item_pages = merge_async_iterators({
+            "material": google_service.iter_course_materials(classroom_id, access_token, since["material"]),
+            "announcement": google_service.iter_announcements(classroom_id, access_token, since["announcement"]),
+            "coursework": google_service.iter_coursework(classroom_id, access_token, since["coursework"]),
+        })
+        try:
+            async for kind, page in item_pages:
+                items = []
+                for item in page:
+                    # Classroom can repeat an item within or across pages.
+                    if item.get("id") and item["id"] not in seen:
+                        seen.add(item["id"])
+                        items.append(item)
+                existing = await crud.get_documents_by_material_ids(db, [item["id"] for item in items])
+                rows = []
+                replaced_file_ids = []
+                for item in items:
+                    row = _document_row(kind, item, db_course_id)
+                    if row["source_updated_at"] and (kind not in newest or row["source_updated_at"] > newest[kind]):
+                        newest[kind] = row["source_updated_at"]
+
+                    doc = existing.get(item["id"])
+                    if doc is None:
+                        rows.append(row)
+                        continue
+                    stored = _as_utc(doc.source_updated_at)
+                    if row["source_updated_at"] and stored is None:
+                        # Synced before updateTime was recorded: nothing to compare
+                        # against, so adopt the version without treating it as an edit.
+                        doc.source_updated_at = row["source_updated_at"]
+                        skipped += 1
+                    elif row["source_updated_at"] and row["source_updated_at"] > stored:
+                        if _apply_edit(doc, row):
+                            replaced_file_ids.append(doc.id)
+                            if doc.google_drive_url and kind != "announcement":
+                                drive_doc_ids.append(doc.id)
+                        updated += 1
+                    else:
+                        skipped += 1
+
+                # Outputs built from a replaced Drive file go in the same commit
+                # as the edit; the study pack rebuilds them from the new file.
+                await crud.clear_document_study_outputs(db, replaced_file_ids)
+                for doc in await crud.create_documents_bulk(db, rows):
+                    counts[kind] += 1
+                    if doc.google_drive_url and kind != "announcement":
+                        drive_doc_ids.append(doc.id)
+                    if kind == "material":
+                        material_docs.append({
+                            "id": doc.id,
+                            "title": doc.title,
+                            "course_id": doc.course_id,
+                            "course_title": course_sync["course_title"],
+                            "doc_type": doc.doc_type,
+                        })
+        except ClassroomFetchError as e:
+            # Keep what was stored; watermarks stay put so the next sync retries.
+            failed = True
+            print(f"⚠️  Course {classroom_id} sync incomplete: {e}")
+
+        if not failed:
+            for kind, newest_time in newest.items():
+                await crud.set_course_sync_watermark(db, db_course_id, kind, newest_time)
+
+    print(f"  ✅ Course {classroom_id}: {counts['material']} materials, {counts['announcement']} announcements, "
+          f"{counts['coursework']} coursework added, {updated} updated, {skipped} unchanged")
+    return {
+        "materials": counts["material"],
+        "announcements": counts["announcement"],
+        "coursework": counts["coursework"],
+        "updated": updated,
+        "skipped": skipped,
+        "failed": failed,
+        "drive_doc_ids": drive_doc_ids,
+        "material_docs": material_docs,
+    }
 
 
 # ─────────────────────────────────────────────
@@ -281,7 +229,7 @@ async def sync_courses(
     if not access_token:
         raise HTTPException(status_code=401, detail="Could not get valid access token. Please login again.")
 
-    courses_data = await google_service.fetch_courses(access_token)
+    courses_data = await _fetch_courses_or_502(access_token)
     if not courses_data:
         return {"success": True, "message": "No courses found", "new_courses": 0, "updated_courses": 0}
 
@@ -314,9 +262,9 @@ async def sync_courses(
 @router.post("/full-sync")
 async def full_sync(
     user_id: int,   # TODO: extract from JWT cookie in a later sprint
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     selected_course_ids: list[int] | None = Body(default=None, embed=True),
+    full_refresh: bool = False,
 ):
     """
     Full sync of Google Classroom data for a user.
@@ -324,8 +272,13 @@ async def full_sync(
     Steps:
       1. Get valid access token (auto-refresh if expired)
       2. Sync all courses (upsert)
-      3. For each course, fetch ALL material types in parallel from Google API.
-      4. Idempotent Delta Sync: Only process and save items that don't exist in DB.
+      3. Courses are processed concurrently (FULL_SYNC_COURSE_CONCURRENCY at a
+         time); each streams ALL material types in parallel from Google API,
+         page by page (every page is fetched, following nextPageToken).
+      4. Incremental Delta Sync: only items updated since the course's last
+         sync (updateTime watermark) are fetched; new ones are inserted and
+         edited ones refresh their document (one bulk lookup and one commit
+         per page). ``full_refresh=true`` ignores the watermarks.
     """
 
     # ── Step 1: Token ─────────────────────────────
@@ -338,147 +291,50 @@ async def full_sync(
         raise HTTPException(status_code=401, detail="Could not get valid access token. Please login again.")
 
     # ── Step 2: Sync courses ───────────────────────
-    courses_data = await google_service.fetch_courses(access_token)
+    courses_data = await _fetch_courses_or_502(access_token)
     if not courses_data:
         return {"success": True, "message": "No courses found in Google Classroom", "courses": {}, "documents": {}}
 
-    courses_new = 0
-    courses_updated = 0
-    synced_courses = []   # list of {course_id, classroom_id, course_title} for document syncing
-
-    for course_data in courses_data:
-        classroom_id = course_data.get("id")
-        title = course_data.get("name", "Untitled Course")
-
-        existing = await crud.get_course_by_classroom_id(db, classroom_id)
-        if existing:
-            await crud.update_course(db, existing, title)
-            # 🔥 THE FIX: Always ensure the user is linked, even if course existed!
-            await crud.link_user_to_course(db, user_id, existing.id) 
-            courses_updated += 1
-            synced_courses.append({"course_id": existing.id, "classroom_id": classroom_id, "course_title": title})
-        else:
-            # 🔥 THE FIX: Remove user_id from create parameter
-            new_course = await crud.create_course(
-                db=db, classroom_id=classroom_id, title=title
-            )
-            await crud.link_user_to_course(db, user_id, new_course.id)
-            courses_new += 1
-            synced_courses.append({"course_id": new_course.id, "classroom_id": classroom_id, "course_title": title})
-
-    # ── Step 3: Parallel Fetch & Delta Sync for documents ─────
-    docs_materials = 0
-    docs_announcements = 0
-    docs_coursework = 0
-    docs_skipped = 0
-    new_drive_doc_ids = []
-    new_material_doc_ids = []
-    new_material_course_map = {}
-    new_material_docs = []
+    upserted = await crud.upsert_courses_for_user(
+        db,
+        user_id,
+        [(course_data.get("id"), course_data.get("name", "Untitled Course")) for course_data in courses_data],
+    )
+    courses_new = sum(1 for _, is_new in upserted if is_new)
+    courses_updated = len(upserted) - courses_new
+    # list of {course_id, classroom_id, course_title} for document syncing
+    synced_courses = [
+        {"course_id": course.id, "classroom_id": course.classroom_id, "course_title": course.title}
+        for course, _ in upserted
+    ]
+
+    # ── Step 3: Concurrent per-course Fetch & Delta Sync for documents ─────
+    allowed_course_ids = None
     auto_summary_doc_ids = []
     auto_quiz_doc_ids = []
-    allowed_course_ids = None
 
     if selected_course_ids is not None:
         allowed_course_ids = {int(course_id) for course_id in selected_course_ids if course_id}
 
-    for course_sync in synced_courses:
-        db_course_id = course_sync["course_id"]
-        classroom_id = course_sync["classroom_id"]
-        course_title = course_sync["course_title"]
-        
-        
-        materials_list, announcements_list, coursework_list = await asyncio.gather(
-            google_service.fetch_course_materials(classroom_id, access_token),
-            google_service.fetch_announcements(classroom_id, access_token),
-            google_service.fetch_coursework(classroom_id, access_token)
-        )
-
-        # ── 3a: Materials ──────────────────────────
-        for item in materials_list:
-            material_id = item.get("id")
-            if not material_id: continue
-
-            # Delta Check (Instantly skips if exists)
-            if await crud.get_document_by_material_id(db, material_id):
-                docs_skipped += 1
-                continue
-
-            title = item.get("title", "Untitled Material")
-            drive_url = google_service.extract_drive_url(item.get("materials", []))
-
-            new_doc = await crud.create_document(
-                db=db, course_id=db_course_id, classroom_material_id=material_id,
-                title=title, doc_type="material", google_drive_url=drive_url,
-                raw_text=item.get("description")
-            )
-            new_material_doc_ids.append(new_doc.id)
-            new_material_course_map[new_doc.id] = db_course_id
-            new_material_docs.append({
-                "id": new_doc.id,
-                "title": new_doc.title,
-                "course_id": new_doc.course_id,
-                "course_title": course_title,
-                "doc_type": new_doc.doc_type,
-            })
-            if drive_url: new_drive_doc_ids.append(new_doc.id)
-            docs_materials += 1
-
-        # ── 3b: Announcements ──────────────────────
-        for item in announcements_list:
-            material_id = item.get("id")
-            if not material_id: continue
-
-            # Delta Check
-            if await crud.get_document_by_material_id(db, material_id):
-                docs_skipped += 1
-                continue
-
-            raw_text = item.get("text", "")
-            title = raw_text[:200] if raw_text else "Untitled Announcement"
-            drive_url = google_service.extract_drive_url(item.get("materials", []))
-
-            await crud.create_document(
-                db=db, course_id=db_course_id, classroom_material_id=material_id,
-                title=title, doc_type="announcement", google_drive_url=drive_url,
-                raw_text=raw_text   
-            )
-            docs_announcements += 1
-
-        # ── 3c: Coursework (Drive-attached only) ───
-        for item in coursework_list:
-            material_id = item.get("id")
-            if not material_id: continue
-
-            # Delta Check
-            if await crud.get_document_by_material_id(db, material_id):
-                docs_skipped += 1
-                continue
-
-            title = item.get("title", "Untitled Assignment")
-            drive_url = google_service.extract_drive_url(item.get("materials", []))
-            due_date_obj = google_service._parse_google_due_date(
-                item.get("dueDate"), 
-                item.get("dueTime")
-            )
-            new_doc = await crud.create_document(
-                db=db, 
-                course_id=db_course_id, 
-                classroom_material_id=material_id,
-                title=title, 
-                doc_type="coursework", 
-                google_drive_url=drive_url,
-                raw_text=item.get("description"), # raw_text is populated here!
-                due_date=due_date_obj             # ⚡ FIX: Passing the parsed date!
-            )
-            if drive_url: new_drive_doc_ids.append(new_doc.id)
-            docs_coursework += 1
-
-    # ── Step 4: Schedule background indexing for new Drive documents ──────
-    if new_drive_doc_ids:
-        background_tasks.add_task(_background_index_documents, new_drive_doc_ids, user_id)
-        print(f"📋 Scheduled background indexing for {len(new_drive_doc_ids)} Drive document(s)")
-
+    semaphore = asyncio.Semaphore(max(1, settings.FULL_SYNC_COURSE_CONCURRENCY))
+    course_results = await asyncio.gather(*(
+        _sync_course_documents(course_sync, access_token, semaphore, full_refresh) for course_sync in synced_courses
+    ))
+
+    docs_materials = sum(r["materials"] for r in course_results)
+    docs_announcements = sum(r["announcements"] for r in course_results)
+    docs_coursework = sum(r["coursework"] for r in course_results)
+    docs_skipped = sum(r["skipped"] for r in course_results)
+    docs_updated = sum(r["updated"] for r in course_results)
+    incomplete_course_ids = [
+        course_sync["course_id"] for course_sync, r in zip(synced_courses, course_results) if r["failed"]
+    ]
+    new_drive_doc_ids = [doc_id for r in course_results for doc_id in r["drive_doc_ids"]]
+    new_material_docs = [doc for r in course_results for doc in r["material_docs"]]
+    new_material_doc_ids = [doc["id"] for doc in new_material_docs]
+    new_material_course_map = {doc["id"]: doc["course_id"] for doc in new_material_docs}
+
+    # ── Step 4: Queue one study-pack job per document (index / summary / quiz) ──
     new_material_doc_ids_for_auto = (
         [doc_id for doc_id in new_material_doc_ids if allowed_course_ids is None or new_material_course_map.get(doc_id) in allowed_course_ids]
         if new_material_doc_ids
@@ -510,8 +366,6 @@ async def full_sync(
             candidate_ids = list({*missing_summary_ids, *new_material_doc_ids_for_auto})
             if candidate_ids:
                 auto_summary_doc_ids = candidate_ids
-                background_tasks.add_task(_background_auto_summarize_materials, candidate_ids, user_id)
-                print(f"📋 Scheduled auto-summary for {len(candidate_ids)} material document(s)")
 
     if settings.AUTO_GENERATE_QUIZZES:
         course_ids = [course_sync["course_id"] for course_sync in synced_courses]
@@ -537,8 +391,11 @@ async def full_sync(
             candidate_ids = list({*missing_quiz_ids, *new_material_doc_ids_for_auto})
             if candidate_ids:
                 auto_quiz_doc_ids = candidate_ids
-                background_tasks.add_task(_background_auto_generate_quizzes, candidate_ids, user_id)
-                print(f"📋 Scheduled auto-quiz for {len(candidate_ids)} material document(s)")
+
+    study_pack_doc_ids = list(dict.fromkeys([*new_drive_doc_ids, *auto_summary_doc_ids, *auto_quiz_doc_ids]))
+    if study_pack_doc_ids:
+        queued = await enqueue_jobs(db, STUDY_PACK, study_pack_doc_ids, user_id)
+        print(f"📋 Queued study packs for {len(queued)} document(s)")
 
     # ── Step 5: Return summary ─────────────────────────────────────────────
     total_docs_new = docs_materials + docs_announcements + docs_coursework
@@ -556,7 +413,9 @@ async def full_sync(
             "announcements_added": docs_announcements,
             "coursework_added": docs_coursework,
             "total_new": total_docs_new,
-            "skipped_already_exist": docs_skipped
+            "updated": docs_updated,
+            "skipped_already_exist": docs_skipped,
+            "incomplete_course_ids": incomplete_course_ids,
         },
         "new_materials": new_material_docs,
         "auto_summary": {
@@ -0,0 +1,40 @@
+"""
+Gunicorn config: uvicorn workers sharing preloaded model weights.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+With ``preload_app`` the app is imported once in the master.  ``when_ready``
+(which runs before any worker is forked) then loads PRELOAD_MODELS and
+freezes the GC so the loaded objects stay in the permanent generation;
+workers share those pages copy-on-write instead of each loading their own
+copy of the weights.
+
+Environment:
+  WEB_CONCURRENCY   number of workers (default 2, see Core/config.py)
+  BIND              listen address (default 0.0.0.0:8000)
+  GUNICORN_TIMEOUT  worker timeout in seconds (default 120)
+"""
+
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Core.config import settings  # noqa: E402
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# Shared with the essay grader's thread sizing (see auto_thread_count).
+workers = max(1, settings.WEB_CONCURRENCY)
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = True
+
+
+def when_ready(server):
+    from services.warmup_service import preload_shared_models
+
+    preload_shared_models()
+    # Keep the collector from touching (and so un-sharing) the preloaded objects.
+    gc.freeze()
+    server.log.info("Shared models preloaded; forking %s workers", workers)
@@ -57,15 +57,26 @@ async def startup_event():
     print("All tables created successfully!")
     from services.cleanup_service import cleanup_loop
     app.state.cleanup_task = asyncio.create_task(cleanup_loop())
+    if settings.JOB_WORKER_ENABLED:
+        import services.sync_jobs  # noqa: F401  (registers the job handlers)
+        from services.job_queue import job_worker_loop
+        app.state.job_worker_task = asyncio.create_task(job_worker_loop())
+    from services.warmup_service import start_warmup
+    app.state.warmup_task = await start_warmup()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    task = getattr(app.state, "cleanup_task", None)
-    if task:
-        task.cancel()
-        with suppress(asyncio.CancelledError):
-            await task
+    for name in ("warmup_task", "cleanup_task", "job_worker_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    from services.extraction_worker import shutdown_extraction_pool
+    shutdown_extraction_pool()
+    from services.http_client import close_http_client
+    await close_http_client()
 
 app.include_router(login.router, prefix="/api/login", tags=["Authentication"])
 app.include_router(courses.router, prefix="/api/courses", tags=["Courses"])
@@ -81,6 +92,21 @@ async def root():
     return {"name": "Yousef"}
 
 
+@app.get("/health")
+async def health():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: 200 once model warmup has finished, 503 while it is running."""
+    from services.warmup_service import readiness
+
+    state = readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+
 @app.get("/test-auth")
 async def test_auth(request: Request):
     is_authenticated = await google_auth.check_authenticated_session(request)
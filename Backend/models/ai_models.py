@@ -18,6 +18,7 @@ class ChatRequest(BaseModel):
 
 class SourceSnippet(BaseModel):
     page: Optional[int] = None
+    section: Optional[str] = None
     snippet: str
 
 
@@ -113,6 +114,20 @@ class EvaluateRequest(BaseModel):
     key_points: Optional[List[str]] = None
 
 
+class EvaluateBatchItem(BaseModel):
+    student_summary: str = Field(min_length=1)
+    student_id: Optional[str] = None   # caller's label, echoed back in results
+
+
+class EvaluateBatchRequest(BaseModel):
+    """Evaluate many student summaries against the same lecture / document."""
+    summaries: List[EvaluateBatchItem] = Field(min_length=1)
+    lecture_text: Optional[str] = None
+    document_id: Optional[int] = None
+    reference_summary: Optional[str] = None
+    key_points: Optional[List[str]] = None
+
+
 class MetricScore(BaseModel):
     score: float
     feedback: str
@@ -135,6 +150,18 @@ class EssayGradeRequest(BaseModel):
     question: Optional[str] = None
 
 
+class EssayBatchItem(BaseModel):
+    essay_text: str = Field(min_length=1)
+    question: Optional[str] = None
+    essay_id: Optional[str] = None   # caller's label, echoed back in results
+
+
+class EssayBatchGradeRequest(BaseModel):
+    """Grade a whole set of essays; *question* applies to items without their own."""
+    essays: List[EssayBatchItem] = Field(min_length=1)
+    question: Optional[str] = None
+
+
 class EssayGradeResponse(BaseModel):
     predicted_band: float
     raw_band: float
@@ -143,6 +170,7 @@ class EssayGradeResponse(BaseModel):
     ordinal_threshold: float
     word_count: int
     model_path: str
+    windows: int = 1
 
 
 # ── Document Indexing ────────────────────────────────────────────────────────
@@ -0,0 +1,121 @@
+"""Benchmark essay grader throughput across threading / grad-mode settings.
+
+Loads the grader once, then for every combination of intra-op thread count,
+``torch.inference_mode`` on/off and batch size grades the sample essays a
+few times and reports essays/second.  The fastest setting is printed as the
+ESSAY_GRADER_THREADS / ESSAY_GRADER_INFERENCE_MODE / ESSAY_BATCH_MAX_SIZE
+values to put in the environment:
+
+    python scripts/benchmark_essay_grader.py
+    python scripts/benchmark_essay_grader.py --jsonl essays.jsonl --threads 1 2 4 8 --batch-sizes 4 16
+
+Run it with the same WEB_CONCURRENCY as production: each worker gets its
+own share of the cores, so one process should be measured with that share.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Allow ``python scripts/benchmark_essay_grader.py`` from the Backend directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.essay_grader_service import (  # noqa: E402
+    EssayGrader,
+    GraderConfig,
+    _resolve_model_path,
+    auto_thread_count,
+    configure_torch_threads,
+)
+
+_SAMPLE_ESSAY = (
+    "Some people believe that governments should spend more money on public libraries, "
+    "while others think that this money would be better spent on online resources. "
+    "In my opinion, both have a role to play. Libraries provide a quiet place to study "
+    "and free access to books for people who cannot afford them, and they also act as "
+    "community centres. On the other hand, online resources can reach far more people "
+    "at a lower cost and are available at any time. Therefore, I believe a balanced "
+    "approach is the most sensible use of public funds."
+)
+
+
+def _load_essays(path: Optional[str], count: int) -> List[str]:
+    if not path:
+        return [_SAMPLE_ESSAY] * count
+    essays = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                essays.append(record.get("essay") or record.get("essay_text") or "")
+    return essays[:count]
+
+
+def _throughput(grader: EssayGrader, essays: List[str], batch_size: int, repeats: int) -> float:
+    grader.predict_batch(essays[:batch_size])  # warm this configuration
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for start in range(0, len(essays), batch_size):
+            grader.predict_batch(essays[start:start + batch_size])
+    return repeats * len(essays) / max(time.perf_counter() - started, 1e-9)
+
+
+def benchmark(
+    model_path: Optional[str],
+    backend: str,
+    jsonl: Optional[str],
+    count: int,
+    threads: List[int],
+    batch_sizes: List[int],
+    repeats: int,
+) -> None:
+    essays = _load_essays(jsonl, count)
+    grader = EssayGrader(GraderConfig(model_path=model_path or _resolve_model_path(), backend=backend))
+    if grader._ort_session is not None:
+        raise SystemExit("Thread tuning applies to the torch backends; the ONNX session fixes its threads at load.")
+
+    print(f"{len(essays)} essays, backend={backend}, auto threads={auto_thread_count()}")
+    print(f"{'threads':>7} {'inference_mode':>14} {'batch':>5} {'essays/s':>9}")
+    best = None
+    for n_threads in threads:
+        configure_torch_threads(n_threads, grader.config.inter_op_threads)
+        for inference_mode in (True, False):
+            grader.config.use_inference_mode = inference_mode
+            for batch_size in batch_sizes:
+                rate = _throughput(grader, essays, batch_size, repeats)
+                print(f"{n_threads:>7} {str(inference_mode):>14} {batch_size:>5} {rate:>9.2f}")
+                if best is None or rate > best[0]:
+                    best = (rate, n_threads, inference_mode, batch_size)
+
+    rate, n_threads, inference_mode, batch_size = best
+    print(
+        f"\nBest: {rate:.2f} essays/s — ESSAY_GRADER_THREADS={n_threads} "
+        f"ESSAY_GRADER_INFERENCE_MODE={inference_mode} ESSAY_BATCH_MAX_SIZE={batch_size}"
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark essay grader threading settings")
+    parser.add_argument("--model-path", default=None, help="Fine-tuned model directory (default: auto-resolved)")
+    parser.add_argument("--backend", default="torch", choices=["torch", "torch-int8"])
+    parser.add_argument("--jsonl", default=None, help="JSONL file with essay/essay_text (default: a sample essay)")
+    parser.add_argument("--count", type=int, default=32, help="Essays per run")
+    parser.add_argument("--threads", type=int, nargs="*", default=None,
+                        help="Intra-op thread counts to try (default: 1, 2, 4, ... up to the auto count)")
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[1, 8, 16])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    thread_counts = args.threads
+    if not thread_counts:
+        limit = auto_thread_count()
+        thread_counts = sorted({min(2 ** i, limit) for i in range(limit.bit_length() + 1)})
+
+    benchmark(args.model_path, args.backend, args.jsonl, args.count, thread_counts, args.batch_sizes, args.repeats)
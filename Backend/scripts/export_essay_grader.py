@@ -0,0 +1,174 @@
+"""Export the fine-tuned essay grader to ONNX (optionally int8) and check parity.
+
+Writes ``<model_path>/onnx/model.onnx`` (and ``model.int8.onnx`` with
+``--quantize``), then grades a few sample essays with the PyTorch model and
+each exported file (plus in-process torch int8 quantization), reporting the max absolute logit difference and how many
+decoded bands agree.  A checkpoint has either a regression or an ordinal
+head; the other objective is checked too, by exporting the same encoder with
+a freshly initialised head of that kind to a temporary directory (fp32 only:
+an untrained ordinal head sits on its thresholds, so int8 noise flips bands):
+
+    python scripts/export_essay_grader.py
+    python scripts/export_essay_grader.py --quantize --samples essays.jsonl
+
+Select the exported model at runtime with ESSAY_GRADER_BACKEND=onnx or
+ESSAY_GRADER_BACKEND=onnx-int8.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import torch
+
+# Allow ``python scripts/export_essay_grader.py`` from the Backend directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.essay_grader_service import (  # noqa: E402
+    BAND_STEP,
+    MAX_BAND,
+    EssayGrader,
+    GraderConfig,
+    _resolve_model_path,
+    default_onnx_path,
+)
+
+ONNX_OPSET = 17
+
+# Labels of each head: one regression output, or one threshold per band step.
+OBJECTIVE_LABELS = {"regression": 1, "ordinal": int(MAX_BAND / BAND_STEP)}
+
+_DEFAULT_SAMPLES = [
+    "Technology has changed the way students learn. Online courses give access to "
+    "material anywhere, although some learners miss the discipline of a classroom.",
+    "I think that cities should invest more in public transport because it reduces "
+    "traffic and pollution, and it helps people who cannot afford a car.",
+    "Some people believe that university education should be free. In my opinion "
+    "the benefits for society outweigh the costs, since educated citizens contribute "
+    "more in taxes and innovation over their lifetimes.",
+]
+
+
+def export_onnx(model_path: str, output: str) -> None:
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+
+    dummy = tokenizer(["An example essay.", "Another, slightly longer example essay."],
+                      return_tensors="pt", padding=True)
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            output,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+        )
+    print(f"✅ Exported ONNX essay grader: {output}")
+
+
+def quantize_onnx(source: str, target: str) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    print(f"✅ Quantized ONNX essay grader: {target}")
+
+
+def _load_samples(path: Optional[str]) -> List[str]:
+    if not path:
+        return list(_DEFAULT_SAMPLES)
+    samples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                samples.append(record.get("essay") or record.get("essay_text") or "")
+    return samples
+
+
+def check_parity(model_path: str, backend: str, onnx_path: Optional[str], samples: List[str]) -> bool:
+    """Compare *backend* against the fp32 PyTorch grader on *samples*."""
+    reference = EssayGrader(GraderConfig(model_path=model_path, device="cpu"))
+    candidate = EssayGrader(GraderConfig(model_path=model_path, backend=backend, onnx_path=onnx_path))
+
+    ref_logits = reference._forward_logits_batch(samples)
+    cand_logits = candidate._forward_logits_batch(samples)
+    max_diff = float((ref_logits.float() - cand_logits.float()).abs().max())
+
+    agree = sum(
+        reference._build_result(ref_logits[i], essay).predicted_band
+        == candidate._build_result(cand_logits[i], essay).predicted_band
+        for i, essay in enumerate(samples)
+    )
+    print(
+        f"📊 {backend} ({reference.objective}): max |Δlogit| = {max_diff:.5f}, "
+        f"bands agree {agree}/{len(samples)}"
+    )
+    return agree == len(samples)
+
+
+def other_head_checkpoint(model_path: str, workdir: str) -> str:
+    """Save *model_path*'s encoder with a fresh head of the other objective under *workdir*."""
+    from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+    num_labels = int(getattr(AutoConfig.from_pretrained(model_path), "num_labels", 1))
+    objective = "regression" if num_labels > 1 else "ordinal"
+    target = str(Path(workdir) / objective)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_path,
+        num_labels=OBJECTIVE_LABELS[objective],
+        ignore_mismatched_sizes=True,
+    )
+    model.save_pretrained(target)
+    AutoTokenizer.from_pretrained(model_path).save_pretrained(target)
+    return target
+
+
+def export_and_check(model_path: str, quantize: bool, samples: List[str]) -> bool:
+    fp32_path = default_onnx_path(model_path)
+    export_onnx(model_path, fp32_path)
+
+    checks = [("onnx", fp32_path)]
+    if quantize:
+        int8_path = default_onnx_path(model_path, quantized=True)
+        quantize_onnx(fp32_path, int8_path)
+        checks.append(("onnx-int8", int8_path))
+        checks.append(("torch-int8", None))
+
+    return all([check_parity(model_path, backend, path, samples) for backend, path in checks])
+
+
+def main(model_path: Optional[str], quantize: bool, samples_path: Optional[str]) -> int:
+    model_path = model_path or _resolve_model_path()
+    samples = _load_samples(samples_path)
+    ok = export_and_check(model_path, quantize, samples)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        ok = export_and_check(other_head_checkpoint(model_path, workdir), False, samples) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the essay grader to ONNX and check parity")
+    parser.add_argument("--model-path", default=None, help="Fine-tuned model directory (default: auto-resolved)")
+    parser.add_argument("--quantize", action="store_true", help="Also write a dynamically int8-quantized model")
+    parser.add_argument("--samples", default=None, help="JSONL file with essay/essay_text for the parity check")
+    args = parser.parse_args()
+
+    sys.exit(main(args.model_path, args.quantize, args.samples))
@@ -0,0 +1,100 @@
+"""Bulk-grade essays with the fine-tuned essay grader.
+
+Reads essays from a JSONL file (one object per line with ``essay`` or
+``essay_text`` and optional ``id`` / ``question``) and/or PDF files (one
+essay per file), sorts them by token length and grades them in batches.
+Results are written as JSONL in completion order:
+
+    python scripts/grade_essays.py --jsonl essays.jsonl --output grades.jsonl
+    python scripts/grade_essays.py --pdf submissions/*.pdf --question "..."
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Allow ``python scripts/grade_essays.py`` from the Backend directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.essay_grader_service import iter_grade_essays  # noqa: E402
+
+
+def _load_jsonl(path: str, default_question: Optional[str]) -> List[Tuple[str, str, Optional[str]]]:
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            essay = record.get("essay") or record.get("essay_text") or ""
+            essay_id = str(record.get("id", f"{Path(path).name}:{line_no}"))
+            items.append((essay_id, essay, record.get("question") or default_question))
+    return items
+
+
+def _load_pdfs(paths: List[str], default_question: Optional[str]) -> List[Tuple[str, str, Optional[str]]]:
+    from services.pdf_processor import extract_text_from_pdf
+
+    return [(path, extract_text_from_pdf(path), default_question) for path in paths]
+
+
+def grade_essays(
+    jsonl: Optional[str],
+    pdfs: List[str],
+    question: Optional[str],
+    batch_size: Optional[int],
+    output: Optional[str],
+) -> None:
+    items = []
+    if jsonl:
+        items.extend(_load_jsonl(jsonl, question))
+    if pdfs:
+        items.extend(_load_pdfs(pdfs, question))
+    if not items:
+        print("No essays to grade.", file=sys.stderr)
+        return
+
+    ids = [essay_id for essay_id, _, _ in items]
+    essays = [essay for _, essay, _ in items]
+    questions = [q for _, _, q in items]
+
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    started = time.perf_counter()
+    graded = failed = 0
+    try:
+        for index, outcome in iter_grade_essays(essays, questions, batch_size=batch_size):
+            if "error" in outcome:
+                failed += 1
+            else:
+                graded += 1
+            out.write(json.dumps({"id": ids[index], **outcome}) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Graded {graded} essays ({failed} failed) in {elapsed:.1f}s "
+        f"({graded / max(elapsed, 1e-9):.1f} essays/s).",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk-grade essays (JSONL and/or PDFs)")
+    parser.add_argument("--jsonl", default=None, help="JSONL file with essay/essay_text, id, question")
+    parser.add_argument("--pdf", nargs="*", default=[], help="PDF files, one essay each")
+    parser.add_argument("--question", default=None, help="Question used when an essay has none")
+    parser.add_argument("--batch-size", type=int, default=None, help="Essays per forward pass")
+    parser.add_argument("--output", default=None, help="Write JSONL results here instead of stdout")
+    args = parser.parse_args()
+
+    grade_essays(args.jsonl, args.pdf, args.question, args.batch_size, args.output)
@@ -0,0 +1,86 @@
+"""
+Helpers for bridging blocking code into the event loop and combining
+async streams.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def iterate_in_thread(make_iterator: Callable[[], Iterator[T]]) -> AsyncIterator[T]:
+    """Drive a blocking iterator in a worker thread and yield its items here.
+
+    Items are handed over through an ``asyncio.Queue`` as soon as they are
+    produced.  If the consumer stops early (e.g. the client disconnected) the
+    worker stops after its current item.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def _pump() -> None:
+        try:
+            for item in make_iterator():
+                loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+                if stop.is_set():
+                    break
+        except BaseException as exc:  # re-raised in the consumer
+            loop.call_soon_threadsafe(queue.put_nowait, (_DONE, exc))
+            return
+        loop.call_soon_threadsafe(queue.put_nowait, (_DONE, None))
+
+    worker = loop.run_in_executor(None, _pump)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                break
+            yield item
+    finally:
+        stop.set()
+    await worker
+
+
+async def merge_async_iterators(streams: Dict[str, AsyncIterator[Any]]) -> AsyncIterator[Tuple[str, Any]]:
+    """Consume several async iterators concurrently, yielding ``(name, item)`` as items arrive.
+
+    Each stream runs in its own task and hands items over through a small
+    bounded queue, so producers stay at most a couple of items ahead of the
+    consumer.  An exception in any stream is re-raised here; stopping early
+    cancels the remaining streams.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, len(streams)))
+
+    async def _pump(name: str, iterator: AsyncIterator[Any]) -> None:
+        try:
+            async for item in iterator:
+                await queue.put((name, item, None))
+        except Exception as exc:  # re-raised in the consumer
+            await queue.put((name, _DONE, exc))
+            return
+        await queue.put((name, _DONE, None))
+
+    tasks = [asyncio.create_task(_pump(name, iterator)) for name, iterator in streams.items()]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            name, item, error = await queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                remaining -= 1
+                continue
+            yield name, item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
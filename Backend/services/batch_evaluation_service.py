@@ -0,0 +1,46 @@
+"""
+Batch summary evaluation — grade a whole class against one lecture.
+
+Instead of one ``evaluate_summary`` call per student (each with its own
+thread pool and embedder passes), the deterministic metrics for all
+summaries are computed in one vectorised pass and the coherence LLM calls
+run with bounded concurrency.  Results are yielded as soon as each student's
+coherence score arrives so the API can stream them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Dict, List, Tuple
+
+from Core.config import settings
+from services.evaluator_service import (
+    LectureArtifacts,
+    combine_scores,
+    score_coherence,
+    score_local_metrics_batch,
+)
+
+
+async def iter_batch_evaluations(
+    students: List[str],
+    lecture: LectureArtifacts,
+    concurrency: int | None = None,
+) -> AsyncIterator[Tuple[int, Dict]]:
+    """Yield ``(index, result)`` for every summary, in completion order."""
+    local_scores = await asyncio.to_thread(score_local_metrics_batch, students, lecture)
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings.EVALUATOR_BATCH_CONCURRENCY))
+
+    async def _finish(index: int) -> Tuple[int, Dict]:
+        async with semaphore:
+            coherence = await asyncio.to_thread(score_coherence, students[index])
+        return index, combine_scores({**local_scores[index], "coherence": coherence}, lecture)
+
+    tasks = [asyncio.create_task(_finish(i)) for i in range(len(students))]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away (or an error surfaced) — stop pending LLM calls.
+        for task in tasks:
+            task.cancel()
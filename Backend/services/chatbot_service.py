@@ -86,6 +86,38 @@ def _generate_conversation_title(question: str, answer: str) -> str:
     return title
 
 
+def _chunk_label(metadata: dict) -> str:
+    """Human-readable citation label, e.g. "[p. 4 · Backpropagation]"."""
+    parts = []
+    page = metadata.get("page")
+    if isinstance(page, int):
+        page_end = metadata.get("page_end")
+        if isinstance(page_end, int) and page_end != page:
+            parts.append(f"pp. {page + 1}-{page_end + 1}")
+        else:
+            parts.append(f"p. {page + 1}")
+    if metadata.get("section"):
+        parts.append(str(metadata["section"]))
+    return f"[{' · '.join(parts)}]\n" if parts else ""
+
+
+def _format_context(retrieved: List[dict]) -> str:
+    return "\n\n---\n\n".join(
+        f"{_chunk_label(d.get('metadata') or {})}{d['content']}" for d in retrieved
+    )
+
+
+def _format_sources(retrieved: List[dict]) -> List[dict]:
+    return [
+        {
+            "page": (d.get("metadata") or {}).get("page"),
+            "section": (d.get("metadata") or {}).get("section"),
+            "snippet": d["content"][:300],
+        }
+        for d in retrieved
+    ]
+
+
 def _normalize_conversation_id(conversation_id: str | None) -> str:
     if not conversation_id:
         return "default"
@@ -280,7 +312,7 @@ async def ask_tutor(
             document_text=document_text,
         )
         if retrieved:
-            context_text = "\n\n---\n\n".join(d["content"] for d in retrieved)
+            context_text = _format_context(retrieved)
         elif source_path:
             context_text = "(No chunks found for the selected document yet.)"
         else:
@@ -330,13 +362,7 @@ async def ask_tutor(
     )
 
     # 6.  Format sources
-    sources = [
-        {
-            "page": d["metadata"].get("page"),
-            "snippet": d["content"][:300],
-        }
-        for d in retrieved
-    ]
+    sources = _format_sources(retrieved)
 
     return answer, sources
 
@@ -372,7 +398,7 @@ async def ask_tutor_stream(
         else []
     )
     if retrieved:
-        context_text = "\n\n---\n\n".join(d["content"] for d in retrieved)
+        context_text = _format_context(retrieved)
     elif source_path:
         context_text = "(No chunks found for the selected document yet.)"
     else:
@@ -405,13 +431,7 @@ async def ask_tutor_stream(
         timeout_s=CHAT_TIMEOUT_S,
     )
 
-    sources = [
-        {
-            "page": d["metadata"].get("page"),
-            "snippet": d["content"][:300],
-        }
-        for d in retrieved
-    ]
+    sources = _format_sources(retrieved)
 
     return token_stream, sources
 
@@ -1,20 +1,24 @@
 """
-Time-based cleanup for cached uploaded files.
+Time-based cleanup for cached uploaded files and cache tables.
 """
 
 from __future__ import annotations
 
 import asyncio
 import os
-from datetime import datetime, timedelta
-from typing import Dict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Tuple
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from Core.config import settings
+from DB import crud
 from DB.schemas import Document
 from DB.session import AsyncSessionLocal
 
+PurgeFn = Callable[[AsyncSession, datetime], Awaitable[int]]
+
 
 def _normalize_path(path: str) -> str:
     return os.path.abspath(path)
@@ -89,11 +93,42 @@ async def cleanup_uploaded_files_once() -> Dict[str, int]:
     }
 
 
+async def _purge_older_than(delete_fn: PurgeFn, hours: float, label: str) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    async with AsyncSessionLocal() as db:
+        removed = await delete_fn(db, cutoff)
+    if removed:
+        print(f"🧹 Cleanup removed {removed} expired row(s) from {label}")
+    return removed
+
+
+# Tables purged by age (last use for caches): (table, crud delete function, retention setting).
+RETENTION_PURGES: Tuple[Tuple[str, PurgeFn, str], ...] = (
+    ("upload_artifacts", crud.delete_upload_artifacts_older_than, "UPLOAD_CACHE_RETENTION_HOURS"),
+    ("lecture_eval_artifacts", crud.delete_lecture_eval_artifacts_older_than, "EVAL_ARTIFACT_RETENTION_HOURS"),
+    ("essay_grade_cache", crud.delete_essay_grade_cache_older_than, "ESSAY_GRADE_CACHE_RETENTION_HOURS"),
+    ("drive_file_texts", crud.delete_drive_file_texts_older_than, "DRIVE_TEXT_RETENTION_HOURS"),
+    ("extraction_jobs", crud.delete_extraction_jobs_older_than, "EXTRACTION_JOB_RETENTION_HOURS"),
+)
+
+
+async def purge_expired_rows_once() -> Dict[str, int]:
+    """Run every retention purge; one that fails does not skip the others."""
+    removed = {}
+    for label, delete_fn, setting in RETENTION_PURGES:
+        try:
+            removed[label] = await _purge_older_than(delete_fn, getattr(settings, setting), label)
+        except Exception as exc:
+            print(f"⚠️  Cleanup of {label} failed: {exc}")
+    return removed
+
+
 async def cleanup_loop() -> None:
     interval_s = max(300, settings.UPLOAD_CLEANUP_INTERVAL_MINUTES * 60)
     while True:
         try:
             await cleanup_uploaded_files_once()
         except Exception as exc:
-            print(f"⚠️  Cleanup loop error: {exc}")
+            print(f"⚠️  Cleanup of uploaded files failed: {exc}")
+        await purge_expired_rows_once()
         await asyncio.sleep(interval_s)
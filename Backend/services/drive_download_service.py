@@ -1,22 +1,36 @@
 """
 Google Drive auto-download service.
+
+Before downloading, the file's Drive metadata (md5Checksum, modifiedTime) is
+fetched and turned into a content key.  Text extracted from a given Drive
+content is stored once in ``drive_file_texts``: a document whose file has
+not changed, or that attaches the same file (or an identical copy) as
+another document, reuses that text without downloading or OCR-ing it again.
+Concurrent requests for the same content share one download.
 """
 from __future__ import annotations
 import os
 import re
-import tempfile
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Optional, Tuple
 
 import httpx
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from Core.config import settings
 from DB import crud
-from services.pdf_processor import extract_text_from_pdf
+from DB.schemas import Document
+from DB.session import AsyncSessionLocal
+from services.http_client import request_with_retry
+from services.extraction_worker import run_document_extraction, single_flight, wait_for_running_extraction
+from services.pdf_processor import extract_text_from_pdf, extract_text_from_pdf_bytes
 
 _FILE_ID_RE = re.compile(r"/d/([a-zA-Z0-9_-]{10,})")
 _ID_PARAM_RE = re.compile(r"[?&]id=([a-zA-Z0-9_-]{10,})")
+_GOOGLE_APPS_MIME_PREFIX = "application/vnd.google-apps."
+_DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
 
 def extract_drive_file_id(url: str) -> Optional[str]:
     m = _FILE_ID_RE.search(url)
@@ -28,50 +42,116 @@ def extract_drive_file_id(url: str) -> Optional[str]:
 def _is_google_doc(url: str) -> bool:
     return "docs.google.com/document" in url or "docs.google.com/presentation" in url
 
+def _parse_drive_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+    except ValueError:
+        return None
+
+def drive_content_key(file_id: str, metadata: dict) -> Optional[str]:
+    """Key identifying the file's current content (None when Drive gives no version info)."""
+    if metadata.get("md5Checksum"):
+        return f"md5:{metadata['md5Checksum']}"
+    if metadata.get("modifiedTime"):
+        # Google Docs/Slides have no checksum; their export changes with modifiedTime.
+        return f"rev:{file_id}:{metadata['modifiedTime']}"
+    return None
+
+async def _fetch_drive_metadata(file_id: str, access_token: str) -> Optional[dict]:
+    try:
+        resp = await request_with_retry(
+            "GET",
+            f"{_DRIVE_FILES_URL}/{file_id}",
+            headers={"Authorization": f"Bearer {access_token}"},
+            params={"fields": "id,mimeType,md5Checksum,modifiedTime", "supportsAllDrives": "true"},
+        )
+    except httpx.TransportError as e:
+        print(f"⚠️  Drive metadata unavailable for {file_id} ({type(e).__name__}); downloading without dedup")
+        return None
+    if resp.status_code != 200:
+        # The download below reports the actual access error, if any.
+        print(f"⚠️  Drive metadata unavailable for {file_id} (HTTP {resp.status_code}); downloading without dedup")
+        return None
+    return resp.json()
+
 async def _download_bytes(file_id: str, is_gdoc: bool, access_token: str) -> bytes:
     headers = {"Authorization": f"Bearer {access_token}"}
-    async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-        if is_gdoc:
-            url = f"https://www.googleapis.com/drive/v3/files/{file_id}/export"
-            resp = await client.get(url, headers=headers, params={"mimeType": "application/pdf"})
-        else:
-            url = f"https://www.googleapis.com/drive/v3/files/{file_id}"
-            resp = await client.get(url, headers=headers, params={"alt": "media"})
+    if is_gdoc:
+        url = f"{_DRIVE_FILES_URL}/{file_id}/export"
+        params = {"mimeType": "application/pdf"}
+    else:
+        url = f"{_DRIVE_FILES_URL}/{file_id}"
+        params = {"alt": "media"}
+    resp = await request_with_retry(
+        "GET", url, headers=headers, params=params, timeout=60.0, follow_redirects=True
+    )
 
-        if resp.status_code == 401:
-            raise PermissionError("Google token expired. Please sign out and sign in again.")
-        if resp.status_code == 403:
-            raise PermissionError("Access denied to this Drive file. Make sure it is shared with your account.")
-        if resp.status_code != 200:
-            raise RuntimeError(f"Drive download failed (HTTP {resp.status_code}): {resp.text[:200]}")
+    if resp.status_code == 401:
+        raise PermissionError("Google token expired. Please sign out and sign in again.")
+    if resp.status_code == 403:
+        raise PermissionError("Access denied to this Drive file. Make sure it is shared with your account.")
+    if resp.status_code != 200:
+        raise RuntimeError(f"Drive download failed (HTTP {resp.status_code}): {resp.text[:200]}")
 
-        return resp.content
+    return resp.content
 
-def _extract_text_from_bytes(file_bytes: bytes) -> str:
-    from services.pdf_processor import extract_text_from_pdf_bytes
-    return extract_text_from_pdf_bytes(file_bytes)
+def _cache_drive_pdf(doc_id: int, file_id: str, file_bytes: bytes) -> Optional[str]:
+    try:
+        os.makedirs(settings.PDF_UPLOAD_DIR, exist_ok=True)
+        path = os.path.abspath(os.path.join(settings.PDF_UPLOAD_DIR, f"drive_{doc_id}_{file_id}.pdf"))
+        with open(path, "wb") as fh:
+            fh.write(file_bytes)
+        return path
+    except OSError as e:
+        print(f"⚠️  Could not cache Drive PDF for doc {doc_id}: {e}")
+        return None
 
 
 async def ensure_document_text(doc, db: AsyncSession) -> str:
-    """Ensure a Document has extracted text stored and return it."""
+    """Ensure a Document has extracted text stored and return it.
+
+    Parsing / OCR runs in the extraction worker pool; concurrent requests for
+    the same document share one extraction instead of each starting their own.
+    """
     if doc.raw_text and doc.raw_text.strip():
         return doc.raw_text
 
-    if doc.s3_path and os.path.exists(doc.s3_path):
-        text = extract_text_from_pdf(doc.s3_path)
-        if text and text.strip():
-            doc.raw_text = text
-            await db.commit()
-            await db.refresh(doc)
-            return text
+    text = await wait_for_running_extraction(db, doc)
+    if text:
+        return text
 
-    if not doc.google_drive_url:
-        raise ValueError("Document has no Drive URL or local file.")
+    text = await single_flight(f"doc:{doc.id}", lambda: _extract_document_text(doc.id))
+    # The shared extraction stored the text through its own session.
+    await db.refresh(doc)
+    return text
+
+
+async def _extract_document_text(doc_id: int) -> str:
+    """Extract and store one document's text in a session owned by the shared flight.
+
+    The flight outlives whichever request started it, so it must not use
+    that request's session or ORM objects.
+    """
+    async with AsyncSessionLocal() as db:
+        doc = await db.get(Document, doc_id)
+        if doc is None:
+            raise ValueError(f"Document {doc_id} no longer exists.")
+        return await _extract_and_store_text(doc, db)
+
+
+async def _extract_local_text(doc, db: AsyncSession) -> Optional[str]:
+    text = await run_document_extraction(db, doc.id, "local", extract_text_from_pdf, doc.s3_path)
+    if not text or not text.strip():
+        return None
+    doc.raw_text = text
+    await db.commit()
+    await db.refresh(doc)
+    return text
 
-    file_id = extract_drive_file_id(doc.google_drive_url)
-    if not file_id:
-        raise ValueError(f"Cannot extract Drive file ID from URL: {doc.google_drive_url}")
 
+async def _drive_access_token(doc, db: AsyncSession) -> str:
     from DB.schemas import UserCourse
     result = await db.execute(select(UserCourse).where(UserCourse.course_id == doc.course_id))
     user_course = result.scalars().first()
@@ -79,7 +159,6 @@ async def ensure_document_text(doc, db: AsyncSession) -> str:
         raise ValueError("No users are enrolled in this course. Cannot authorize download.")
 
     linked_user_id = user_course.user_id
-    is_gdoc = _is_google_doc(doc.google_drive_url)
 
     access_token = await crud.get_valid_access_token(
         db=db,
@@ -89,15 +168,116 @@ async def ensure_document_text(doc, db: AsyncSession) -> str:
     )
     if not access_token:
         raise PermissionError("Could not obtain a valid Google access token. Please sign in again.")
+    return access_token
+
 
+def _same_drive_content(doc, file_id: str, metadata: dict) -> bool:
+    """Whether *doc*'s stored text (and cached PDF) came from this version of the file."""
+    if doc.drive_file_id != file_id:
+        return False
+    if metadata.get("md5Checksum"):
+        return doc.drive_md5_checksum == metadata["md5Checksum"]
+    recorded = doc.drive_modified_time
+    if recorded is not None and recorded.tzinfo is None:
+        recorded = recorded.replace(tzinfo=timezone.utc)
+    return recorded is not None and recorded == _parse_drive_time(metadata.get("modifiedTime"))
+
+
+async def _extract_and_store_text(doc, db: AsyncSession) -> str:
+    has_local_file = bool(doc.s3_path and os.path.exists(doc.s3_path))
+    if not doc.google_drive_url:
+        text = await _extract_local_text(doc, db) if has_local_file else None
+        if text:
+            return text
+        raise ValueError("Document has no Drive URL or local file.")
+
+    file_id = extract_drive_file_id(doc.google_drive_url)
+    if not file_id:
+        raise ValueError(f"Cannot extract Drive file ID from URL: {doc.google_drive_url}")
+
+    try:
+        access_token = await _drive_access_token(doc, db)
+    except (ValueError, PermissionError):
+        text = await _extract_local_text(doc, db) if has_local_file else None
+        if text:
+            return text
+        raise
+
+    metadata = await _fetch_drive_metadata(file_id, access_token) or {}
+    mime_type = metadata.get("mimeType")
+    is_gdoc = mime_type.startswith(_GOOGLE_APPS_MIME_PREFIX) if mime_type else _is_google_doc(doc.google_drive_url)
+    content_key = drive_content_key(file_id, metadata)
+
+    if content_key:
+        entry = await crud.get_drive_file_text(db, content_key)
+        if entry:
+            print(f"⚡ DRIVE TEXT CACHE HIT: doc {doc.id} reuses {content_key}")
+            await crud.touch_drive_file_text(db, entry)
+            return await _store_drive_text(doc, db, entry.raw_text, file_id, metadata)
+
+    # The locally cached PDF is only trusted while the Drive file is unchanged
+    # (or when Drive cannot tell us).
+    if has_local_file and (not content_key or _same_drive_content(doc, file_id, metadata)):
+        text = await _extract_local_text(doc, db)
+        if text:
+            return text
+
+    text, file_bytes = await single_flight(
+        f"drive:{content_key or file_id}",
+        lambda: _download_and_extract(doc.id, file_id, is_gdoc, access_token, content_key, metadata),
+    )
+
+    # Keep the PDF cached locally so indexing can chunk it by layout
+    # (cleanup_service clears s3_path again once the cache expires).
+    cached_path = _cache_drive_pdf(doc.id, file_id, file_bytes)
+    if cached_path:
+        doc.s3_path = cached_path
+    return await _store_drive_text(doc, db, text, file_id, metadata)
+
+
+async def _download_and_extract(
+    doc_id: int,
+    file_id: str,
+    is_gdoc: bool,
+    access_token: str,
+    content_key: Optional[str],
+    metadata: dict,
+) -> Tuple[str, bytes]:
+    """Download and extract one Drive file in a session owned by the shared flight.
+
+    Every document with the same content awaits this flight, so it must not
+    use any of their sessions.
+    """
     file_bytes = await _download_bytes(file_id, is_gdoc, access_token)
-    text = _extract_text_from_bytes(file_bytes)
-    if not text or not text.strip():
-        print(f"⚠️  No extractable text found in Drive document (id={file_id}), "
-              "even after OCR fallback. The document may be a non-text file.")
-        raise ValueError("No extractable text found in Drive document.")
+    async with AsyncSessionLocal() as db:
+        text = await run_document_extraction(db, doc_id, "drive", extract_text_from_pdf_bytes, file_bytes)
+        if not text or not text.strip():
+            print(f"⚠️  No extractable text found in Drive document (id={file_id}), "
+                  "even after OCR fallback. The document may be a non-text file.")
+            raise ValueError("No extractable text found in Drive document.")
+
+        if content_key:
+            try:
+                await crud.create_drive_file_text(
+                    db,
+                    content_key=content_key,
+                    drive_file_id=file_id,
+                    md5_checksum=metadata.get("md5Checksum"),
+                    modified_time=_parse_drive_time(metadata.get("modifiedTime")),
+                    mime_type=metadata.get("mimeType"),
+                    raw_text=text,
+                )
+            except IntegrityError:
+                # Another worker stored the same content first.
+                await db.rollback()
+    return text, file_bytes
+
 
+async def _store_drive_text(doc, db: AsyncSession, text: str, file_id: str, metadata: dict) -> str:
     doc.raw_text = text
+    doc.drive_file_id = file_id
+    doc.drive_md5_checksum = metadata.get("md5Checksum")
+    doc.drive_modified_time = _parse_drive_time(metadata.get("modifiedTime"))
     await db.commit()
     await db.refresh(doc)
-    return text
\ No newline at end of file
+    return text
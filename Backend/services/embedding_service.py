@@ -0,0 +1,141 @@
+"""
+Shared sentence-embedding backend — all-MiniLM-L6-v2 on ONNX Runtime.
+
+The evaluator used to load ``SentenceTransformer("all-MiniLM-L6-v2")`` (and
+with it torch) while the Chroma vector store already ran the same model via
+onnxruntime.  Both now go through this module, so a worker loads one model.
+
+The model files are the ones Chroma's default embedding function downloads
+(``~/.cache/chroma/onnx_models/all-MiniLM-L6-v2/onnx``); vectors match
+sentence-transformers: mean pooling over the attention mask, L2-normalised,
+256 token limit.  Unlike Chroma's implementation, batches are padded to the
+longest text instead of always to 256 tokens, and texts are length-sorted
+before batching.
+
+Settings:
+  EMBEDDING_THREADS     → onnxruntime intra-op threads (0 = runtime default)
+  EMBEDDING_QUANTIZE    → use a dynamically int8-quantized copy of the model
+  EMBEDDING_BATCH_SIZE  → texts per forward pass
+"""
+
+from __future__ import annotations
+
+import os
+from threading import Lock
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from Core.config import settings
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+MAX_TOKENS = 256
+
+EMBEDDER_NAME = f"{MODEL_NAME}-onnx" + ("-int8" if settings.EMBEDDING_QUANTIZE else "")
+
+_embedder: Optional["OnnxEmbedder"] = None
+_embedder_lock = Lock()
+
+
+def _model_dir() -> str:
+    """Return the directory holding model.onnx / tokenizer.json, downloading once."""
+    from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+    default_ef = ONNXMiniLM_L6_V2()
+    default_ef._download_model_if_not_exists()
+    return os.path.join(default_ef.DOWNLOAD_PATH, default_ef.EXTRACTED_FOLDER_NAME)
+
+
+def _quantized_model_path(model_dir: str) -> str:
+    """Dynamically quantize the weights to int8 once and reuse the result."""
+    source = os.path.join(model_dir, "model.onnx")
+    target = os.path.join(model_dir, "model.int8.onnx")
+    if not os.path.exists(target):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"🔧 Quantizing embedding model to int8: {target}")
+        tmp_target = f"{target}.{os.getpid()}.tmp"
+        quantize_dynamic(source, tmp_target, weight_type=QuantType.QInt8)
+        os.replace(tmp_target, target)
+    return target
+
+
+class OnnxEmbedder:
+    """Batched MiniLM encoder on an onnxruntime CPU session."""
+
+    def __init__(self, model_dir: str, quantize: bool = False, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_TOKENS)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.log_severity_level = 3
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+
+        model_path = _quantized_model_path(model_dir) if quantize else os.path.join(model_dir, "model.onnx")
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def _forward(self, texts: Sequence[str]) -> np.ndarray:
+        encoded = self.tokenizer.encode_batch(list(texts))
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        feed = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feed["token_type_ids"] = np.zeros_like(input_ids)
+
+        last_hidden_state = self.session.run(None, feed)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (last_hidden_state * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        norms[norms == 0] = 1e-12
+        return (pooled / norms).astype(np.float32)
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """Encode *texts* into L2-normalised float32 rows, in input order."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Length-sorted batches keep padding (and wasted compute) small.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out: Optional[np.ndarray] = None
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            vectors = self._forward([texts[i] for i in idx])
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[idx] = vectors
+        return out
+
+
+def get_embedder() -> OnnxEmbedder:
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                print(f"🔧 Loading embedding model: {EMBEDDER_NAME}")
+                _embedder = OnnxEmbedder(
+                    _model_dir(),
+                    quantize=settings.EMBEDDING_QUANTIZE,
+                    threads=settings.EMBEDDING_THREADS,
+                )
+    return _embedder
+
+
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """Encode texts with the shared embedder (normalised float32, shape (n, 384))."""
+    return get_embedder().encode(texts, batch_size=max(1, settings.EMBEDDING_BATCH_SIZE))
+
+
+def embed_for_chroma(texts: Sequence[str]) -> List[List[float]]:
+    """Same vectors as ``embed_texts``, as plain lists for Chroma's API."""
+    return embed_texts(texts).tolist()
@@ -0,0 +1,114 @@
+"""
+Result cache for the essay grader.
+
+Students often resubmit the same essay (or a copy that differs only in
+whitespace) to ``/grade-essay`` and ``/grade-essay-upload``; each resubmission
+used to run validation, tokenization and a forward pass again.
+
+Grades are now cached under a SHA-256 key of:
+  - the essay, Unicode-NFC-normalised with whitespace collapsed,
+  - the question, only when the grader actually uses it (use_question_prefix),
+  - the model path and every GraderConfig field that can change the score.
+Lookups go through an in-process LRU (ESSAY_GRADE_CACHE_SIZE entries) and
+then the ``essay_grade_cache`` table, so duplicates are answered without
+touching the model, across workers and restarts.  Only successful grades
+are stored; invalid essays are re-validated every time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from Core.config import settings
+from DB import crud
+from services.essay_grader_service import grade_essay_async, grader_config
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# GraderConfig fields that do not affect the predicted band.
+_KEY_EXCLUDED_FIELDS = {
+    "device", "onnx_path", "intra_op_threads", "inter_op_threads", "use_inference_mode",
+}
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def grade_cache_key(essay_text: str, question: Optional[str]) -> str:
+    config = grader_config()
+    fields = {k: v for k, v in asdict(config).items() if k not in _KEY_EXCLUDED_FIELDS}
+    payload = {
+        "essay": normalize_text(essay_text),
+        "question": normalize_text(question) if question and config.use_question_prefix else None,
+        "config": fields,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class _LRU:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: OrderedDict[str, dict] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: dict) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+_memory = _LRU(settings.ESSAY_GRADE_CACHE_SIZE)
+
+
+async def grade_essay_cached(db: AsyncSession, essay_text: str, question: Optional[str] = None) -> dict:
+    """Grade one essay, answering repeats from the LRU / database cache."""
+    if settings.ESSAY_GRADE_CACHE_SIZE <= 0:
+        return await grade_essay_async(essay_text=essay_text, question=question)
+
+    key = grade_cache_key(essay_text, question)
+    result = _memory.get(key)
+    if result is not None:
+        print(f"⚡ ESSAY GRADE CACHE HIT (memory): {key[:12]}")
+        return dict(result)
+
+    entry = await crud.get_essay_grade_cache(db, key)
+    if entry is not None:
+        print(f"⚡ ESSAY GRADE CACHE HIT (db): {key[:12]}")
+        await crud.touch_essay_grade_cache(db, entry)
+        _memory.put(key, entry.result)
+        return dict(entry.result)
+
+    result = await grade_essay_async(essay_text=essay_text, question=question)
+    _memory.put(key, result)
+    try:
+        await crud.create_essay_grade_cache(db, cache_key=key, model_path=result["model_path"], result=result)
+    except IntegrityError:
+        # A concurrent request for the same essay stored it first.
+        await db.rollback()
+    return dict(result)
@@ -2,24 +2,59 @@
 Essay grading service using a fine-tuned Hugging Face sequence classifier.
 
 Loads the model lazily on first request and keeps it in memory for reuse.
+
+Inference backends (``GraderConfig.backend`` / ESSAY_GRADER_BACKEND):
+  torch       fp32 PyTorch checkpoint (default)
+  torch-int8  PyTorch with dynamic int8 quantization of the Linear layers
+  onnx        ONNX Runtime on ``<model_path>/onnx/model.onnx``
+  onnx-int8   ONNX Runtime on the int8-quantized ``model.int8.onnx``
+The ONNX files are produced (and checked against the PyTorch logits) by
+``scripts/export_essay_grader.py``.
+
+Long essays: with ``GraderConfig.windowed`` (ESSAY_GRADER_WINDOWED) an essay
+longer than ``max_length`` tokens is split into overlapping windows
+(``window_stride`` tokens shared between neighbours, at most ``max_windows``
+spread evenly over the essay), each prefixed with the question when
+``use_question_prefix`` is set.  All windows of a batch go through one
+forward pass and each essay's band is the token-weighted mean of its window
+bands, so the whole essay is scored at a bounded cost.
+
+Threading: torch's intra-op pool is process-wide, so the grader sets it
+explicitly (``intra_op_threads``; 0 = this process's cores divided by
+WEB_CONCURRENCY) instead of letting every worker assume the whole box.
+Forward passes are serialised by a per-grader lock and the micro-batcher
+runs them on a dedicated single-thread executor, so concurrent grading
+calls queue up rather than oversubscribing the cores, and they do not
+occupy the default ``asyncio.to_thread`` pool used by the evaluator.
+``scripts/benchmark_essay_grader.py`` measures throughput per setting.
+
+Concurrent requests are micro-batched: ``grade_essay_async`` queues the
+essay, a single batcher task collects whatever arrives within
+ESSAY_BATCH_WAIT_MS (up to ESSAY_BATCH_MAX_SIZE essays), runs one padded
+forward pass and resolves every caller's future with its own result.
 """
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from threading import Lock
-from typing import Callable, Optional
+from typing import Callable, Iterator, List, Optional, Tuple
+import asyncio
+import os
 import re
 
 import torch
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
 
 from Core.config import settings
 
 MAX_BAND = 9.0
 BAND_STEP = 0.5
 
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
 
 @dataclass
 class GraderConfig:
@@ -31,6 +66,37 @@ class GraderConfig:
     calibration_method: str = "none"  # one of: none, linear
     calibration_slope: float = 1.0
     calibration_intercept: float = 0.0
+    backend: str = "torch"  # one of: BACKENDS
+    onnx_path: Optional[str] = None  # defaults to <model_path>/onnx/model[.int8].onnx
+    windowed: bool = False  # score essays longer than max_length over sliding windows
+    window_stride: int = 128  # tokens shared by consecutive windows
+    max_windows: int = 8  # per essay; windows are spread evenly when there are more
+    intra_op_threads: int = 0  # 0 = auto_thread_count()
+    inter_op_threads: int = 1
+    use_inference_mode: bool = True  # torch.inference_mode() instead of torch.no_grad()
+
+
+def auto_thread_count() -> int:
+    """Cores available to this process, split across the server's worker processes."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS / Windows
+        cores = os.cpu_count() or 1
+    workers = max(1, settings.WEB_CONCURRENCY)
+    return max(1, cores // workers)
+
+
+def configure_torch_threads(intra_op_threads: int, inter_op_threads: int) -> None:
+    torch.set_num_threads(intra_op_threads)
+    try:
+        torch.set_num_interop_threads(inter_op_threads)
+    except RuntimeError:
+        # Can only be set once, before any inter-op work has started.
+        pass
+
+
+def default_onnx_path(model_path: str, quantized: bool = False) -> str:
+    return str(Path(model_path) / "onnx" / ("model.int8.onnx" if quantized else "model.onnx"))
 
 
 @dataclass
@@ -42,6 +108,7 @@ class GradeResult:
     ordinal_threshold: float
     word_count: int
     model_path: str
+    windows: int = 1
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -49,39 +116,78 @@ class GradeResult:
 
 class EssayGrader:
     def __init__(self, config: GraderConfig):
+        if config.backend not in BACKENDS:
+            raise ValueError(f"backend must be one of: {', '.join(BACKENDS)}")
+        if config.calibration_method not in {"none", "linear"}:
+            raise ValueError("calibration_method must be one of: 'none', 'linear'")
+        if config.windowed and not 0 <= config.window_stride < config.max_length // 2:
+            raise ValueError("window_stride must be between 0 and max_length / 2")
+
         self.config = config
-        self.device = self._resolve_device(config.device)
         self.tokenizer = AutoTokenizer.from_pretrained(config.model_path)
-        self.model = AutoModelForSequenceClassification.from_pretrained(config.model_path)
-        self.model.to(self.device)
-        self.model.eval()
-
-        num_labels = int(getattr(self.model.config, "num_labels", 1))
+        model_config = AutoConfig.from_pretrained(config.model_path)
+        self.model = None
+        self._ort_session = None
+        self._inference_lock = Lock()
+        self.threads = config.intra_op_threads or auto_thread_count()
+
+        if config.backend.startswith("onnx"):
+            # ONNX Runtime runs on CPU; logits come back as numpy.
+            self.device = "cpu"
+            self._ort_session = self._load_onnx_session(
+                config.onnx_path or default_onnx_path(config.model_path, quantized=config.backend == "onnx-int8"),
+                self.threads,
+            )
+        else:
+            configure_torch_threads(self.threads, max(1, config.inter_op_threads))
+            self.device = self._resolve_device(config.device)
+            self.model = AutoModelForSequenceClassification.from_pretrained(config.model_path)
+            self.model.eval()
+            if config.backend == "torch-int8":
+                # Dynamic quantization kernels are CPU-only.
+                self.device = "cpu"
+                self.model = torch.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            self.model.to(self.device)
+
+        num_labels = int(getattr(model_config, "num_labels", 1))
         self.objective = "ordinal" if num_labels > 1 else "regression"
 
-        if self.config.calibration_method not in {"none", "linear"}:
-            raise ValueError("calibration_method must be one of: 'none', 'linear'")
-
         self._calibrate_fn = self._build_calibrator()
 
+    @staticmethod
+    def _load_onnx_session(path: str, threads: int):
+        import onnxruntime as ort
+
+        if not Path(path).exists():
+            raise FileNotFoundError(
+                f"ONNX essay grader not found at {path}. Run scripts/export_essay_grader.py first."
+            )
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
     @staticmethod
     def _resolve_device(device: Optional[str]) -> str:
         if device:
             return device
         return "cuda" if torch.cuda.is_available() else "cpu"
 
+    def _question_prefix(self, question: Optional[str]) -> str:
+        if not self.config.use_question_prefix or question is None:
+            return ""
+        return question.strip()
+
     def _build_input_text(self, essay: str, question: Optional[str]) -> str:
         essay_text = essay.strip()
         if not essay_text:
             raise ValueError("Essay text is empty.")
 
-        if not self.config.use_question_prefix:
-            return essay_text
-
-        if question is None or not question.strip():
-            return essay_text
-
-        return f"{question.strip()} {essay_text}"
+        prefix = self._question_prefix(question)
+        return f"{prefix} {essay_text}" if prefix else essay_text
 
     @staticmethod
     def _clip_band(value: float) -> float:
@@ -99,18 +205,98 @@ class EssayGrader:
         intercept = float(self.config.calibration_intercept)
         return lambda v: self._clip_band(slope * float(v) + intercept)
 
-    @torch.no_grad()
-    def _forward_logits(self, text: str) -> torch.Tensor:
+    @property
+    def _tensor_type(self) -> str:
+        return "np" if self._ort_session is not None else "pt"
+
+    def _run_model(self, encoded) -> torch.Tensor:
+        """Logits for already tokenized, padded inputs; returns (n, num_labels)."""
+        if self._ort_session is not None:
+            input_names = {i.name for i in self._ort_session.get_inputs()}
+            feed = {k: v.astype("int64") for k, v in encoded.items() if k in input_names}
+            with self._inference_lock:
+                return torch.from_numpy(self._ort_session.run(None, feed)[0])
+        encoded = {k: v.to(self.device) for k, v in encoded.items()}
+        grad_mode = torch.inference_mode() if self.config.use_inference_mode else torch.no_grad()
+        with self._inference_lock, grad_mode:
+            outputs = self.model(**encoded)
+        return outputs.logits
+
+    def _forward_logits_batch(self, texts: List[str]) -> torch.Tensor:
+        """One forward pass for *texts*, padded to the longest; returns (n, num_labels)."""
         encoded = self.tokenizer(
-            text,
-            return_tensors="pt",
+            texts,
+            return_tensors=self._tensor_type,
             truncation=True,
             padding=True,
             max_length=self.config.max_length,
         )
-        encoded = {k: v.to(self.device) for k, v in encoded.items()}
-        outputs = self.model(**encoded)
-        return outputs.logits
+        return self._run_model(encoded)
+
+    @staticmethod
+    def _spread(rows: List[int], limit: int) -> List[int]:
+        """At most *limit* of *rows*, evenly spaced and keeping the first and last."""
+        if len(rows) <= limit:
+            return rows
+        if limit == 1:
+            return rows[:1]
+        step = (len(rows) - 1) / (limit - 1)
+        return [rows[round(i * step)] for i in range(limit)]
+
+    def _window_features(self, essays: List[str], prefixes: List[str]) -> Tuple[List[dict], List[int]]:
+        """Split *essays* into overlapping max_length windows.
+
+        Every window starts with its essay's question *prefix* (if any), as
+        the non-windowed input does.  Returns the per-window features
+        (unpadded) and, for each window, the index of the essay it came from.
+        """
+        essay_ids = self.tokenizer(essays, add_special_tokens=False)["input_ids"]
+        prefix_ids = self.tokenizer(prefixes, add_special_tokens=False)["input_ids"]
+        special = self.tokenizer.num_special_tokens_to_add(pair=False)
+        stride = self.config.window_stride
+
+        features, owners = [], []
+        for essay_index, (ids, prefix) in enumerate(zip(essay_ids, prefix_ids)):
+            # A long question keeps at most half of the room left after the overlap.
+            prefix = prefix[:max(0, (self.config.max_length - special - stride) // 2)]
+            room = self.config.max_length - special - len(prefix)
+            starts = list(range(0, max(1, len(ids) - stride), room - stride))
+            for start in self._spread(starts, max(1, self.config.max_windows)):
+                window = self.tokenizer.prepare_for_model(prefix + ids[start:start + room], add_special_tokens=True)
+                features.append(dict(window))
+                owners.append(essay_index)
+        return features, owners
+
+    def _windowed_raw_bands(self, essays: List[str], prefixes: List[str]) -> List[Tuple[float, int]]:
+        """Token-weighted mean window band and window count for each essay, in one pass."""
+        features, owners = self._window_features(essays, prefixes)
+        padded = self.tokenizer.pad(features, padding=True, return_tensors=self._tensor_type)
+        logits = self._run_model(padded)
+        weights = [len(f["input_ids"]) for f in features]
+
+        totals = [0.0] * len(essays)
+        weight_sums = [0] * len(essays)
+        counts = [0] * len(essays)
+        for row, essay_index in enumerate(owners):
+            totals[essay_index] += self._decode_raw_band(logits[row:row + 1]) * weights[row]
+            weight_sums[essay_index] += weights[row]
+            counts[essay_index] += 1
+        return [(totals[i] / max(weight_sums[i], 1), counts[i]) for i in range(len(essays))]
+
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        """Model-input length of each text, for length bucketing.
+
+        Truncated to max_length unless windowed, where the full length decides
+        how many windows an essay needs.
+        """
+        if self.config.windowed:
+            encoded = self.tokenizer(texts, truncation=False)
+        else:
+            encoded = self.tokenizer(texts, truncation=True, max_length=self.config.max_length)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def _forward_logits(self, text: str) -> torch.Tensor:
+        return self._forward_logits_batch([text])
 
     def _decode_regression_band(self, logits: torch.Tensor) -> float:
         val = float(logits.detach().cpu().squeeze())
@@ -127,11 +313,10 @@ class EssayGrader:
             return self._decode_ordinal_band(logits)
         return self._decode_regression_band(logits)
 
-    def predict(self, essay: str, question: Optional[str] = None) -> GradeResult:
-        text = self._build_input_text(essay=essay, question=question)
-        logits = self._forward_logits(text)
+    def _build_result(self, logits: torch.Tensor, essay: str) -> GradeResult:
+        return self._build_result_from_band(self._decode_raw_band(logits), essay)
 
-        raw_band = self._decode_raw_band(logits)
+    def _build_result_from_band(self, raw_band: float, essay: str, windows: int = 1) -> GradeResult:
         calibrated_band = self._calibrate_fn(raw_band)
         predicted_band = self._round_to_half(calibrated_band)
 
@@ -143,8 +328,42 @@ class EssayGrader:
             ordinal_threshold=float(self.config.ordinal_threshold),
             word_count=len(essay.split()),
             model_path=self.config.model_path,
+            windows=windows,
         )
 
+    def predict(self, essay: str, question: Optional[str] = None) -> GradeResult:
+        if self.config.windowed:
+            return self.predict_batch([essay], [question])[0]
+        text = self._build_input_text(essay=essay, question=question)
+        logits = self._forward_logits(text)
+        return self._build_result(logits, essay)
+
+    def predict_batch(
+        self,
+        essays: List[str],
+        questions: Optional[List[Optional[str]]] = None,
+    ) -> List[GradeResult]:
+        """Grade many essays with one batched forward pass."""
+        if questions is not None and len(questions) != len(essays):
+            raise ValueError("questions length must match essays length")
+        if not essays:
+            return []
+
+        questions = questions if questions is not None else [None] * len(essays)
+        texts = [self._build_input_text(essay=essay, question=question) for essay, question in zip(essays, questions)]
+        if self.config.windowed:
+            raw_bands = self._windowed_raw_bands(
+                [essay.strip() for essay in essays],
+                [self._question_prefix(question) for question in questions],
+            )
+            return [
+                self._build_result_from_band(raw_band, essay, windows)
+                for (raw_band, windows), essay in zip(raw_bands, essays)
+            ]
+        logits = self._forward_logits_batch(texts)
+        # Slice rows as (1, num_labels) so decoding matches single-essay predict.
+        return [self._build_result(logits[i:i + 1], essay) for i, essay in enumerate(essays)]
+
 
 def _resolve_model_path() -> str:
     configured = getattr(settings, "ESSAY_GRADER_MODEL_PATH", "")
@@ -178,6 +397,23 @@ _grader: EssayGrader | None = None
 _grader_lock = Lock()
 
 
+def grader_config() -> GraderConfig:
+    """The GraderConfig the shared grader is (or will be) built with."""
+    if _grader is not None:
+        return _grader.config
+    return GraderConfig(
+        model_path=_resolve_model_path(),
+        backend=settings.ESSAY_GRADER_BACKEND,
+        onnx_path=settings.ESSAY_GRADER_ONNX_PATH or None,
+        windowed=settings.ESSAY_GRADER_WINDOWED,
+        window_stride=settings.ESSAY_WINDOW_STRIDE,
+        max_windows=settings.ESSAY_MAX_WINDOWS,
+        intra_op_threads=settings.ESSAY_GRADER_THREADS,
+        inter_op_threads=settings.ESSAY_GRADER_INTEROP_THREADS,
+        use_inference_mode=settings.ESSAY_GRADER_INFERENCE_MODE,
+    )
+
+
 def get_essay_grader() -> EssayGrader:
     global _grader
 
@@ -186,8 +422,7 @@ def get_essay_grader() -> EssayGrader:
 
     with _grader_lock:
         if _grader is None:
-            cfg = GraderConfig(model_path=_resolve_model_path())
-            _grader = EssayGrader(cfg)
+            _grader = EssayGrader(grader_config())
 
     return _grader
 
@@ -240,8 +475,128 @@ def _validate_essay_text(essay_text: str) -> None:
         )
 
 
+def iter_grade_essays(
+    essays: List[str],
+    questions: Optional[List[Optional[str]]] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[Tuple[int, dict]]:
+    """Grade many essays, yielding ``(index, outcome)`` as batches finish.
+
+    Invalid essays yield ``{"error": ...}`` straight away.  Valid ones are
+    sorted by token length and graded in batches, so each forward pass pads
+    essays of similar length; results therefore arrive out of input order.
+    """
+    if questions is not None and len(questions) != len(essays):
+        raise ValueError("questions length must match essays length")
+    questions = questions if questions is not None else [None] * len(essays)
+    batch_size = max(1, batch_size or settings.ESSAY_BATCH_MAX_SIZE)
+
+    valid: List[int] = []
+    for index, essay in enumerate(essays):
+        try:
+            _validate_essay_text(essay)
+        except ValueError as e:
+            yield index, {"error": str(e)}
+            continue
+        valid.append(index)
+    if not valid:
+        return
+
+    grader = get_essay_grader()
+    lengths = grader.token_lengths(
+        [grader._build_input_text(essay=essays[i], question=questions[i]) for i in valid]
+    )
+    ordered = [i for _, i in sorted(zip(lengths, valid))]
+
+    for start in range(0, len(ordered), batch_size):
+        batch = ordered[start:start + batch_size]
+        try:
+            results = grader.predict_batch([essays[i] for i in batch], [questions[i] for i in batch])
+        except Exception as e:
+            for index in batch:
+                yield index, {"error": str(e)}
+            continue
+        for index, result in zip(batch, results):
+            yield index, result.to_dict()
+
+
 def grade_essay(essay_text: str, question: Optional[str] = None) -> dict:
     _validate_essay_text(essay_text)
     grader = get_essay_grader()
     result = grader.predict(essay=essay_text, question=question)
     return result.to_dict()
+
+
+class EssayBatcher:
+    """Collect concurrent grading requests into batched forward passes."""
+
+    def __init__(self, max_batch_size: int, max_wait_ms: int):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0, max_wait_ms) / 1000.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, essay: str, question: Optional[str] = None) -> GradeResult:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((essay, question, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Callers that gave up (client disconnected / timed out) are skipped.
+        return [item for item in batch if not item[2].done()]
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            essays = [essay for essay, _, _ in batch]
+            questions = [question for _, question, _ in batch]
+            try:
+                grader = get_essay_grader()
+                results = await self._loop.run_in_executor(
+                    _inference_executor, grader.predict_batch, essays, questions
+                )
+            except Exception as exc:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+# One thread: forward passes are serialised anyway and each uses the full
+# intra-op pool; keeping them off the default executor leaves that free.
+_inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="essay-grader")
+_batcher = EssayBatcher(settings.ESSAY_BATCH_MAX_SIZE, settings.ESSAY_BATCH_WAIT_MS)
+
+
+async def grade_essay_async(essay_text: str, question: Optional[str] = None) -> dict:
+    """Validate and grade one essay through the shared micro-batcher."""
+    _validate_essay_text(essay_text)
+    result = await _batcher.submit(essay_text, question)
+    return result.to_dict()
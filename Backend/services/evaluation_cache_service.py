@@ -0,0 +1,114 @@
+"""
+Per-lecture cache for the summary evaluator.
+
+A whole class is usually evaluated against the same lecture, yet every
+evaluation used to regenerate the reference summary and key points via the
+LLM and re-encode the lecture.  The student-independent part of the
+evaluation (``LectureArtifacts``) is now stored in ``lecture_eval_artifacts``
+keyed by the SHA-256 of the lecture text, so repeat evaluations only pay for
+the coherence LLM call and some vector math.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from DB import crud
+from DB.schemas import LectureEvalArtifact
+from services.embedding_service import EMBEDDER_NAME
+from services.evaluator_service import (
+    LectureArtifacts,
+    build_lecture_artifacts,
+    lecture_hash,
+)
+from services.rouge_metrics import tokenize as rouge_tokenize
+
+
+def _pack(vectors: np.ndarray) -> bytes:
+    return np.ascontiguousarray(vectors, dtype=np.float32).tobytes()
+
+
+def _unpack(payload: bytes, dim: int) -> np.ndarray:
+    return np.frombuffer(payload, dtype=np.float32).reshape(-1, dim)
+
+
+def artifacts_from_row(row: LectureEvalArtifact) -> LectureArtifacts:
+    dim = row.embedding_dim
+    return LectureArtifacts(
+        lecture_hash=row.lecture_hash,
+        reference_summary=row.reference_summary,
+        key_points=list(row.key_points or []),
+        terms=list(row.terms or []),
+        lecture_embedding=_unpack(row.lecture_embedding, dim)[0],
+        reference_embedding=_unpack(row.reference_embedding, dim)[0],
+        chunk_embeddings=_unpack(row.chunk_embeddings, dim),
+        key_point_embeddings=_unpack(row.key_point_embeddings, dim),
+        reference_tokens=row.reference_tokens or rouge_tokenize(row.reference_summary),
+    )
+
+
+def artifacts_to_fields(artifacts: LectureArtifacts) -> dict:
+    return {
+        "lecture_hash": artifacts.lecture_hash,
+        "embedder": EMBEDDER_NAME,
+        "reference_summary": artifacts.reference_summary,
+        "key_points": artifacts.key_points,
+        "terms": artifacts.terms,
+        "reference_tokens": artifacts.reference_tokens,
+        "embedding_dim": int(artifacts.lecture_embedding.shape[0]),
+        "lecture_embedding": _pack(artifacts.lecture_embedding),
+        "reference_embedding": _pack(artifacts.reference_embedding),
+        "chunk_embeddings": _pack(artifacts.chunk_embeddings),
+        "key_point_embeddings": _pack(artifacts.key_point_embeddings),
+    }
+
+
+async def load_cached_lecture_artifacts(db: AsyncSession, lecture: str) -> Optional[LectureArtifacts]:
+    """Return the stored artifacts for *lecture*, or None on a miss."""
+    digest = lecture_hash(lecture)
+    row = await crud.get_lecture_eval_artifact(db, digest, EMBEDDER_NAME)
+    if not row:
+        print(f"🔍 EVAL ARTIFACT CACHE MISS: {digest[:12]}")
+        return None
+    print(f"⚡ EVAL ARTIFACT CACHE HIT: {digest[:12]}")
+    await crud.touch_lecture_eval_artifact(db, row)
+    return artifacts_from_row(row)
+
+
+async def store_lecture_artifacts(
+    db: AsyncSession,
+    artifacts: LectureArtifacts,
+    document_id: Optional[int] = None,
+) -> None:
+    try:
+        await crud.create_lecture_eval_artifact(db, document_id=document_id, **artifacts_to_fields(artifacts))
+    except IntegrityError:
+        # Another evaluation of the same lecture stored it first.
+        await db.rollback()
+
+
+async def get_lecture_artifacts(
+    db: AsyncSession,
+    lecture: str,
+    document_id: Optional[int] = None,
+    reference_summary: Optional[str] = None,
+    key_points: Optional[List[str]] = None,
+) -> LectureArtifacts:
+    """Return evaluator artifacts for *lecture*, building and storing them on a miss.
+
+    A caller-supplied reference summary or key-point list is a custom ground
+    truth for that request only: artifacts are built fresh and not cached.
+    """
+    if reference_summary is not None or key_points is not None:
+        return await asyncio.to_thread(build_lecture_artifacts, lecture, reference_summary, key_points)
+
+    artifacts = await load_cached_lecture_artifacts(db, lecture)
+    if artifacts is None:
+        artifacts = await asyncio.to_thread(build_lecture_artifacts, lecture)
+        await store_lecture_artifacts(db, artifacts, document_id)
+    return artifacts
@@ -4,49 +4,50 @@ Student summary evaluator service — 6-dimension hybrid evaluation.
 Extracted from Ai Team/Main/EVALUATOR.ipynb.
 
 Uses hybrid scoring aligned with EVALUATOR.ipynb:
-- embeddings + ROUGE for deterministic metrics
+- embeddings (shared ONNX MiniLM backend, services/embedding_service) +
+  ROUGE for deterministic metrics
 - LLM judging for coherence
 
 Model: configurable evaluator model via settings.EVALUATOR_MODEL_NAME
 Ground truth: summarizer service output + extracted lecture key points
+
+Everything that depends only on the lecture (reference summary, key points,
+lecture / chunk / key-point embeddings, terminology) is bundled in
+``LectureArtifacts`` so it can be computed once per lecture and reused for
+every student evaluated against it.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import re
 from concurrent.futures import ThreadPoolExecutor
-from collections import Counter
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from services import text_analysis
+from services.embedding_service import embed_texts, get_embedder
 from services.openrouter_client import chat_completion
+from services.rouge_metrics import ReferenceProfile, tokenize as rouge_tokenize
 from Core.config import settings
 
 log = logging.getLogger(__name__)
 
-# ── Lazy singletons (loaded on first evaluation) ─────────────────────────────
-_rouge_scorer_mod = None
-_nltk_ready = False
-_embedder_mod = None
-
+TERMINOLOGY_TOP_N = 40
 
-def _get_rouge_scorer():
-    global _rouge_scorer_mod
-    if _rouge_scorer_mod is None:
-        from rouge_score import rouge_scorer as rs
-        _rouge_scorer_mod = rs
-    return _rouge_scorer_mod
+# Bump whenever the lecture-side artifacts change meaning (e.g. how terms are
+# extracted) so rows cached under the old semantics are no longer used.
+LECTURE_ARTIFACTS_VERSION = 2
 
 
-def _get_embedder():
-    global _embedder_mod
-    if _embedder_mod is None:
-        from sentence_transformers import SentenceTransformer
-        _embedder_mod = SentenceTransformer("all-MiniLM-L6-v2")
-    return _embedder_mod
+def _encode(texts: List[str]) -> np.ndarray:
+    """Encode *texts* into L2-normalised float32 rows (cosine == dot product)."""
+    return embed_texts(texts)
 
 
 _JSON_RE = re.compile(r"\{.*?\}", re.DOTALL)
@@ -67,16 +68,6 @@ def _extract_json_block(raw: str) -> Dict:
     raise ValueError("No JSON object found")
 
 
-def _ensure_nltk():
-    global _nltk_ready
-    if not _nltk_ready:
-        import nltk
-        nltk.download("punkt", quiet=True)
-        nltk.download("punkt_tab", quiet=True)
-        nltk.download("stopwords", quiet=True)
-        _nltk_ready = True
-
-
 # ── Helper: OpenAI chat via Google AI Studio  12B) ────────────────
 # Keep evaluator calls single-shot: no retries/fallback to cap call volume.
 
@@ -153,14 +144,7 @@ def extract_key_points(lecture: str) -> List[str]:
 
 
 def _fallback_key_points(lecture: str, n: int = 8) -> List[str]:
-    _ensure_nltk()
-    try:
-        from nltk.tokenize import sent_tokenize
-        sentences = sent_tokenize(lecture)
-    except Exception:
-        sentences = re.split(r"(?<=[.!?])\s+", lecture)
-
-    cleaned = [re.sub(r"\s+", " ", s).strip() for s in sentences]
+    cleaned = [re.sub(r"\s+", " ", s).strip() for s in text_analysis.sentences(lecture)]
     filtered = [s for s in cleaned if len(s.split()) >= 6]
 
     if not filtered:
@@ -183,51 +167,178 @@ def _fallback_key_points(lecture: str, n: int = 8) -> List[str]:
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-#  6 Scoring functions — each returns (score, detail_text)
+#  Lecture-level precomputation
 # ══════════════════════════════════════════════════════════════════════════════
 
-def _score_correctness(student: str, reference: str, lecture: str) -> Tuple[float, str]:
-    """Notebook-aligned hybrid correctness.
+def lecture_hash(lecture: str) -> str:
+    """Cache key for everything derived from a lecture text (and the artifact version)."""
+    return hashlib.sha256(f"v{LECTURE_ARTIFACTS_VERSION}\n{lecture}".encode("utf-8")).hexdigest()
 
-    40% cosine(student, lecture) + 35% cosine(student, reference) + 25% ROUGE-F1.
+
+def _lecture_chunks(lecture: str) -> List[str]:
+    chunks = [p.strip() for p in re.split(r"\n{2,}", lecture) if len(p.strip()) > 60]
+    return chunks or [lecture]
+
+
+@dataclass
+class LectureArtifacts:
+    """Student-independent inputs of the evaluation for one lecture."""
+    lecture_hash: str
+    reference_summary: str
+    key_points: List[str]
+    terms: List[str]
+    lecture_embedding: np.ndarray        # (dim,)
+    reference_embedding: np.ndarray      # (dim,)
+    chunk_embeddings: np.ndarray         # (n_chunks, dim)
+    key_point_embeddings: np.ndarray     # (n_key_points, dim)
+    reference_tokens: List[str] = field(default_factory=list)   # ROUGE tokens (stemmed)
+
+    @cached_property
+    def rouge_reference(self) -> ReferenceProfile:
+        return ReferenceProfile(self.reference_tokens)
+
+
+def _reference_summary_safe(lecture: str) -> str:
+    log.info("[EVAL] Generating reference summary ...")
+    from services.summarizer_service import summarize_text
+    try:
+        return summarize_text(lecture)
+    except Exception as e:
+        log.warning("[EVAL] Reference summary generation failed, using trimmed lecture fallback: %s", e)
+        return lecture[:1500]
+
+
+def _key_points_safe(lecture: str) -> List[str]:
+    log.info("[EVAL] Extracting key points ...")
+    try:
+        return extract_key_points(lecture)
+    except Exception as e:
+        log.warning("[EVAL] Key point extraction failed, using lecture fallback: %s", e)
+        return [lecture[:200]]
+
+
+def _start_reference_calls(
+    executor: ThreadPoolExecutor,
+    lecture: str,
+    reference_summary: Optional[str],
+    key_points: Optional[List[str]],
+) -> Callable[[], Tuple[str, List[str]]]:
+    """Submit the reference-summary / key-point LLM calls that are still needed.
+
+    Returns a function that waits for both and gives back
+    ``(reference_summary, key_points)``.
     """
-    from sentence_transformers import util
+    ref_future = executor.submit(_reference_summary_safe, lecture) if reference_summary is None else None
+    kp_future = executor.submit(_key_points_safe, lecture) if key_points is None else None
+
+    def wait() -> Tuple[str, List[str]]:
+        summary = reference_summary if ref_future is None else ref_future.result()
+        points = list(key_points if kp_future is None else kp_future.result())
+        return summary, points
+
+    return wait
+
+
+def _assemble_artifacts(
+    lecture: str,
+    terms: List[str],
+    reference_summary: str,
+    key_points: List[str],
+    lecture_embedding: np.ndarray,
+    reference_embedding: np.ndarray,
+    chunk_embeddings: np.ndarray,
+    key_point_embeddings: np.ndarray,
+) -> LectureArtifacts:
+    return LectureArtifacts(
+        lecture_hash=lecture_hash(lecture),
+        reference_summary=reference_summary,
+        key_points=key_points,
+        terms=terms,
+        lecture_embedding=lecture_embedding,
+        reference_embedding=reference_embedding,
+        chunk_embeddings=chunk_embeddings,
+        key_point_embeddings=key_point_embeddings,
+        reference_tokens=rouge_tokenize(reference_summary) if reference_summary else [],
+    )
 
-    embedder = _get_embedder()
-    emb_s = embedder.encode(student, convert_to_tensor=True)
-    emb_r = embedder.encode(reference, convert_to_tensor=True)
-    emb_l = embedder.encode(lecture, convert_to_tensor=True)
 
-    cos_ref = float(util.cos_sim(emb_s, emb_r))
-    cos_lecture = float(util.cos_sim(emb_s, emb_l))
+def _prepare_lecture(
+    lecture: str,
+    reference_summary: Optional[str] = None,
+    key_points: Optional[List[str]] = None,
+    extra_texts: Sequence[str] = (),
+) -> Tuple[LectureArtifacts, np.ndarray]:
+    """Build ``LectureArtifacts`` with a single embedder pass.
 
-    rs_mod = _get_rouge_scorer()
-    sc = rs_mod.RougeScorer(["rouge1", "rougeL"], use_stemmer=True)
-    rs = sc.score(reference, student)
-    rouge = (rs["rouge1"].fmeasure + rs["rougeL"].fmeasure) / 2
+    The lecture, reference summary, paragraph chunks, key points and any
+    *extra_texts* (e.g. the student summary being evaluated) are encoded in
+    one batch; the vectors for *extra_texts* are returned alongside.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        wait_reference = _start_reference_calls(executor, lecture, reference_summary, key_points)
+        # The embedder model loads while the LLM calls are in flight.
+        get_embedder()
+        terms = text_analysis.top_terms(lecture, n=TERMINOLOGY_TOP_N)
+        reference_summary, key_points = wait_reference()
+
+    chunks = _lecture_chunks(lecture)
+    vectors = _encode([lecture, reference_summary, *chunks, *key_points, *extra_texts])
+    kp_start = 2 + len(chunks)
+    extra_start = kp_start + len(key_points)
+
+    artifacts = _assemble_artifacts(
+        lecture,
+        terms,
+        reference_summary,
+        key_points,
+        lecture_embedding=vectors[0],
+        reference_embedding=vectors[1],
+        chunk_embeddings=vectors[2:kp_start],
+        key_point_embeddings=vectors[kp_start:extra_start],
+    )
+    return artifacts, vectors[extra_start:]
 
-    hybrid = 0.40 * cos_lecture + 0.35 * cos_ref + 0.25 * rouge
-    detail = f"cos_lecture={cos_lecture:.2f}, cos_ref={cos_ref:.2f}, rouge_f1={rouge:.2f}"
-    return round(hybrid * 10, 2), detail
 
+def build_lecture_artifacts(
+    lecture: str,
+    reference_summary: Optional[str] = None,
+    key_points: Optional[List[str]] = None,
+) -> LectureArtifacts:
+    """Generate the reference summary / key points (if missing) and encode the lecture."""
+    artifacts, _ = _prepare_lecture(lecture, reference_summary, key_points)
+    return artifacts
 
-def _score_relevance(student: str, lecture: str) -> Tuple[float, str]:
-    from sentence_transformers import util
 
-    embedder = _get_embedder()
-    chunks = [p.strip() for p in re.split(r"\n{2,}", lecture) if len(p.strip()) > 60]
-    if not chunks:
-        chunks = [lecture]
+# ══════════════════════════════════════════════════════════════════════════════
+#  6 Scoring functions — each returns (score, detail_text)
+#
+#  Embedding metrics take the student's pre-computed vector and ROUGE metrics
+#  take one shared rouge1/rouge2/rougeL result, so a summary is encoded and
+#  ROUGE-scored exactly once however many metrics use it.
+# ══════════════════════════════════════════════════════════════════════════════
 
-    emb_s = embedder.encode(student, convert_to_tensor=True)
-    emb_c = embedder.encode(chunks, convert_to_tensor=True)
-    sims = util.cos_sim(emb_s, emb_c)[0]
+def _score_correctness(emb_s: np.ndarray, rouge: Dict, lecture: LectureArtifacts) -> Tuple[float, str]:
+    """Notebook-aligned hybrid correctness.
+
+    40% cosine(student, lecture) + 35% cosine(student, reference) + 25% ROUGE-F1.
+    """
+    cos_ref = float(emb_s @ lecture.reference_embedding)
+    cos_lecture = float(emb_s @ lecture.lecture_embedding)
+    rouge_f1 = (rouge["rouge1"].fmeasure + rouge["rougeL"].fmeasure) / 2
+
+    hybrid = 0.40 * cos_lecture + 0.35 * cos_ref + 0.25 * rouge_f1
+    detail = f"cos_lecture={cos_lecture:.2f}, cos_ref={cos_ref:.2f}, rouge_f1={rouge_f1:.2f}"
+    return round(hybrid * 10, 2), detail
+
+
+def _score_relevance(emb_s: np.ndarray, lecture: LectureArtifacts) -> Tuple[float, str]:
+    sims = lecture.chunk_embeddings @ emb_s
 
     score = 0.4 * float(sims.mean()) + 0.6 * float(sims.max())
     return round(score * 10, 2), f"mean_sim={float(sims.mean()):.2f}, max_sim={float(sims.max()):.2f}"
 
 
-def _score_coherence(student: str) -> Tuple[float, str]:
+def score_coherence(student: str) -> Tuple[float, str]:
     prompt = (
         "Evaluate the COHERENCE of the student summary below on a scale of 0-10.\n\n"
         "Coherence criteria:\n"
@@ -246,27 +357,18 @@ def _score_coherence(student: str) -> Tuple[float, str]:
         return 5.0, f"Evaluation error: {e}"
 
 
-def _score_completeness(student: str, reference: str, key_points: List[str]) -> Tuple[float, str]:
+def _score_completeness(emb_s: np.ndarray, rouge: Dict, lecture: LectureArtifacts) -> Tuple[float, str]:
     """Notebook-aligned hybrid completeness.
 
     50% key-point embedding coverage + 50% ROUGE recall.
     """
-    from sentence_transformers import util
-
-    embedder = _get_embedder()
-
-    if key_points:
-        emb_s = embedder.encode(student, convert_to_tensor=True)
-        emb_kp = embedder.encode(key_points, convert_to_tensor=True)
-        sims = util.cos_sim(emb_s, emb_kp)[0]
-        covered = float((sims > 0.40).float().mean())
+    if len(lecture.key_point_embeddings):
+        sims = lecture.key_point_embeddings @ emb_s
+        covered = float((sims > 0.40).mean())
     else:
         covered = 0.5
 
-    rs_mod = _get_rouge_scorer()
-    sc = rs_mod.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=True)
-    rs = sc.score(reference, student)
-    recall = (rs["rouge1"].recall + rs["rouge2"].recall + rs["rougeL"].recall) / 3
+    recall = (rouge["rouge1"].recall + rouge["rouge2"].recall + rouge["rougeL"].recall) / 3
 
     hybrid = 0.50 * covered + 0.50 * recall
     detail = f"covered={covered:.2f}, rouge_recall={recall:.2f}"
@@ -279,20 +381,9 @@ def _score_conciseness(student: str, reference: str) -> Tuple[float, str]:
     return round(float(np.clip(score, 0, 10)), 2), f"Length ratio: {ratio:.2f}x"
 
 
-def _score_terminology(student: str, lecture: str) -> Tuple[float, str]:
-    _ensure_nltk()
-    from nltk.tokenize import word_tokenize
-    from nltk.corpus import stopwords
-
-    stop = set(stopwords.words("english"))
-
-    def top_terms(text: str, n: int = 40) -> set:
-        tokens = [w.lower() for w in word_tokenize(text) if w.isalpha() and len(w) > 3]
-        tokens = [w for w in tokens if w not in stop]
-        return {w for w, _ in Counter(tokens).most_common(n)}
-
-    lecture_terms = top_terms(lecture, n=40)
-    student_terms = {w.lower() for w in word_tokenize(student) if w.isalpha()}
+def _score_terminology(student: str, lecture: LectureArtifacts) -> Tuple[float, str]:
+    lecture_terms = set(lecture.terms)
+    student_terms = set(text_analysis.word_tokens(student))
 
     if not lecture_terms:
         return 5.0, "No domain terms extracted."
@@ -304,19 +395,65 @@ def _score_terminology(student: str, lecture: str) -> Tuple[float, str]:
 #  Public API
 # ══════════════════════════════════════════════════════════════════════════════
 
+def score_local_metrics_batch(
+    students: List[str],
+    lecture: LectureArtifacts,
+    embeddings: Optional[np.ndarray] = None,
+) -> List[Dict[str, Tuple[float, str]]]:
+    """Score every deterministic metric for many summaries of one lecture.
+
+    All summaries are encoded in a single embedder pass (skipped when their
+    *embeddings* are already known) and each is ROUGE-scored once against
+    the pre-tokenised reference; the vectors and ROUGE result are shared by
+    every metric.  Coherence (LLM) is
+    not included — see ``score_coherence``.
+    """
+    if not students:
+        return []
+    if embeddings is None:
+        embeddings = _encode(students)
+    rouge_scores = lecture.rouge_reference.score_batch(students)
+
+    results: List[Dict[str, Tuple[float, str]]] = []
+    for student, emb_s, rouge in zip(students, embeddings, rouge_scores):
+        results.append({
+            "correctness": _score_correctness(emb_s, rouge, lecture),
+            "relevance": _score_relevance(emb_s, lecture),
+            "completeness": _score_completeness(emb_s, rouge, lecture),
+            "conciseness": _score_conciseness(student, lecture.reference_summary),
+            "terminology": _score_terminology(student, lecture),
+        })
+    return results
+
+
+def combine_scores(scores: Dict[str, Tuple[float, str]], lecture: LectureArtifacts) -> Dict:
+    """Shape per-metric (score, detail) pairs like ``evaluate_summary`` output."""
+    results = {name: {"score": score, "detail": detail} for name, (score, detail) in scores.items()}
+    overall = round(sum(v["score"] for v in results.values()) / len(results), 2)
+    return {
+        "scores": results,
+        "overall": overall,
+        "reference_summary": lecture.reference_summary,
+        "key_points": lecture.key_points,
+    }
+
+
 def evaluate_summary(
     student_summary: str,
     lecture_text: str,
     reference_summary: Optional[str] = None,
     key_points: Optional[List[str]] = None,
+    artifacts: Optional[LectureArtifacts] = None,
 ) -> Dict:
     """
     Run the full 6-metric evaluation.
 
-    If *reference_summary* is not provided it will be generated by the
-    **summarizer service**  to serve as ground truth.
-    If *key_points* are not provided they will be extracted from the lecture
-    using the configured evaluator model.
+    Pass precomputed *artifacts* (see ``build_lecture_artifacts``) to skip all
+    lecture-side work.  Otherwise, if *reference_summary* is not provided it
+    will be generated by the **summarizer service** to serve as ground truth,
+    and if *key_points* are not provided they will be extracted from the
+    lecture using the configured evaluator model.  Either way the embedder
+    runs once per evaluation.
 
     Returns {
         "scores": { metric_name: {"score": float, "detail": str}, ... },
@@ -325,64 +462,94 @@ def evaluate_summary(
         "key_points": list[str],
     }
     """
-    lecture_ctx = lecture_text
-
-    def _generate_reference_summary() -> str:
-        log.info("[EVAL] Generating reference summary ...")
-        from services.summarizer_service import summarize_text
-        try:
-            return summarize_text(lecture_ctx)
-        except Exception as e:
-            log.warning("[EVAL] Reference summary generation failed, using trimmed lecture fallback: %s", e)
-            return lecture_ctx[:1500]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Coherence is the only student-specific LLM call; run it while the
+        # local metrics are computed.
+        coherence_future = executor.submit(score_coherence, student_summary)
 
-    def _extract_key_points_safe() -> List[str]:
-        log.info("[EVAL] Extracting key points ...")
-        try:
-            return extract_key_points(lecture_ctx)
-        except Exception as e:
-            log.warning("[EVAL] Key point extraction failed, using lecture fallback: %s", e)
-            return [lecture_ctx[:200]]
+        student_embedding = None
+        if artifacts is None:
+            artifacts, student_embedding = _prepare_lecture(
+                lecture_text, reference_summary, key_points, extra_texts=[student_summary]
+            )
 
-    results: Dict[str, Dict] = {}
+        scores = score_local_metrics_batch([student_summary], artifacts, embeddings=student_embedding)[0]
+        scores["coherence"] = coherence_future.result()
 
-    def _save_result(name: str, score: float, detail: str) -> None:
-        results[name] = {"score": score, "detail": detail}
+    for name, (score, _detail) in scores.items():
         log.info("[EVAL] %s = %.2f", name, score)
+    return combine_scores(scores, artifacts)
 
-    _ensure_nltk()
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        ref_future = None
-        kp_future = None
-        if reference_summary is None:
-            ref_future = executor.submit(_generate_reference_summary)
-        if key_points is None:
-            kp_future = executor.submit(_extract_key_points_safe)
-
-        llm_futures = {
-            "coherence": executor.submit(_score_coherence, student_summary),
-        }
-
-        reference_ctx = reference_summary if reference_summary is not None else ref_future.result()
-        key_points = key_points if key_points is not None else kp_future.result()
-
-        _save_result("correctness", *_score_correctness(student_summary, reference_ctx, lecture_ctx))
-        _save_result("relevance", *_score_relevance(student_summary, lecture_ctx))
-        _save_result("completeness", *_score_completeness(student_summary, reference_ctx, key_points))
-        _save_result("conciseness", *_score_conciseness(student_summary, reference_ctx))
-        _save_result("terminology", *_score_terminology(student_summary, lecture_ctx))
-        for name, future in llm_futures.items():
-            score, detail = future.result()
-            _save_result(name, score, detail)
-
-    overall = round(
-        sum(v["score"] for v in results.values()) / len(results), 2
-    )
 
-    return {
-        "scores": results,
-        "overall": overall,
-        "reference_summary": reference_ctx,
-        "key_points": key_points,
-    }
+def iter_evaluation_events(
+    student_summary: str,
+    lecture_text: str,
+    reference_summary: Optional[str] = None,
+    key_points: Optional[List[str]] = None,
+    artifacts: Optional[LectureArtifacts] = None,
+) -> Iterator[Tuple[str, object]]:
+    """Incremental ``evaluate_summary`` for streaming.
+
+    Yields ``("metric", (name, score, detail))`` as soon as each metric is
+    known — metrics that only need the lecture (terminology, relevance)
+    first, then those that need the reference summary / key points, with
+    coherence emitted whenever its LLM call returns — and finally one
+    ``("artifacts", LectureArtifacts)`` so the caller can cache / combine.
+    """
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        coherence_future = executor.submit(score_coherence, student_summary)
+        coherence_sent = False
+
+        def _coherence_if_ready(block: bool = False):
+            nonlocal coherence_sent
+            if not coherence_sent and (block or coherence_future.done()):
+                coherence_sent = True
+                yield "metric", ("coherence", *coherence_future.result())
+
+        if artifacts is not None:
+            scores = score_local_metrics_batch([student_summary], artifacts)[0]
+            for name, (score, detail) in scores.items():
+                yield "metric", (name, score, detail)
+                yield from _coherence_if_ready()
+        else:
+            wait_reference = _start_reference_calls(executor, lecture_text, reference_summary, key_points)
+
+            # Lecture-only metrics while the reference / key-point LLM calls run.
+            chunks = _lecture_chunks(lecture_text)
+            vectors = _encode([lecture_text, student_summary, *chunks])
+            emb_s = vectors[1]
+            lecture_only = _assemble_artifacts(
+                lecture_text,
+                text_analysis.top_terms(lecture_text, n=TERMINOLOGY_TOP_N),
+                "",
+                [],
+                lecture_embedding=vectors[0],
+                reference_embedding=np.zeros_like(vectors[0]),
+                chunk_embeddings=vectors[2:],
+                key_point_embeddings=np.zeros((0, vectors.shape[1]), dtype=np.float32),
+            )
+            yield "metric", ("terminology", *_score_terminology(student_summary, lecture_only))
+            yield "metric", ("relevance", *_score_relevance(emb_s, lecture_only))
+            yield from _coherence_if_ready()
+
+            reference_summary, key_points = wait_reference()
+            reference_vectors = _encode([reference_summary, *key_points])
+            artifacts = _assemble_artifacts(
+                lecture_text,
+                lecture_only.terms,
+                reference_summary,
+                key_points,
+                lecture_embedding=lecture_only.lecture_embedding,
+                reference_embedding=reference_vectors[0],
+                chunk_embeddings=lecture_only.chunk_embeddings,
+                key_point_embeddings=reference_vectors[1:],
+            )
+
+            rouge = artifacts.rouge_reference.score(rouge_tokenize(student_summary))
+            yield "metric", ("correctness", *_score_correctness(emb_s, rouge, artifacts))
+            yield "metric", ("conciseness", *_score_conciseness(student_summary, reference_summary))
+            yield "metric", ("completeness", *_score_completeness(emb_s, rouge, artifacts))
+
+        yield from _coherence_if_ready(block=True)
+
+    yield "artifacts", artifacts
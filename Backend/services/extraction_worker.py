@@ -0,0 +1,145 @@
+"""
+Background PDF extraction worker pool.
+
+PyMuPDF parsing and Tesseract OCR are CPU-bound and used to run directly on
+the event loop inside request handlers, freezing the API while large decks
+were processed.  Extraction now runs in a dedicated process pool; request
+paths only enqueue work and await the result.  Every document extraction is
+recorded in the ``extraction_jobs`` table so other workers (and the UI) can
+see that a document is being processed instead of starting a duplicate job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from Core.config import settings
+from DB import crud
+
+_POLL_INTERVAL_S = 1.0
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = Lock()
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # "spawn" keeps workers independent of the event loop / DB
+                # connections held by the API process.
+                _pool = ProcessPoolExecutor(
+                    max_workers=max(1, settings.EXTRACTION_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _retire_pool(pool: ProcessPoolExecutor) -> None:
+    """Stop handing jobs to *pool*; later jobs get a fresh pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_extraction_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a picklable, module-level function in the extraction process pool.
+
+    A worker process cannot be interrupted mid-job, so on timeout the pool is
+    retired instead: later jobs go to a fresh pool and no longer queue behind
+    the stuck worker, which exits once its job ends (jobs already running in
+    the old pool still finish normally).
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        future = loop.run_in_executor(pool, fn, *args)
+        return await asyncio.wait_for(future, timeout=settings.EXTRACTION_JOB_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        print(f"⚠️  Extraction timed out after {settings.EXTRACTION_JOB_TIMEOUT_S}s — starting a fresh worker pool")
+        _retire_pool(pool)
+        raise
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM during OCR) — rebuild the pool for the next job.
+        _retire_pool(pool)
+        raise
+
+
+async def single_flight(key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Share one in-flight coroutine between concurrent callers in this process."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def run_document_extraction(
+    db: AsyncSession,
+    document_id: Optional[int],
+    source: str,
+    fn: Callable[..., str],
+    *args: Any,
+) -> str:
+    """Record an extraction job, run *fn* in the pool and store the outcome."""
+    job = await crud.create_extraction_job(db, document_id, source)
+    try:
+        text = await run_in_extraction_pool(fn, *args)
+    except Exception as exc:
+        await crud.finish_extraction_job(db, job, error=str(exc) or exc.__class__.__name__)
+        raise
+    await crud.finish_extraction_job(db, job, chars=len(text or ""))
+    return text
+
+
+async def wait_for_running_extraction(db: AsyncSession, doc) -> Optional[str]:
+    """If another worker process is already extracting *doc*, wait for its text.
+
+    Returns the stored text once that job finishes, or None when there is no
+    live job (or it failed / timed out) and the caller should extract itself.
+    """
+    if f"doc:{doc.id}" in _inflight:
+        return None
+    job = await crud.get_latest_extraction_job(db, doc.id)
+    if not job or job.status != "running":
+        return None
+
+    deadline = _as_utc(job.started_at) + timedelta(seconds=settings.EXTRACTION_JOB_TIMEOUT_S)
+    while datetime.now(timezone.utc) < deadline:
+        await asyncio.sleep(_POLL_INTERVAL_S)
+        await db.refresh(job)
+        if job.status == "running":
+            continue
+        if job.status == "done":
+            await db.refresh(doc)
+            if doc.raw_text and doc.raw_text.strip():
+                return doc.raw_text
+        return None
+    return None
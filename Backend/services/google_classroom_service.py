@@ -7,11 +7,43 @@ Endpoints used:
   GET /courses/{id}/courseWorkMaterials       → pure study materials
   GET /courses/{id}/announcements             → teacher announcements
   GET /courses/{id}/courseWork                → assignments (filtered to Drive-attached only)
+
+All list endpoints are paginated: ``iter_pages`` follows ``nextPageToken``
+with CLASSROOM_PAGE_SIZE items per page and requests the next page while
+the caller is still processing the current one.  The ``iter_*`` methods
+stream pages into the sync pipeline; the ``fetch_*`` methods collect every
+page into a list.  A page that cannot be fetched raises ClassroomFetchError
+rather than silently cutting the list short.
+
+Incremental sync: given ``since`` (the course's stored watermark) the
+``iter_*`` methods request ``orderBy=updateTime desc``, yield only items
+updated after it and stop paging at the first older item, so an unchanged
+course costs one small request per item type.
 """
+import asyncio
+import contextlib
 import httpx
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 from datetime import datetime, timezone
 
+from Core.config import settings
+from services.http_client import request_with_retry
+
+class ClassroomFetchError(Exception):
+    """A page of a Classroom list could not be fetched (see GoogleClassroomService._get)."""
+
+
+def parse_update_time(item: Dict) -> Optional[datetime]:
+    """The item's RFC 3339 ``updateTime`` as an aware UTC datetime, or None."""
+    value = item.get("updateTime")
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+    except ValueError:
+        return None
+
+
 class GoogleClassroomService:
     """Service for all Google Classroom API calls"""
 
@@ -25,23 +57,24 @@ class GoogleClassroomService:
         Shared async GET helper.
         Returns parsed JSON dict on success, None on any error.
         Handles 401 / 403 / timeout explicitly so callers get clean None.
+        Uses the shared pooled client; 429 / 5xx are retried with backoff.
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    url,
-                    headers={"Authorization": f"Bearer {access_token}"},
-                    params=params or {}
-                )
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 401:
-                    print(f"❌ 401 Unauthorized on {url} — token may be expired")
-                elif response.status_code == 403:
-                    print(f"❌ 403 Forbidden on {url} — missing scope or permission")
-                else:
-                    print(f"❌ {response.status_code} on {url}: {response.text}")
-                return None
+            response = await request_with_retry(
+                "GET",
+                url,
+                headers={"Authorization": f"Bearer {access_token}"},
+                params=params or {}
+            )
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 401:
+                print(f"❌ 401 Unauthorized on {url} — token may be expired")
+            elif response.status_code == 403:
+                print(f"❌ 403 Forbidden on {url} — missing scope or permission")
+            else:
+                print(f"❌ {response.status_code} on {url}: {response.text}")
+            return None
         except httpx.TimeoutException:
             print(f"❌ Timeout on {url}")
             return None
@@ -49,6 +82,73 @@ class GoogleClassroomService:
             print(f"❌ Unexpected error on {url}: {e}")
             return None
 
+    async def iter_pages(
+        self,
+        url: str,
+        access_token: str,
+        items_key: str,
+        params: dict = None,
+        page_size: Optional[int] = None,
+        strict: bool = True,
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Yield the items of every page of a list endpoint, following nextPageToken.
+        The next page is already being fetched while the caller handles the
+        current one. A failed page raises ClassroomFetchError; with
+        ``strict=False`` it just ends the stream (what was yielded stands).
+        """
+        base_params = {**(params or {}), "pageSize": page_size or settings.CLASSROOM_PAGE_SIZE}
+        pending = asyncio.create_task(self._get(url, access_token, base_params))
+        try:
+            while pending is not None:
+                data = await pending
+                pending = None
+                if data is None:
+                    if strict:
+                        raise ClassroomFetchError(f"Failed to fetch a page of {url}")
+                    return
+                next_token = data.get("nextPageToken")
+                if next_token:
+                    pending = asyncio.create_task(
+                        self._get(url, access_token, {**base_params, "pageToken": next_token})
+                    )
+                yield data.get(items_key, [])
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _iter_updated(
+        self, url: str, access_token: str, items_key: str, since: Optional[datetime]
+    ) -> AsyncIterator[List[Dict]]:
+        """Pages of items updated after *since* (all items when None), newest first."""
+        if since is None:
+            async with contextlib.aclosing(self.iter_pages(url, access_token, items_key)) as pages:
+                async for page in pages:
+                    yield page
+            return
+        params = {"orderBy": "updateTime desc"}
+        # aclosing: stopping early must cancel the next-page prefetch now,
+        # not whenever the abandoned generator is garbage-collected.
+        pages = self.iter_pages(url, access_token, items_key, params=params)
+        async with contextlib.aclosing(pages):
+            async for page in pages:
+                fresh = []
+                for item in page:
+                    updated = parse_update_time(item)
+                    if updated is not None and updated <= since:
+                        # Everything after this is older still: stop paging.
+                        yield fresh
+                        return
+                    fresh.append(item)
+                yield fresh
+
+    @staticmethod
+    async def _collect(pages: AsyncIterator[List[Dict]]) -> List[Dict]:
+        items = []
+        async for page in pages:
+            items.extend(page)
+        return items
+
     # -------------------------
     # Courses
     # -------------------------
@@ -57,17 +157,23 @@ class GoogleClassroomService:
         Fetch all courses for the authenticated user.
         Returns list of course dicts from Google.
         Each dict contains at minimum: id, name
+        Raises ClassroomFetchError if any page fails, so a partial list is
+        never mistaken for the full one.
         """
-        data = await self._get(f"{self.BASE_URL}/courses", access_token)
-        if not data:
-            return []
-        courses = data.get("courses", [])
+        courses = await self._collect(self.iter_pages(f"{self.BASE_URL}/courses", access_token, "courses"))
         print(f"✅ Fetched {len(courses)} courses")
         return courses
 
     # -------------------------
     # Course Materials
     # -------------------------
+    def iter_course_materials(
+        self, classroom_id: str, access_token: str, since: Optional[datetime] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """Pages of courseWorkMaterials updated after *since* (see fetch_course_materials)."""
+        url = f"{self.BASE_URL}/courses/{classroom_id}/courseWorkMaterials"
+        return self._iter_updated(url, access_token, "courseWorkMaterial", since)
+
     async def fetch_course_materials(self, classroom_id: str, access_token: str) -> List[Dict]:
         """
         Fetch pure study materials posted in a course (courseWorkMaterials).
@@ -86,16 +192,20 @@ class GoogleClassroomService:
         doc_type will be set to "material"
         """
         url = f"{self.BASE_URL}/courses/{classroom_id}/courseWorkMaterials"
-        data = await self._get(url, access_token)
-        if not data:
-            return []
-        items = data.get("courseWorkMaterial", [])
+        items = await self._collect(self.iter_pages(url, access_token, "courseWorkMaterial"))
         print(f"  ✅ Fetched {len(items)} materials for course {classroom_id}")
         return items
 
     # -------------------------
     # Announcements
     # -------------------------
+    def iter_announcements(
+        self, classroom_id: str, access_token: str, since: Optional[datetime] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """Pages of announcements updated after *since* (see fetch_announcements)."""
+        url = f"{self.BASE_URL}/courses/{classroom_id}/announcements"
+        return self._iter_updated(url, access_token, "announcements", since)
+
     async def fetch_announcements(self, classroom_id: str, access_token: str) -> List[Dict]:
         """
         Fetch all announcements posted in a course.
@@ -109,16 +219,25 @@ class GoogleClassroomService:
         doc_type will be set to "announcement"
         """
         url = f"{self.BASE_URL}/courses/{classroom_id}/announcements"
-        data = await self._get(url, access_token)
-        if not data:
-            return []
-        items = data.get("announcements", [])
+        items = await self._collect(self.iter_pages(url, access_token, "announcements"))
         print(f"  ✅ Fetched {len(items)} announcements for course {classroom_id}")
         return items
 
     # -------------------------
     # Assignments (courseWork)
     # -------------------------
+    @staticmethod
+    def _has_drive_file(item: Dict) -> bool:
+        return any("driveFile" in m for m in item.get("materials", []))
+
+    async def iter_coursework(
+        self, classroom_id: str, access_token: str, since: Optional[datetime] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """Pages of Drive-attached courseWork updated after *since* (see fetch_coursework)."""
+        url = f"{self.BASE_URL}/courses/{classroom_id}/courseWork"
+        async for page in self._iter_updated(url, access_token, "courseWork", since):
+            yield [item for item in page if self._has_drive_file(item)]
+
     async def fetch_coursework(self, classroom_id: str, access_token: str) -> List[Dict]:
         """
         Fetch assignments from a course, filtered to only those WITH Drive file attachments.
@@ -134,19 +253,10 @@ class GoogleClassroomService:
         doc_type will be set to "coursework"
         """
         url = f"{self.BASE_URL}/courses/{classroom_id}/courseWork"
-        data = await self._get(url, access_token)
-        if not data:
-            return []
-
-        all_items = data.get("courseWork", [])
+        all_items = await self._collect(self.iter_pages(url, access_token, "courseWork"))
 
         # Filter: only keep items that have at least one driveFile attachment
-        filtered = []
-        for item in all_items:
-            materials = item.get("materials", [])
-            has_drive_file = any("driveFile" in m for m in materials)
-            if has_drive_file:
-                filtered.append(item)
+        filtered = [item for item in all_items if self._has_drive_file(item)]
 
         skipped = len(all_items) - len(filtered)
         print(f"  ✅ Fetched {len(filtered)} coursework items for course {classroom_id} "
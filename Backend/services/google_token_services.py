@@ -6,6 +6,8 @@ Handles refreshing access tokens
 import httpx
 from typing import Optional, Dict
 
+from services.http_client import request_with_retry
+
 
 async def refresh_google_token(
     refresh_token: str,
@@ -34,27 +36,26 @@ async def refresh_google_token(
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, data=data)
+        response = await request_with_retry("POST", url, data=data)
+        
+        if response.status_code == 200:
+            token_data = response.json()
+            # Google returns:  
+            # {
+            #   "access_token": "ya29.a0AfB_.. .",
+            #   "expires_in": 3599,
+            #   "token_type": "Bearer",
+            #   "scope": "..."
+            # }
+            return {
+                "access_token":  token_data. get("access_token"),
+                "expires_in": token_data.get("expires_in", 3599)
+            }
+        else:
+            print(f"❌ Token refresh failed: {response.status_code}")
+            print(f"Response: {response. text}")
+            return None
             
-            if response.status_code == 200:
-                token_data = response.json()
-                # Google returns:  
-                # {
-                #   "access_token": "ya29.a0AfB_.. .",
-                #   "expires_in": 3599,
-                #   "token_type": "Bearer",
-                #   "scope": "..."
-                # }
-                return {
-                    "access_token":  token_data. get("access_token"),
-                    "expires_in": token_data.get("expires_in", 3599)
-                }
-            else:
-                print(f"❌ Token refresh failed: {response.status_code}")
-                print(f"Response: {response. text}")
-                return None
-                
     except httpx.HTTPError as e:
         print(f"❌ HTTP error during token refresh: {e}")
         return None
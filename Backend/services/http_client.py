@@ -0,0 +1,102 @@
+"""
+Shared HTTP client for Google APIs (Classroom, Drive, OAuth token refresh).
+
+Every Classroom call and Drive download used to open its own
+``httpx.AsyncClient``, so a full sync paid a fresh TCP + TLS handshake per
+request.  All of them now go through one pooled client per event loop:
+
+  - keep-alive connection pool (GOOGLE_HTTP_MAX_CONNECTIONS) and HTTP/2
+    when the ``h2`` package is installed (``httpx[http2]``);
+  - at most GOOGLE_HTTP_MAX_CONCURRENCY requests in flight at once, to stay
+    inside Google's per-user quota;
+  - 429 and 5xx responses and transport errors are retried up to
+    GOOGLE_HTTP_MAX_RETRIES times with exponential backoff and full jitter,
+    honouring ``Retry-After`` when Google sends one.
+
+The client is closed from the app's shutdown hook (``close_http_client``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Optional
+
+import httpx
+
+from Core.config import settings
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_BACKOFF_S = 30.0
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The pooled client for the running event loop (created on first use)."""
+    global _client, _client_loop, _semaphore
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(settings.GOOGLE_HTTP_TIMEOUT_S),
+            limits=httpx.Limits(
+                max_connections=settings.GOOGLE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GOOGLE_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+        _client_loop = loop
+        _semaphore = asyncio.Semaphore(max(1, settings.GOOGLE_HTTP_MAX_CONCURRENCY))
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def _backoff_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), _MAX_BACKOFF_S)
+    ceiling = min(_MAX_BACKOFF_S, settings.GOOGLE_HTTP_BACKOFF_BASE_S * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+async def request_with_retry(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request through the shared client, retrying 429 / 5xx / transport errors.
+
+    Returns the last response (which may still be an error status once the
+    retries are used up); re-raises the last transport error if every
+    attempt failed before getting a response.
+    """
+    client = get_http_client()
+    max_retries = max(0, settings.GOOGLE_HTTP_MAX_RETRIES)
+    for attempt in range(max_retries + 1):
+        response = None
+        try:
+            async with _semaphore:
+                response = await client.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+                return response
+            reason = f"HTTP {response.status_code}"
+        except httpx.TransportError as e:
+            if attempt == max_retries:
+                raise
+            reason = type(e).__name__
+        delay = _backoff_delay(attempt, response)
+        print(f"🔁 {reason} on {url} — retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
@@ -0,0 +1,194 @@
+"""
+Durable background job queue backed by the ``background_jobs`` table.
+
+Post-sync work (indexing Drive files, auto-summaries, auto-quizzes) used to
+run as FastAPI ``BackgroundTasks``: one document at a time, lost on every
+restart or ``--reload``, and deduplicated with an in-memory set that other
+workers could not see.  Jobs are now rows:
+
+  - ``enqueue_jobs`` inserts one job per document; a unique ``dedupe_key``
+    keeps at most one queued/running job per (kind, document) across all
+    processes;
+  - every process runs ``job_worker_loop``, which claims due jobs (highest
+    priority first) with an atomic compare-and-set UPDATE, so several
+    workers can share the table without running a job twice;
+  - a claimed job holds a lease (JOB_LEASE_S) that is renewed while it runs;
+    if the process dies, the lease expires and another worker picks it up.
+    A worker that loses its lease stops the job, and only the lease holder
+    can record a job's outcome;
+  - failures are retried with exponential backoff (JOB_RETRY_BASE_S) up to
+    JOB_MAX_ATTEMPTS, then the job is marked failed with its error;
+  - JOB_KIND_CONCURRENCY caps how many jobs of each kind one process runs
+    at once (e.g. indexing in parallel, LLM calls one at a time).
+
+Handlers are registered per kind (see services/sync_jobs.py) and receive the
+job's document and user IDs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from Core.config import settings
+from DB import crud
+from DB.session import AsyncSessionLocal
+
+JobHandler = Callable[[int, Optional[int]], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+_priorities: Dict[str, int] = {}
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def register_handler(kind: str, handler: JobHandler, priority: int = 0) -> None:
+    _handlers[kind] = handler
+    _priorities[kind] = priority
+
+
+def kind_concurrency() -> Dict[str, int]:
+    """Per-kind limits from JOB_KIND_CONCURRENCY; registered kinds not listed get 1."""
+    limits = {kind: 1 for kind in _handlers}
+    for entry in settings.JOB_KIND_CONCURRENCY.split(","):
+        kind, _, value = entry.strip().partition(":")
+        if kind in limits and value.strip().isdigit():
+            limits[kind] = max(0, int(value))
+    return limits
+
+
+def retry_delay(attempts: int) -> float:
+    return settings.JOB_RETRY_BASE_S * (2 ** max(0, attempts - 1))
+
+
+async def enqueue_jobs(
+    db,
+    kind: str,
+    document_ids: List[int],
+    user_id: Optional[int] = None,
+    priority: Optional[int] = None,
+) -> List[int]:
+    """Queue *kind* for each document; returns the IDs that were not already queued."""
+    if kind not in _handlers:
+        raise ValueError(f"No job handler registered for {kind!r}")
+    return await crud.enqueue_background_jobs(
+        db,
+        kind=kind,
+        document_ids=document_ids,
+        user_id=user_id,
+        priority=_priorities[kind] if priority is None else priority,
+        max_attempts=max(1, settings.JOB_MAX_ATTEMPTS),
+    )
+
+
+async def _keep_lease(job_id: int, handler_task: asyncio.Task) -> None:
+    """Renew the job's lease while *handler_task* runs; cancel the handler once the lease is lost.
+
+    A failed renewal is retried until the current lease would have expired.
+    """
+    interval = max(1.0, settings.JOB_LEASE_S / 3)
+    loop = asyncio.get_running_loop()
+    expires = loop.time() + settings.JOB_LEASE_S
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as db:
+                renewed = await crud.extend_background_job_lease(db, job_id, WORKER_ID, settings.JOB_LEASE_S)
+        except Exception as exc:
+            if loop.time() + interval < expires:
+                print(f"⚠️  Job {job_id} lease renewal failed ({exc}) — retrying")
+                continue
+            renewed = False
+        if not renewed:
+            print(f"⚠️  Job {job_id} lost its lease — stopping it")
+            handler_task.cancel()
+            return
+        expires = loop.time() + settings.JOB_LEASE_S
+
+
+async def _finish_job(job_id: int, **outcome) -> bool:
+    async with AsyncSessionLocal() as db:
+        return await crud.finish_background_job(db, job_id, WORKER_ID, **outcome)
+
+
+async def run_job(job_id: int) -> Optional[str]:
+    """Claim and run one job; returns its final status, or None if another worker claimed it.
+
+    The claim's session is closed before the handler runs, and the outcome is
+    only recorded while this worker still holds the lease.
+    """
+    async with AsyncSessionLocal() as db:
+        job = await crud.claim_background_job(db, job_id, WORKER_ID, settings.JOB_LEASE_S)
+    if job is None:
+        return None
+    handler = _handlers.get(job.kind)
+    print(f"⚙️  Job {job.id} {job.kind} doc {job.document_id} started (attempt {job.attempts}/{job.max_attempts})")
+
+    async def run_handler() -> None:
+        if handler is None:
+            raise RuntimeError(f"No job handler registered for {job.kind!r}")
+        await handler(job.document_id, job.user_id)
+
+    handler_task = asyncio.create_task(run_handler())
+    heartbeat = asyncio.create_task(_keep_lease(job.id, handler_task))
+    try:
+        await handler_task
+    except asyncio.CancelledError:
+        if heartbeat.done() and not heartbeat.cancelled():
+            # The lease expired: the job is no longer ours to finish.
+            return None
+        # Shutting down: hand the job back without spending an attempt.
+        await asyncio.shield(_finish_job(job.id, retry_after_s=0, count_attempt=False))
+        raise
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            if not await _finish_job(job.id, error=error, retry_after_s=delay):
+                return None
+            print(f"🔁 Job {job.id} {job.kind} failed ({error}) — retry in {delay:.0f}s")
+            return "queued"
+        if not await _finish_job(job.id, error=error):
+            return None
+        print(f"❌ Job {job.id} {job.kind} failed after {job.attempts} attempt(s): {error}")
+        return "failed"
+    finally:
+        heartbeat.cancel()
+
+    if not await _finish_job(job.id):
+        print(f"⚠️  Job {job.id} {job.kind} finished after losing its lease — result not recorded")
+        return None
+    print(f"✅ Job {job.id} {job.kind} doc {job.document_id} done")
+    return "done"
+
+
+async def job_worker_loop() -> None:
+    running: Dict[str, set] = {kind: set() for kind in _handlers}
+    try:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    failed = await crud.fail_exhausted_background_jobs(db)
+                if failed:
+                    print(f"❌ {failed} job(s) failed: lease expired on their final attempt")
+                limits = kind_concurrency()
+                for kind, tasks in running.items():
+                    tasks.difference_update({t for t in tasks if t.done()})
+                    free = limits.get(kind, 0) - len(tasks)
+                    if free <= 0:
+                        continue
+                    async with AsyncSessionLocal() as db:
+                        job_ids = await crud.get_claimable_background_job_ids(db, [kind], free)
+                    for job_id in job_ids:
+                        tasks.add(asyncio.create_task(run_job(job_id)))
+            except Exception as exc:
+                print(f"⚠️  Job worker loop error: {exc}")
+            await asyncio.sleep(settings.JOB_POLL_INTERVAL_S)
+    finally:
+        tasks = [t for kind_tasks in running.values() for t in kind_tasks if not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -3,18 +3,27 @@ PDF loading, chunking, and vector-store management.
 
 Extracted from Ai Team/Main/chatbot.ipynb — sections 4 & 5.
 
-Uses ChromaDB's built-in default embedding function (onnxruntime-based
-all-MiniLM-L6-v2) to avoid heavy torch/sentence-transformers dependency.
+Embeddings come from the shared onnxruntime all-MiniLM-L6-v2 backend
+(services/embedding_service — the same model files as ChromaDB's default
+embedding function) and are passed to Chroma explicitly, so indexing and the
+evaluator share one loaded model and no torch/sentence-transformers.
 
 OCR fallback: When a PDF page has no extractable text layer (e.g. scanned
 slides, image-based lecture PDFs), Tesseract OCR is used automatically.
+
+Layout-aware chunking: instead of fixed 1000/200 character windows, chunks
+follow the document structure (PyMuPDF blocks → headings, slides, lists) and
+carry page / section metadata so retrieval returns coherent units that can be
+cited by page.
 """
 
 import hashlib
 import io
 import os
+import re
+import statistics
 import time
-from typing import List
+from typing import Dict, List
 
 import fitz
 import chromadb
@@ -23,6 +32,7 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
 
 from Core.config import settings
+from services.embedding_service import embed_for_chroma
 
 # ── OCR helpers ────────────────────────────────────────────────────────────────
 
@@ -142,6 +152,209 @@ def split_documents(
     return splitter.split_documents(documents)
 
 
+# ── Layout-aware chunking ──────────────────────────────────────────────────────
+
+# Chunk size bounds (characters).  Chunks grow block-by-block up to
+# CHUNK_MAX_CHARS; a new heading or slide only starts a new chunk once the
+# current one holds at least CHUNK_MIN_CHARS, so tiny title slides merge.
+CHUNK_MIN_CHARS = 300
+CHUNK_MAX_CHARS = 1500
+_HEADING_MAX_CHARS = 120
+_HEADING_SIZE_RATIO = 1.15
+_LIST_ITEM_RE = re.compile(r"^\s*(?:[-•▪●◦‣*–]|\(?\d{1,2}[.)]|\(?[a-zA-Z][.)])\s+")
+_MD_HEADING_RE = re.compile(r"^\s*#{1,6}\s+\S")
+_NUMBERED_HEADING_RE = re.compile(r"^\s*(?:\d+(?:\.\d+)*\.?|[IVX]+\.|Chapter|Section|Lecture|Part)\s+\S", re.IGNORECASE)
+
+
+def _block_kind(text: str, size: float, bold: bool, body_size: float) -> str:
+    first_line = text.strip().splitlines()[0] if text.strip() else ""
+    if _LIST_ITEM_RE.match(first_line):
+        return "list"
+    short = len(text) <= _HEADING_MAX_CHARS and "\n" not in text.strip()
+    if short and not text.rstrip().endswith((".", ",", ";", ":")):
+        if size >= body_size * _HEADING_SIZE_RATIO or bold:
+            return "heading"
+    return "body"
+
+
+def load_pdf_blocks(source: str | bytes, ocr: bool = True) -> List[Dict]:
+    """Return the PDF's text blocks in reading order with layout hints.
+
+    Each block is ``{"page", "text", "kind"}`` where kind is one of
+    ``heading`` / ``list`` / ``body``.  Pages without a text layer are OCR'd
+    (when *ocr* is true) and emitted as a single body block.
+    """
+    raw_blocks: List[Dict] = []
+    sizes: List[float] = []
+    open_kwargs = {"stream": source, "filetype": "pdf"} if isinstance(source, bytes) else {"filename": source}
+    with fitz.open(**open_kwargs) as doc:
+        for page in doc:
+            page_text = _sanitize_text(page.get_text().strip())
+            if len(page_text) < MIN_TEXT_CHARS:
+                text = (_ocr_page(page) if ocr else "") or page_text
+                if text:
+                    raw_blocks.append({"page": page.number, "text": text, "size": 0.0, "bold": False})
+                continue
+            for block in page.get_text("dict").get("blocks", []):
+                if block.get("type", 0) != 0:
+                    continue
+                lines = []
+                block_sizes = []
+                bold_chars = 0
+                total_chars = 0
+                for line in block.get("lines", []):
+                    spans = line.get("spans", [])
+                    line_text = "".join(span.get("text", "") for span in spans).strip()
+                    if not line_text:
+                        continue
+                    lines.append(line_text)
+                    for span in spans:
+                        n = len(span.get("text", "").strip())
+                        if not n:
+                            continue
+                        block_sizes.append(float(span.get("size", 0.0)))
+                        sizes.extend([float(span.get("size", 0.0))] * min(n, 50))
+                        total_chars += n
+                        if span.get("flags", 0) & 16:
+                            bold_chars += n
+                text = _sanitize_text("\n".join(lines).strip())
+                if not text:
+                    continue
+                raw_blocks.append({
+                    "page": page.number,
+                    "text": text,
+                    "size": max(block_sizes) if block_sizes else 0.0,
+                    "bold": total_chars > 0 and bold_chars / total_chars > 0.6,
+                })
+
+    body_size = statistics.median(sizes) if sizes else 0.0
+    blocks = []
+    for b in raw_blocks:
+        kind = "body" if not b["size"] else _block_kind(b["text"], b["size"], b["bold"], body_size)
+        blocks.append({"page": b["page"], "text": b["text"], "kind": kind})
+    return blocks
+
+
+def text_to_blocks(text: str) -> List[Dict]:
+    """Recover heading / list / paragraph blocks from plain extracted text.
+
+    Used when the original PDF is no longer available; page numbers are unknown.
+    """
+    blocks: List[Dict] = []
+    for para in re.split(r"\n\s*\n", text or ""):
+        lines = [ln.strip() for ln in para.strip().splitlines() if ln.strip()]
+        if not lines:
+            continue
+        current: List[str] = []
+        current_kind = "body"
+        for line in lines:
+            is_heading = bool(_MD_HEADING_RE.match(line)) or (
+                len(line) <= 80
+                and not line.endswith((".", ",", ";", ":", "?", "!"))
+                and (line.isupper() or bool(_NUMBERED_HEADING_RE.match(line)) or line.istitle())
+                and len(line.split()) <= 12
+            )
+            kind = "heading" if is_heading else ("list" if _LIST_ITEM_RE.match(line) else "body")
+            if kind == "heading" or (kind != current_kind and current):
+                if current:
+                    blocks.append({"page": None, "text": "\n".join(current), "kind": current_kind})
+                current = []
+            if kind == "heading":
+                blocks.append({"page": None, "text": line.lstrip("# ").strip(), "kind": "heading"})
+                current_kind = "body"
+                continue
+            current.append(line)
+            current_kind = kind
+        if current:
+            blocks.append({"page": None, "text": "\n".join(current), "kind": current_kind})
+    return blocks
+
+
+def chunk_blocks(
+    blocks: List[Dict],
+    min_chars: int = CHUNK_MIN_CHARS,
+    max_chars: int = CHUNK_MAX_CHARS,
+) -> List[Document]:
+    """Group layout blocks into variable-size, structure-aligned chunks.
+
+    Boundaries prefer headings and page (slide) breaks; list items stay with
+    their list.  Oversized blocks are split on sentence / line boundaries.
+    Each chunk carries ``page``, ``page_end`` and ``section`` metadata when known.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=max_chars,
+        chunk_overlap=0,
+        length_function=len,
+        separators=["\n\n", "\n", ". ", " ", ""],
+    )
+    chunks: List[Document] = []
+    parts: List[str] = []
+    pages: List[int] = []
+    section: str | None = None
+    chunk_section: str | None = None
+    size = 0
+
+    def flush() -> None:
+        nonlocal parts, pages, size
+        text = "\n".join(parts).strip()
+        if text:
+            metadata: Dict = {}
+            if pages:
+                metadata["page"] = min(pages)
+                metadata["page_end"] = max(pages)
+            if chunk_section:
+                metadata["section"] = chunk_section[:200]
+            chunks.append(Document(page_content=text, metadata=metadata))
+        parts, pages, size = [], [], 0
+
+    for block in blocks:
+        text = block["text"].strip()
+        if not text:
+            continue
+        page = block.get("page")
+        kind = block.get("kind", "body")
+        new_page = page is not None and pages and page != pages[-1]
+
+        if size >= min_chars and (kind == "heading" or new_page):
+            flush()
+        if kind == "heading":
+            section = text
+        if size and size + len(text) + 1 > max_chars:
+            flush()
+        if not parts:
+            chunk_section = section
+
+        pieces = splitter.split_text(text) if len(text) > max_chars else [text]
+        for i, piece in enumerate(pieces):
+            if i:
+                flush()
+                chunk_section = section
+            parts.append(piece)
+            size += len(piece) + 1
+            if page is not None:
+                pages.append(page)
+    flush()
+    return chunks
+
+
+def layout_chunks_for_source(text: str | None, pdf_path: str | None = None) -> List[Document]:
+    """Chunk a document from its PDF layout when available, else from its text.
+
+    The PDF is parsed without OCR (the stored text already contains OCR
+    output); if the PDF yields much less text than was stored — e.g. scanned
+    slides — the structure-aware text chunker is used instead.
+    """
+    if pdf_path and os.path.exists(pdf_path):
+        try:
+            blocks = load_pdf_blocks(pdf_path, ocr=not text)
+            layout_chars = sum(len(b["text"]) for b in blocks)
+            if blocks and (not text or layout_chars >= 0.5 * len(text.strip())):
+                return chunk_blocks(blocks)
+        except Exception as e:
+            print(f"⚠️  Layout chunking failed for {pdf_path}: {e}")
+    return chunk_blocks(text_to_blocks(text or ""))
+
+
 def extract_text_from_pdf(pdf_path: str) -> str:
     """Load a PDF and return its full plain text (all pages joined)."""
     docs = load_pdf(pdf_path)
@@ -180,32 +393,29 @@ def _get_collection(course_id: int) -> chromadb.Collection:
     )
 
 
-def index_pdf_for_course(
-    pdf_path: str,
-    course_id: int,
-    document_id: int | None = None,
+def _upsert_chunks(
+    collection: chromadb.Collection,
+    chunks: List[Document],
+    id_prefix: str,
+    source: str,
+    document_id: int | None,
 ) -> int:
-    """
-    Process a PDF, chunk it, and upsert the chunks into the course's
-    ChromaDB collection.  Returns the number of chunks indexed.
-    """
-    documents = load_pdf(pdf_path)
-    chunks = split_documents(documents)
-    collection = _get_collection(course_id)
+    """Replace a source's vectors with *chunks* (stale tail chunks are removed)."""
+    if document_id is not None:
+        collection.delete(where={"document_id": document_id})
+    else:
+        collection.delete(where={"source": source})
 
-    # Build IDs, documents, and metadata for ChromaDB
     ids = []
     texts = []
     metadatas = []
     for i, chunk in enumerate(chunks):
-        chunk_id = hashlib.md5(f"{pdf_path}:{i}".encode()).hexdigest()
+        chunk_id = hashlib.md5(f"{id_prefix}:{i}".encode()).hexdigest()
         ids.append(chunk_id)
         texts.append(chunk.page_content)
-        metadata = {
-            "source": pdf_path,
-            "page": chunk.metadata.get("page", 0),
-            "chunk_index": i,
-        }
+        metadata = {"source": source, "chunk_index": i}
+        # Chroma rejects None metadata values — only keep what is known.
+        metadata.update({k: v for k, v in chunk.metadata.items() if v is not None})
         if document_id is not None:
             metadata["document_id"] = document_id
         metadatas.append(metadata)
@@ -217,57 +427,65 @@ def index_pdf_for_course(
         collection.upsert(
             ids=ids[start:end],
             documents=texts[start:end],
+            embeddings=embed_for_chroma(texts[start:end]),
             metadatas=metadatas[start:end],
         )
 
     return len(chunks)
 
 
+def index_pdf_for_course(
+    pdf_path: str,
+    course_id: int,
+    document_id: int | None = None,
+) -> int:
+    """
+    Process a PDF into layout-aware chunks and upsert them into the course's
+    ChromaDB collection.  Returns the number of chunks indexed.
+    """
+    chunks = chunk_blocks(load_pdf_blocks(pdf_path))
+    return _upsert_chunks(
+        _get_collection(course_id),
+        chunks,
+        id_prefix=pdf_path,
+        source=pdf_path,
+        document_id=document_id,
+    )
+
+
 def index_text_for_course(
     text: str,
     course_id: int,
     document_id: int | None = None,
+    pdf_path: str | None = None,
 ) -> int:
     """
-    Chunk plain text and upsert it into the course's ChromaDB collection.
-    Returns the number of chunks indexed.
+    Chunk a document and upsert it into the course's ChromaDB collection.
+
+    When the source PDF (*pdf_path*) is still on disk the chunks follow its
+    layout and carry page numbers; otherwise structure is recovered from the
+    plain text.  Returns the number of chunks indexed.
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""],
+    chunks = layout_chunks_for_source(text, pdf_path)
+    if document_id is not None:
+        source = f"document:{document_id}"
+    else:
+        # Untracked text is keyed by its content, so indexing one text
+        # neither replaces nor collides with another.
+        source = f"text:{hashlib.sha256((text or '').encode('utf-8')).hexdigest()[:32]}"
+    return _upsert_chunks(
+        _get_collection(course_id),
+        chunks,
+        id_prefix=f"{course_id}:{source}",
+        source=source,
+        document_id=document_id,
     )
-    chunks = splitter.split_text(text)
-    collection = _get_collection(course_id)
-
-    ids = []
-    texts = []
-    metadatas = []
-    for i, chunk_text in enumerate(chunks):
-        chunk_key = f"{course_id}:{document_id}:{i}"
-        chunk_id = hashlib.md5(chunk_key.encode()).hexdigest()
-        ids.append(chunk_id)
-        texts.append(chunk_text)
-        metadata = {
-            "source": f"document:{document_id}" if document_id is not None else "text",
-            "page": None,
-            "chunk_index": i,
-        }
-        if document_id is not None:
-            metadata["document_id"] = document_id
-        metadatas.append(metadata)
 
-    batch_size = 100
-    for start in range(0, len(ids), batch_size):
-        end = start + batch_size
-        collection.upsert(
-            ids=ids[start:end],
-            documents=texts[start:end],
-            metadatas=metadatas[start:end],
-        )
 
-    return len(chunks)
+def is_document_indexed(course_id: int, document_id: int) -> bool:
+    """Whether the course's vector store already holds chunks for *document_id*."""
+    found = _get_collection(course_id).get(where={"document_id": document_id}, limit=1, include=[])
+    return bool(found["ids"])
 
 
 def query_course_documents(
@@ -316,7 +534,7 @@ def query_course_documents(
                     return []
 
             query_kwargs = {
-                "query_texts": [query],
+                "query_embeddings": embed_for_chroma([query]),
                 "n_results": min(n_results, total),
             }
             if document_id is not None:
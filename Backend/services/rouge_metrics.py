@@ -0,0 +1,105 @@
+"""
+ROUGE-1/2/L for many predictions against one reference.
+
+``rouge_score.RougeScorer.score`` re-tokenises and re-stems the reference for
+every call and computes ROUGE-L with a pure-Python O(n·m) table.  The
+evaluator scores a whole class against the same reference summary, so:
+
+  - tokens match ``rouge_score`` exactly (same tokenizer, Porter stemming of
+    words longer than 3 characters) but stems are memoised process-wide;
+  - the reference is tokenised once into a ``ReferenceProfile`` holding its
+    n-gram counts and per-token bit masks (the tokens themselves are stored
+    in the lecture evaluation cache);
+  - ROUGE-L uses a bit-parallel LCS over the reference masks, i.e. one big
+    integer operation per prediction token.
+
+Scores are ``rouge_score.scoring.Score`` tuples identical to RougeScorer's.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+from rouge_score import tokenize as rouge_tokenize
+from rouge_score.scoring import Score, fmeasure
+
+
+class _MemoStemmer:
+    """Porter stemmer (as used by rouge_score) with a shared stem cache."""
+
+    def __init__(self):
+        from nltk.stem import porter
+        self.stem = lru_cache(maxsize=100_000)(porter.PorterStemmer().stem)
+
+
+_stemmer: _MemoStemmer | None = None
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokenise exactly like ``RougeScorer(..., use_stemmer=True)``."""
+    global _stemmer
+    if _stemmer is None:
+        _stemmer = _MemoStemmer()
+    return rouge_tokenize.tokenize(text, _stemmer)
+
+
+def _ngrams(tokens: Sequence[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _ngram_score(target: Counter, prediction: Counter) -> Score:
+    overlap = sum(min(count, prediction[gram]) for gram, count in target.items())
+    precision = overlap / max(sum(prediction.values()), 1)
+    recall = overlap / max(sum(target.values()), 1)
+    return Score(precision=precision, recall=recall, fmeasure=fmeasure(precision, recall))
+
+
+@dataclass
+class ReferenceProfile:
+    """Pre-tokenised reference with everything ROUGE-1/2/L needs from it."""
+    tokens: List[str]
+    unigrams: Counter = field(init=False)
+    bigrams: Counter = field(init=False)
+    _masks: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.unigrams = _ngrams(self.tokens, 1)
+        self.bigrams = _ngrams(self.tokens, 2)
+        self._masks = {}
+        for i, token in enumerate(self.tokens):
+            self._masks[token] = self._masks.get(token, 0) | (1 << i)
+
+    @classmethod
+    def from_text(cls, reference: str) -> "ReferenceProfile":
+        return cls(tokenize(reference))
+
+    def lcs_length(self, prediction: Sequence[str]) -> int:
+        """Bit-parallel LCS length (Hyyrö) between the reference and *prediction*."""
+        m = len(self.tokens)
+        all_ones = (1 << m) - 1
+        v = all_ones
+        for token in prediction:
+            u = v & self._masks.get(token, 0)
+            v = ((v + u) | (v - u)) & all_ones
+        return m - bin(v).count("1")
+
+    def score(self, prediction: Sequence[str]) -> Dict[str, Score]:
+        """rouge1 / rouge2 / rougeL of pre-tokenised *prediction* against the reference."""
+        if self.tokens and prediction:
+            lcs = self.lcs_length(prediction)
+            precision, recall = lcs / len(prediction), lcs / len(self.tokens)
+            rouge_l = Score(precision=precision, recall=recall, fmeasure=fmeasure(precision, recall))
+        else:
+            rouge_l = Score(precision=0, recall=0, fmeasure=0)
+        return {
+            "rouge1": _ngram_score(self.unigrams, _ngrams(prediction, 1)),
+            "rouge2": _ngram_score(self.bigrams, _ngrams(prediction, 2)),
+            "rougeL": rouge_l,
+        }
+
+    def score_batch(self, predictions: Sequence[str]) -> List[Dict[str, Score]]:
+        """Score many prediction texts against this reference."""
+        return [self.score(tokenize(text)) for text in predictions]
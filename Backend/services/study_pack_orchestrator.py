@@ -0,0 +1,342 @@
+"""
+Study-pack orchestrator: builds everything a synced document needs as one
+per-document DAG.
+
+After a sync, a document used to go through three separate jobs (index,
+auto-summary, auto-quiz), each reloading the document and re-extracting its
+text, one after another.  ``build_study_pack`` now plans which outputs are
+still missing, extracts the text once and runs the rest concurrently:
+
+    extract ─┬─ index                      (Chroma vectors, RAG/chat)
+             ├─ chunks ──────┐             (Chunk rows the summary links to)
+             ├─ summarize ───┴─ save_summary
+             └─ quiz                       (LLM quiz + Quiz rows)
+
+so a pack is ready in the time of its slowest branch instead of the sum.
+Every stage runs under a process-wide limit (STUDY_PACK_STAGE_CONCURRENCY),
+uses its own DB session, and is timed; a failed stage skips the stages that
+depend on it but not its siblings.  Stages re-check their output before
+writing, so re-running a pack only redoes what is still missing.  When sync
+sees a document's Drive file replaced it deletes the outputs built from the
+old file, so the next pack rebuilds all of them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from Core.config import settings
+from DB.schemas import (
+    Document as DocumentORM,
+    Chunk as ChunkORM,
+    Summary as SummaryORM,
+    SummaryChunk as SummaryChunkORM,
+    Quiz as QuizORM,
+    QuizQuestion as QuizQuestionORM,
+    QuizDocument as QuizDocumentORM,
+)
+from DB.session import AsyncSessionLocal
+from services.drive_download_service import ensure_document_text
+from services.pdf_processor import index_text_for_course, is_document_indexed
+from services.quiz_generator_service import generate_quiz
+from services.quiz_utils import find_quiz_by_doc_and_criteria
+from services.summarizer_service import summarize_text
+
+AUTO_QUIZ_N_ITEMS = 5
+AUTO_QUIZ_N_OPTIONS = 4
+_LLM_INPUT_CHARS = 15000
+
+OUTPUTS = ("index", "summary", "quiz")
+
+
+class StageSkipped(Exception):
+    """Raised by a stage that has nothing to do; its dependents are skipped too."""
+
+
+@dataclass
+class StageTiming:
+    status: str                 # done | skipped | failed
+    seconds: float = 0.0
+    detail: Optional[str] = None
+
+
+@dataclass
+class StudyPackContext:
+    """Intermediates shared by the stages of one document's DAG."""
+
+    document_id: int
+    course_id: int
+    title: str
+    pdf_path: Optional[str]
+    text: str = ""
+    chunk_ids: List[int] = field(default_factory=list)
+    summary_text: str = ""
+    # Re-checked right before each LLM stage; False skips the stage.
+    allow_llm: Optional[Callable[[], Awaitable[bool]]] = None
+
+
+@dataclass
+class StudyPackResult:
+    document_id: int
+    planned: List[str]
+    stages: Dict[str, StageTiming]
+    seconds: float
+
+    @property
+    def failed(self) -> List[str]:
+        return [name for name, timing in self.stages.items() if timing.status == "failed"]
+
+
+Stage = Tuple[Callable[[StudyPackContext], Awaitable[None]], Tuple[str, ...]]
+
+_slots: Optional[asyncio.Semaphore] = None
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _stage_slots() -> asyncio.Semaphore:
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots_loop is not loop:
+        _slots = asyncio.Semaphore(max(1, settings.STUDY_PACK_STAGE_CONCURRENCY))
+        _slots_loop = loop
+    return _slots
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+async def _extract(ctx: StudyPackContext) -> None:
+    async with AsyncSessionLocal() as db:
+        doc = await db.get(DocumentORM, ctx.document_id)
+        if doc is None:
+            raise StageSkipped("document deleted")
+        try:
+            text = await ensure_document_text(doc, db)
+        except (ValueError, PermissionError) as e:
+            # No file, no token or no text: retrying will not help.
+            raise StageSkipped(f"no extractable text ({e})")
+        ctx.pdf_path = doc.s3_path
+    if not text or not text.strip():
+        raise StageSkipped("no extractable text")
+    ctx.text = text
+
+
+async def _index(ctx: StudyPackContext) -> None:
+    await asyncio.to_thread(
+        index_text_for_course,
+        ctx.text,
+        ctx.course_id,
+        document_id=ctx.document_id,
+        pdf_path=ctx.pdf_path,
+    )
+
+
+async def _chunks(ctx: StudyPackContext) -> None:
+    async with AsyncSessionLocal() as db:
+        chunk_ids = (
+            await db.execute(
+                select(ChunkORM.id)
+                .where(ChunkORM.doc_id == ctx.document_id)
+                .order_by(ChunkORM.sequence_number)
+            )
+        ).scalars().all()
+        if not chunk_ids:
+            splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+            chunks = [
+                ChunkORM(doc_id=ctx.document_id, sequence_number=i, text=chunk_text)
+                for i, chunk_text in enumerate(splitter.split_text(ctx.text))
+            ]
+            db.add_all(chunks)
+            await db.commit()
+            chunk_ids = [chunk.id for chunk in chunks]
+    ctx.chunk_ids = list(chunk_ids)
+
+
+async def _require_llm_allowed(ctx: StudyPackContext) -> None:
+    if ctx.allow_llm is not None and not await ctx.allow_llm():
+        raise StageSkipped("LLM calls no longer allowed")
+
+
+async def _summarize(ctx: StudyPackContext) -> None:
+    await _require_llm_allowed(ctx)
+    ctx.summary_text = await asyncio.to_thread(summarize_text, ctx.text[:_LLM_INPUT_CHARS])
+
+
+async def _save_summary(ctx: StudyPackContext) -> None:
+    async with AsyncSessionLocal() as db:
+        if await _has_summary(db, ctx.document_id):
+            raise StageSkipped("summary already exists")
+        db_summary = SummaryORM(text=ctx.summary_text, method="llm")
+        db.add(db_summary)
+        await db.flush()
+        db.add_all(SummaryChunkORM(summary_id=db_summary.id, chunk_id=chunk_id) for chunk_id in ctx.chunk_ids)
+        await db.commit()
+
+
+async def _quiz(ctx: StudyPackContext) -> None:
+    await _require_llm_allowed(ctx)
+    raw_items = await asyncio.to_thread(
+        generate_quiz,
+        passage=ctx.text[:_LLM_INPUT_CHARS],
+        n_items=AUTO_QUIZ_N_ITEMS,
+        n_options=AUTO_QUIZ_N_OPTIONS,
+    )
+    questions = []
+    for item in raw_items or []:
+        options = item.get("options") or []
+        answer_index = item.get("answer_index")
+        if answer_index is None or answer_index < 0 or answer_index >= len(options):
+            continue
+        questions.append((item.get("stem", ""), options, options[answer_index]))
+    if not questions:
+        raise StageSkipped("no valid questions")
+
+    async with AsyncSessionLocal() as db:
+        if await _has_quiz(db, ctx.document_id):
+            raise StageSkipped("quiz already exists")
+        db_quiz = QuizORM(course_id=ctx.course_id, created_by=None)
+        db.add(db_quiz)
+        await db.flush()
+        for stem, options, correct_answer in questions:
+            db.add(
+                QuizQuestionORM(
+                    quiz_id=db_quiz.id,
+                    question=stem,
+                    type="mcq",
+                    options=options,
+                    correct_answer=correct_answer,
+                )
+            )
+        db.add(QuizDocumentORM(quiz_id=db_quiz.id, doc_id=ctx.document_id))
+        await db.commit()
+
+
+# ---------------------------------------------------------------------------
+# Planning and DAG execution
+# ---------------------------------------------------------------------------
+
+async def _has_summary(db: AsyncSession, doc_id: int) -> bool:
+    existing = (
+        await db.execute(
+            select(SummaryORM.id)
+            .join(SummaryChunkORM, SummaryORM.id == SummaryChunkORM.summary_id)
+            .join(ChunkORM, SummaryChunkORM.chunk_id == ChunkORM.id)
+            .where(ChunkORM.doc_id == doc_id)
+            .limit(1)
+        )
+    ).scalars().first()
+    return existing is not None
+
+
+async def _has_quiz(db: AsyncSession, doc_id: int) -> bool:
+    existing = await find_quiz_by_doc_and_criteria(
+        db,
+        doc_id=doc_id,
+        n_items=AUTO_QUIZ_N_ITEMS,
+        n_options=AUTO_QUIZ_N_OPTIONS,
+    )
+    return existing is not None
+
+
+async def plan_study_pack(db: AsyncSession, doc: DocumentORM, outputs: Set[str]) -> List[str]:
+    """The subset of *outputs* this document still needs."""
+    planned = []
+    if "index" in outputs and doc.google_drive_url:
+        # Extraction stores raw_text, and sync clears it when the Drive file is
+        # replaced: vectors without it were built from the old file.
+        if not doc.raw_text or not await asyncio.to_thread(is_document_indexed, doc.course_id, doc.id):
+            planned.append("index")
+    if doc.doc_type == "material":
+        if "summary" in outputs and settings.AUTO_SUMMARIZE_MATERIALS and not await _has_summary(db, doc.id):
+            planned.append("summary")
+        if "quiz" in outputs and settings.AUTO_GENERATE_QUIZZES and not await _has_quiz(db, doc.id):
+            planned.append("quiz")
+    return planned
+
+
+def build_stages(planned: List[str]) -> Dict[str, Stage]:
+    """Stage name -> (coroutine, names of the stages it waits for)."""
+    stages: Dict[str, Stage] = {"extract": (_extract, ())}
+    if "index" in planned:
+        stages["index"] = (_index, ("extract",))
+    if "summary" in planned:
+        stages["chunks"] = (_chunks, ("extract",))
+        stages["summarize"] = (_summarize, ("extract",))
+        stages["save_summary"] = (_save_summary, ("chunks", "summarize"))
+    if "quiz" in planned:
+        stages["quiz"] = (_quiz, ("extract",))
+    return stages
+
+
+async def run_stages(stages: Dict[str, Stage], ctx: StudyPackContext) -> Dict[str, StageTiming]:
+    """Run every stage as soon as its dependencies are done."""
+    timings: Dict[str, StageTiming] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(name: str) -> None:
+        fn, after = stages[name]
+        if after:
+            await asyncio.gather(*(tasks[dep] for dep in after))
+        blocked = [dep for dep in after if timings[dep].status != "done"]
+        if blocked:
+            timings[name] = StageTiming("skipped", detail=f"{', '.join(blocked)} did not finish")
+            return
+        async with _stage_slots():
+            started = time.perf_counter()
+            try:
+                await fn(ctx)
+            except StageSkipped as e:
+                timings[name] = StageTiming("skipped", time.perf_counter() - started, str(e))
+                return
+            except Exception as e:
+                timings[name] = StageTiming("failed", time.perf_counter() - started, f"{type(e).__name__}: {e}")
+                print(f"⚠️  Study pack doc {ctx.document_id} stage {name} failed: {e}")
+                return
+            timings[name] = StageTiming("done", time.perf_counter() - started)
+
+    for name in stages:
+        tasks[name] = asyncio.create_task(run(name))
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    return {name: timings[name] for name in stages}
+
+
+async def build_study_pack(
+    document_id: int,
+    outputs: Set[str] = frozenset(OUTPUTS),
+    allow_llm: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> StudyPackResult:
+    """Build the missing parts of a document's study pack (index, summary, quiz).
+
+    *allow_llm*, when given, is awaited before the summarize and quiz stages;
+    if it returns False they are skipped (extraction and indexing still run).
+    """
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        doc = await db.get(DocumentORM, document_id)
+        if doc is None:
+            return StudyPackResult(document_id, [], {}, 0.0)
+        planned = await plan_study_pack(db, doc, set(outputs))
+        ctx = StudyPackContext(
+            document_id=doc.id, course_id=doc.course_id, title=doc.title, pdf_path=doc.s3_path, allow_llm=allow_llm
+        )
+    if not planned:
+        return StudyPackResult(document_id, [], {}, time.perf_counter() - started)
+
+    print(f"🧠 Study pack started doc {document_id} ({', '.join(planned)}): {ctx.title}")
+    timings = await run_stages(build_stages(planned), ctx)
+    result = StudyPackResult(document_id, planned, timings, time.perf_counter() - started)
+    stage_report = ", ".join(f"{name}={t.status}:{t.seconds:.2f}s" for name, t in timings.items())
+    print(f"{'⚠️ ' if result.failed else '✅'} Study pack doc {document_id} in {result.seconds:.2f}s — {stage_report}")
+    return result
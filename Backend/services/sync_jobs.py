@@ -0,0 +1,56 @@
+"""
+Post-sync document jobs run by the durable job queue (services/job_queue.py).
+
+``full_sync`` enqueues one ``study_pack`` job per document that needs
+indexing, an auto-summary or an auto-quiz; the job builds whatever is still
+missing through the study-pack DAG (services/study_pack_orchestrator.py).
+Documents with no extractable text finish without retrying; if any stage
+fails the job is retried with backoff, and the retry only redoes the parts
+that are still missing.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from DB import crud
+from DB.session import AsyncSessionLocal
+from services.job_queue import register_handler
+from services.study_pack_orchestrator import build_study_pack
+
+STUDY_PACK = "study_pack"
+
+
+async def auto_jobs_enabled(db: AsyncSession, user_id: int | None) -> bool:
+    if not user_id:
+        return True
+    user = await crud.get_user_by_id(db, user_id)
+    if not user:
+        return False
+    flag = getattr(user, "auto_jobs_enabled", True)
+    return True if flag is None else bool(flag)
+
+
+async def study_pack_job(doc_id: int, user_id: Optional[int]) -> None:
+    """Index, summarize and quiz one synced document (only the missing parts).
+
+    The user's auto_jobs_enabled flag is checked again before each LLM stage,
+    so logging out during extraction stops the summary and quiz calls.
+    """
+
+    async def still_enabled() -> bool:
+        async with AsyncSessionLocal() as db:
+            return await auto_jobs_enabled(db, user_id)
+
+    if not await still_enabled():
+        print(f"ℹ️  Study pack skipped doc {doc_id}: user logged out")
+        return
+    result = await build_study_pack(doc_id, allow_llm=still_enabled)
+    if result.failed:
+        details = "; ".join(f"{name}: {result.stages[name].detail}" for name in result.failed)
+        raise RuntimeError(f"study pack stage(s) failed — {details}")
+
+
+register_handler(STUDY_PACK, study_pack_job)
@@ -0,0 +1,88 @@
+"""
+Offline text analysis helpers (tokenisation, stopwords, terminology).
+
+The evaluator used to call ``nltk.download`` for punkt / punkt_tab /
+stopwords on the first evaluation in every process — a network round-trip
+that stalled the first request and failed offline — and rebuilt the
+stopword set on every call.
+
+Resources are now resolved once at import time and never downloaded:
+  - The Docker image bundles punkt, punkt_tab and stopwords under
+    ``NLTK_DATA`` (see Dockerfile); they are used when present.
+  - Otherwise sentences are split with a regex and the built-in copy of
+    NLTK's English stopword list is used.
+  - Words are always split with a single regex pass — the metrics only look
+    at alphabetic tokens, which does not need punkt.
+All module-level resources are immutable (frozensets).
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import FrozenSet, List
+
+# NLTK's English stopword list, kept in-tree so the evaluator never needs the
+# stopwords corpus at runtime.
+_BUILTIN_STOPWORDS: FrozenSet[str] = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your
+yours yourself yourselves he him his himself she she's her hers herself it
+it's its itself they them their theirs themselves what which who whom this
+that that'll these those am is are was were be been being have has had
+having do does did doing a an the and but if or because as until while of
+at by for with about against between into through during before after above
+below to from up down in out on off over under again further then once here
+there when where why how all any both each few more most other some such no
+nor not only own same so than too very s t can will just don don't should
+should've now d ll m o re ve y ain aren aren't couldn couldn't didn didn't
+doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't ma mightn
+mightn't mustn mustn't needn needn't shan shan't shouldn shouldn't wasn
+wasn't weren weren't won won't wouldn wouldn't
+""".split())
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _load_stopwords() -> FrozenSet[str]:
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words("english")) | _BUILTIN_STOPWORDS
+    except Exception:  # corpus not bundled (LookupError) or nltk missing
+        return _BUILTIN_STOPWORDS
+
+
+def _punkt_available() -> bool:
+    try:
+        import nltk
+        nltk.data.find("tokenizers/punkt_tab/english/")
+        return True
+    except Exception:
+        return False
+
+
+STOPWORDS: FrozenSet[str] = _load_stopwords()
+HAS_PUNKT: bool = _punkt_available()
+
+
+def sentences(text: str) -> List[str]:
+    """Split *text* into sentences (punkt when bundled, regex otherwise)."""
+    if HAS_PUNKT:
+        from nltk.tokenize import sent_tokenize
+        return sent_tokenize(text)
+    return [s for s in _SENTENCE_RE.split(text) if s.strip()]
+
+
+def word_tokens(text: str) -> List[str]:
+    """Alphabetic word tokens of *text*, lower-cased.
+
+    Punctuation, numbers and mixed tokens are dropped, which is all the
+    terminology metrics look at, so a single regex pass is enough.
+    """
+    return [w.lower() for w in _WORD_RE.findall(text)]
+
+
+def top_terms(text: str, n: int = 40, min_len: int = 4) -> List[str]:
+    """The *n* most frequent non-stopword terms of at least *min_len* letters."""
+    counts = Counter(w for w in word_tokens(text) if len(w) >= min_len and w not in STOPWORDS)
+    return [w for w, _ in counts.most_common(n)]
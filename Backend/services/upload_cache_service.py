@@ -0,0 +1,100 @@
+"""
+Content-addressed cache for one-time PDF uploads.
+
+The handout upload endpoints (summarize, quiz and chat) used to re-run PDF
+parsing / OCR and the LLM for every request, even when a whole class uploads
+the same handout.  Uploads are now keyed by the SHA-256 of their bytes; the
+extracted text, page-aware chunks and derived artifacts (summary, quizzes)
+are remembered so repeats are served instantly.  Student submissions (essay
+and summary uploads) are not cached: their text is extracted and discarded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from DB import crud
+from DB.schemas import UploadArtifact
+from services.extraction_worker import run_in_extraction_pool
+from services.pdf_processor import chunk_blocks, load_pdf_blocks
+
+
+def hash_upload(payload: bytes) -> str:
+    """Return the hex SHA-256 digest used as the upload's cache key."""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def quiz_cache_key(n_items: int, n_options: int, objectives: Optional[str]) -> str:
+    """Stable key for a quiz variant generated from the same upload."""
+    normalized = " ".join((objectives or "").lower().split())
+    return f"{int(n_items)}:{int(n_options)}:{normalized}"
+
+
+def extract_upload_content(payload: bytes) -> Tuple[str, List[Dict]]:
+    """Parse the PDF once and return (full_text, chunks).
+
+    Chunks follow the PDF layout and keep their page / section so chat
+    answers can cite them.
+    """
+    blocks = load_pdf_blocks(payload)
+    pages: Dict[int, List[str]] = {}
+    for block in blocks:
+        pages.setdefault(block["page"], []).append(block["text"])
+    text = "\n\n".join("\n".join(parts) for _, parts in sorted(pages.items()))
+    chunks = [
+        {
+            "page": chunk.metadata.get("page"),
+            "section": chunk.metadata.get("section"),
+            "text": chunk.page_content,
+        }
+        for chunk in chunk_blocks(blocks)
+    ]
+    return text, chunks
+
+
+async def get_or_create_upload_artifact(db: AsyncSession, payload: bytes) -> UploadArtifact:
+    """Return the cached artifact for *payload*, extracting it on first sight."""
+    digest = hash_upload(payload)
+    artifact = await crud.get_upload_artifact(db, digest)
+    if artifact:
+        print(f"⚡ UPLOAD CACHE HIT: {digest[:12]}")
+        return await crud.touch_upload_artifact(db, artifact)
+
+    print(f"🔍 UPLOAD CACHE MISS: {digest[:12]} — extracting text")
+    text, chunks = await run_in_extraction_pool(extract_upload_content, payload)
+    try:
+        return await crud.create_upload_artifact(
+            db,
+            sha256=digest,
+            size_bytes=len(payload),
+            raw_text=text,
+            chunks=chunks,
+        )
+    except IntegrityError:
+        # Another request stored the same upload while we were extracting.
+        await db.rollback()
+        artifact = await crud.get_upload_artifact(db, digest)
+        if artifact is None:
+            raise
+        return artifact
+
+
+async def store_upload_summary(db: AsyncSession, artifact: UploadArtifact, summary: str) -> None:
+    artifact.summary = summary
+    await db.commit()
+
+
+def get_cached_quiz(artifact: UploadArtifact, key: str) -> Optional[List[Dict]]:
+    return (artifact.quizzes or {}).get(key)
+
+
+async def store_upload_quiz(db: AsyncSession, artifact: UploadArtifact, key: str, items: List[Dict]) -> None:
+    # Reassign instead of mutating so SQLAlchemy detects the JSON change.
+    quizzes = dict(artifact.quizzes or {})
+    quizzes[key] = items
+    artifact.quizzes = quizzes
+    await db.commit()
@@ -0,0 +1,145 @@
+"""
+Startup warmup for the heavy ML components.
+
+Without it the essay grader, the shared MiniLM embedder (evaluator + Chroma)
+and the NLTK-backed text analysis all load on the first request that needs
+them, so the first user after every deploy waits several seconds.
+
+``startup_event`` calls ``start_warmup``: each component named in
+WARMUP_MODELS is loaded and run once on a dummy input in a worker thread.
+With WARMUP_BLOCKING the app only starts serving afterwards; otherwise the
+warmup runs in the background and ``GET /health/ready`` answers 503 until
+every component has finished, so a load balancer can hold traffic back.
+A component that fails to load is reported but does not keep the instance
+unready (the feature stays unavailable, the rest of the app is fine).
+
+Under gunicorn (gunicorn.conf.py) ``preload_shared_models`` additionally
+loads PRELOAD_MODELS in the master before the workers fork, so N workers
+share one copy of those weights; each worker's warmup then finds them
+already loaded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Callable, Dict, List
+
+from Core.config import settings
+
+_DUMMY_ESSAY = (
+    "Many people believe that technology has improved education. In my opinion, "
+    "online resources help students learn at their own pace, but teachers are still "
+    "needed to guide them and keep them motivated throughout the course."
+)
+
+
+def _warm_embedder() -> None:
+    from services.embedding_service import embed_texts
+
+    embed_texts(["warmup sentence for the embedding model"])
+
+
+def _warm_essay_grader() -> None:
+    from services.essay_grader_service import get_essay_grader
+
+    get_essay_grader().predict_batch([_DUMMY_ESSAY])
+
+
+def _warm_text_analysis() -> None:
+    from services.rouge_metrics import ReferenceProfile
+    from services.text_analysis import sentences, top_terms
+
+    sentences(_DUMMY_ESSAY)
+    top_terms(_DUMMY_ESSAY)
+    ReferenceProfile.from_text(_DUMMY_ESSAY).score_batch([_DUMMY_ESSAY])
+
+
+WARMUPS: Dict[str, Callable[[], None]] = {
+    "embedder": _warm_embedder,
+    "essay_grader": _warm_essay_grader,
+    "text_analysis": _warm_text_analysis,
+}
+
+
+def _load_essay_grader() -> None:
+    if settings.ESSAY_GRADER_BACKEND.startswith("onnx"):
+        print("⚠️ Not preloading the ONNX essay grader: ONNX Runtime sessions do not survive fork")
+        return
+    from services.essay_grader_service import get_essay_grader
+
+    get_essay_grader()
+
+
+# Components that can be loaded once in the gunicorn master and shared with
+# the forked workers copy-on-write (see gunicorn.conf.py).  Only plain torch
+# weights qualify; ONNX Runtime sessions (the MiniLM embedder, the ONNX
+# grader backends) own thread pools that break across fork, so each worker
+# still loads those in its own warmup.
+PRELOADS: Dict[str, Callable[[], None]] = {
+    "essay_grader": _load_essay_grader,
+}
+
+# component -> {"status": pending | loading | ready | failed, "seconds", "error"}
+_status: Dict[str, dict] = {}
+
+
+def selected_components() -> List[str]:
+    names = [n.strip() for n in settings.WARMUP_MODELS.split(",") if n.strip()]
+    unknown = [n for n in names if n not in WARMUPS]
+    if unknown:
+        print(f"⚠️ Unknown WARMUP_MODELS entries ignored: {', '.join(unknown)}")
+    return [n for n in names if n in WARMUPS]
+
+
+async def _warm(name: str) -> None:
+    _status[name] = {"status": "loading"}
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(WARMUPS[name])
+    except Exception as e:
+        _status[name] = {"status": "failed", "seconds": round(time.perf_counter() - started, 2), "error": str(e)}
+        print(f"❌ Warmup failed for {name}: {e}")
+        return
+    _status[name] = {"status": "ready", "seconds": round(time.perf_counter() - started, 2)}
+    print(f"🔥 Warmed up {name} in {_status[name]['seconds']}s")
+
+
+async def run_warmup() -> None:
+    """Warm every selected component, one at a time to keep startup memory flat."""
+    for name in selected_components():
+        await _warm(name)
+
+
+async def start_warmup() -> asyncio.Task | None:
+    """Run the warmup (blocking or in the background, per WARMUP_BLOCKING)."""
+    components = selected_components()
+    for name in components:
+        _status[name] = {"status": "pending"}
+    if not components:
+        return None
+    if settings.WARMUP_BLOCKING:
+        await run_warmup()
+        return None
+    return asyncio.create_task(run_warmup())
+
+
+def readiness() -> dict:
+    ready = all(s["status"] in ("ready", "failed") for s in _status.values())
+    return {"ready": ready, "components": dict(_status)}
+
+
+def preload_shared_models() -> None:
+    """Load PRELOAD_MODELS in the current (pre-fork) process; no inference is run."""
+    for name in [n.strip() for n in settings.PRELOAD_MODELS.split(",") if n.strip()]:
+        loader = PRELOADS.get(name)
+        if loader is None:
+            print(f"⚠️ {name} cannot be preloaded before fork; it is loaded per worker")
+            continue
+        started = time.perf_counter()
+        try:
+            loader()
+        except Exception as e:
+            print(f"❌ Preload failed for {name}: {e}")
+            continue
+        print(f"📦 Preloaded {name} in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,36 @@
+"""Shared fixture for tests that need a real (SQLite) database.
+
+Each test gets a fresh database file with every table from DB/schemas.py.
+Modules listed in ``session_modules`` have their ``AsyncSessionLocal``
+pointed at it for the duration of the test.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from DB.schemas import Base
+
+
+class SQLiteTestCase(unittest.IsolatedAsyncioTestCase):
+    session_modules = ()
+
+    async def asyncSetUp(self):
+        self._tmpdir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self._tmpdir, 'test.db')}")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.Session = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+        for module in self.session_modules:
+            patcher = mock.patch.object(module, "AsyncSessionLocal", self.Session)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
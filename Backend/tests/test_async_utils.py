@@ -0,0 +1,77 @@
+import asyncio
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services.async_utils import iterate_in_thread, merge_async_iterators
+
+
+def _collect(make_iterator, limit=None):
+    async def _run():
+        items = []
+        async for item in iterate_in_thread(make_iterator):
+            items.append(item)
+            if limit is not None and len(items) >= limit:
+                break
+        return items
+    return asyncio.run(_run())
+
+
+class IterateInThreadTests(unittest.TestCase):
+    def test_items_arrive_in_order(self):
+        self.assertEqual(_collect(lambda: iter(range(5))), [0, 1, 2, 3, 4])
+
+    def test_errors_surface_after_yielded_items(self):
+        def _gen():
+            yield "first"
+            raise RuntimeError("boom")
+
+        seen = []
+
+        async def _run():
+            async for item in iterate_in_thread(_gen):
+                seen.append(item)
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(_run())
+        self.assertEqual(seen, ["first"])
+
+    def test_consumer_can_stop_early(self):
+        self.assertEqual(_collect(lambda: iter(range(1000)), limit=2), [0, 1])
+
+
+async def _agen(items, delay=0.0):
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+
+
+class MergeAsyncIteratorsTests(unittest.TestCase):
+    def test_all_items_arrive_tagged_with_their_stream(self):
+        async def _run():
+            merged = merge_async_iterators({"a": _agen([1, 2, 3], 0.001), "b": _agen(["x", "y"])})
+            return [pair async for pair in merged]
+
+        pairs = asyncio.run(_run())
+        self.assertEqual([item for name, item in pairs if name == "a"], [1, 2, 3])
+        self.assertEqual([item for name, item in pairs if name == "b"], ["x", "y"])
+
+    def test_stream_errors_are_reraised(self):
+        async def _failing():
+            yield 1
+            raise ValueError("page failed")
+
+        async def _run():
+            async for _ in merge_async_iterators({"ok": _agen(range(100), 0.001), "bad": _failing()}):
+                pass
+
+        with self.assertRaises(ValueError):
+            asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services.google_classroom_service import ClassroomFetchError, GoogleClassroomService
+
+_PAGES = {
+    None: {"courseWork": [{"id": "1", "materials": [{"driveFile": {}}]}, {"id": "2"}], "nextPageToken": "p2"},
+    "p2": {"courseWork": [{"id": "3", "materials": [{"driveFile": {}}]}], "nextPageToken": "p3"},
+    "p3": {"courseWork": [{"id": "4", "materials": [{"link": {}}]}]},
+}
+
+
+class ClassroomPaginationTests(unittest.TestCase):
+    def setUp(self):
+        self.service = GoogleClassroomService()
+        self.requests = []
+
+        async def fake_get(url, access_token, params=None):
+            self.requests.append(dict(params or {}))
+            return _PAGES[(params or {}).get("pageToken")]
+
+        self.patcher = mock.patch.object(self.service, "_get", side_effect=fake_get)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_fetch_follows_next_page_token(self):
+        items = asyncio.run(self.service.fetch_coursework("course", "token"))
+        self.assertEqual([item["id"] for item in items], ["1", "3"])
+        self.assertEqual([r.get("pageToken") for r in self.requests], [None, "p2", "p3"])
+        self.assertTrue(all(r["pageSize"] > 0 for r in self.requests))
+
+    def test_iter_streams_filtered_pages(self):
+        async def _run():
+            return [[item["id"] for item in page] async for page in self.service.iter_coursework("course", "token")]
+
+        self.assertEqual(asyncio.run(_run()), [["1"], ["3"], []])
+
+    def test_failed_page_raises_instead_of_truncating(self):
+        async def flaky_get(url, access_token, params=None):
+            token = (params or {}).get("pageToken")
+            return None if token == "p2" else _PAGES[token]
+
+        with mock.patch.object(self.service, "_get", side_effect=flaky_get):
+            with self.assertRaises(ClassroomFetchError):
+                asyncio.run(self.service.fetch_coursework("course", "token"))
+            with self.assertRaises(ClassroomFetchError):
+                asyncio.run(self.service.fetch_courses("token"))
+
+    def test_non_strict_iteration_keeps_pages_before_the_failure(self):
+        async def flaky_get(url, access_token, params=None):
+            token = (params or {}).get("pageToken")
+            return None if token == "p2" else _PAGES[token]
+
+        async def _run():
+            pages = self.service.iter_pages("url", "token", "courseWork", strict=False)
+            return [[item["id"] for item in page] async for page in pages]
+
+        with mock.patch.object(self.service, "_get", side_effect=flaky_get):
+            self.assertEqual(asyncio.run(_run()), [["1", "2"]])
+
+    def test_watermark_stop_cancels_the_next_page_prefetch(self):
+        since = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        pages = {
+            None: {
+                "announcements": [
+                    {"id": "new", "updateTime": "2024-01-03T00:00:00Z"},
+                    {"id": "old", "updateTime": "2024-01-01T00:00:00Z"},
+                ],
+                "nextPageToken": "p2",
+            },
+        }
+        prefetches = []
+
+        async def slow_get(url, access_token, params=None):
+            if (params or {}).get("pageToken") is None:
+                return pages[None]
+            prefetches.append(asyncio.current_task())
+            await asyncio.sleep(10)
+
+        async def _run():
+            collected = []
+            async for page in self.service.iter_announcements("course", "token", since=since):
+                collected.append([item["id"] for item in page])
+                await asyncio.sleep(0)  # let the next-page prefetch start
+            # Cancelled as soon as the loop ends, not at garbage collection.
+            self.assertEqual(len(prefetches), 1)
+            self.assertTrue(prefetches[0].cancelling())
+            return collected
+
+        with mock.patch.object(self.service, "_get", side_effect=slow_get):
+            self.assertEqual(asyncio.run(_run()), [["new"]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,275 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from datetime import datetime, timezone
+
+from sqlalchemy.future import select
+
+from DB import crud
+from DB.schemas import (
+    Chunk, Course, CourseSyncWatermark, Document, Quiz, QuizAttempt, QuizDocument, QuizQuestion, Summary,
+    SummaryChunk, User, UserCourse,
+)
+from Routers import google_classroom
+from sqlite_helpers import SQLiteTestCase
+
+
+def _drive(file_id: str) -> list:
+    return [{"driveFile": {"driveFile": {"alternateLink": f"https://drive.google.com/file/d/{file_id}/view"}}}]
+
+
+def _pages(*pages):
+    """A fake ``iter_*`` method yielding *pages* and recording the ``since`` it was called with."""
+    calls = []
+
+    async def iterate(classroom_id, access_token, since=None):
+        calls.append(since)
+        for page in pages:
+            yield list(page)
+
+    iterate.calls = calls
+    return iterate
+
+
+class ClassroomSyncTests(SQLiteTestCase):
+    session_modules = (google_classroom,)
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        async with self.Session() as db:
+            db.add_all([User(email="teacher@example.com", name="Teacher"), User(email="other@example.com", name="Other")])
+            await db.commit()
+
+    def use_items(self, materials=(), announcements=(), coursework=()):
+        fakes = {
+            "iter_course_materials": _pages(*materials),
+            "iter_announcements": _pages(*announcements),
+            "iter_coursework": _pages(*coursework),
+        }
+        for name, fake in fakes.items():
+            patcher = mock.patch.object(google_classroom.google_service, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return fakes
+
+    async def sync(self, course_id=1, full_refresh=False):
+        course_sync = {"course_id": course_id, "classroom_id": "c1", "course_title": "Course"}
+        return await google_classroom._sync_course_documents(course_sync, "token", asyncio.Semaphore(1), full_refresh)
+
+    async def test_upsert_renames_existing_courses_and_links_each_once(self):
+        async with self.Session() as db:
+            db.add_all([Course(classroom_id="c1", title="Old name"), Course(classroom_id="c2", title="Two")])
+            await db.flush()
+            db.add(UserCourse(user_id=1, course_id=1))
+            db.add(UserCourse(user_id=2, course_id=2))
+            await db.commit()
+
+        async with self.Session() as db:
+            upserted = await crud.upsert_courses_for_user(db, 1, [("c1", "New name"), ("c2", "Two"), ("c3", "Three")])
+            self.assertEqual([(course.classroom_id, is_new) for course, is_new in upserted],
+                             [("c1", False), ("c2", False), ("c3", True)])
+
+        async with self.Session() as db:
+            titles = dict((await db.execute(select(Course.classroom_id, Course.title))).all())
+            links = (await db.execute(select(UserCourse.user_id, UserCourse.course_id))).all()
+        self.assertEqual(titles, {"c1": "New name", "c2": "Two", "c3": "Three"})
+        self.assertEqual(sorted(links), [(1, 1), (1, 2), (1, 3), (2, 2)])
+
+        # Upserting again changes nothing and adds no duplicate links.
+        async with self.Session() as db:
+            upserted = await crud.upsert_courses_for_user(db, 1, [("c1", "New name"), ("c3", "Three")])
+            self.assertEqual([is_new for _, is_new in upserted], [False, False])
+            self.assertEqual(len((await db.execute(select(UserCourse))).scalars().all()), 4)
+
+    async def test_sync_inserts_each_page_in_bulk_and_records_watermarks(self):
+        async with self.Session() as db:
+            db.add(Course(classroom_id="c1", title="Course"))
+            await db.commit()
+        self.use_items(
+            materials=[
+                [
+                    {"id": "m1", "title": "Slides", "materials": _drive("f1"), "updateTime": "2026-03-02T10:00:00Z"},
+                    {"id": "m2", "title": "Notes", "updateTime": "2026-03-01T10:00:00Z"},
+                ],
+                [{"id": "m3", "title": "Reading", "materials": _drive("f3"), "updateTime": "2026-02-01T10:00:00Z"}],
+            ],
+            announcements=[[{"id": "a1", "text": "Welcome", "materials": _drive("fa"), "updateTime": "2026-03-03T10:00:00Z"}]],
+            coursework=[[{"id": "w1", "title": "Essay", "materials": _drive("fw"), "updateTime": "2026-03-04T10:00:00Z"}]],
+        )
+
+        with mock.patch.object(google_classroom.crud, "create_documents_bulk", wraps=crud.create_documents_bulk) as bulk:
+            result = await self.sync()
+
+        self.assertEqual(sorted(len(call.args[1]) for call in bulk.call_args_list), [1, 1, 1, 2])
+        self.assertEqual((result["materials"], result["announcements"], result["coursework"]), (3, 1, 1))
+        self.assertFalse(result["failed"])
+        async with self.Session() as db:
+            docs = {doc.classroom_material_id: doc for doc in (await db.execute(select(Document))).scalars().all()}
+            watermarks = dict((await db.execute(select(CourseSyncWatermark.item_type, CourseSyncWatermark.last_update_time))).all())
+        self.assertEqual(set(docs), {"m1", "m2", "m3", "a1", "w1"})
+        # Announcements are not indexed; only Drive-backed materials and coursework are queued.
+        self.assertEqual(sorted(result["drive_doc_ids"]), sorted([docs["m1"].id, docs["m3"].id, docs["w1"].id]))
+        self.assertEqual([doc["title"] for doc in result["material_docs"]], ["Slides", "Notes", "Reading"])
+        self.assertEqual(
+            {kind: value.strftime("%Y-%m-%d") for kind, value in watermarks.items()},
+            {"material": "2026-03-02", "announcement": "2026-03-03", "coursework": "2026-03-04"},
+        )
+
+    async def test_items_seen_twice_are_stored_once(self):
+        async with self.Session() as db:
+            db.add(Course(classroom_id="c1", title="Course"))
+            await db.commit()
+        item = {"id": "m1", "title": "Slides", "materials": _drive("f1"), "updateTime": "2026-03-02T10:00:00Z"}
+        self.use_items(materials=[[item, dict(item)], [dict(item)]])
+
+        result = await self.sync()
+        self.assertEqual(result["materials"], 1)
+        async with self.Session() as db:
+            self.assertEqual(len((await db.execute(select(Document))).scalars().all()), 1)
+        # Stored again by the next sync: unchanged, not duplicated.
+        result = await self.sync()
+        self.assertEqual((result["materials"], result["skipped"]), (0, 1))
+
+    async def add_synced_doc(self, **fields) -> int:
+        values = dict(
+            course_id=1, classroom_material_id="m1", title="Slides", doc_type="material",
+            google_drive_url="https://drive.google.com/file/d/f1/view", raw_text="Extracted slide text",
+            s3_path="/uploads/f1.pdf", drive_file_id="f1", drive_md5_checksum="md5-f1",
+            source_updated_at=datetime(2026, 3, 1, 10, tzinfo=timezone.utc),
+        )
+        values.update(fields)
+        async with self.Session() as db:
+            db.add(Course(classroom_id="c1", title="Course"))
+            await db.flush()
+            doc = Document(**values)
+            db.add(doc)
+            await db.commit()
+            return doc.id
+
+    async def stored_doc(self, doc_id: int) -> Document:
+        async with self.Session() as db:
+            return await db.get(Document, doc_id)
+
+    async def test_title_edit_keeps_the_extracted_drive_text(self):
+        doc_id = await self.add_synced_doc()
+        self.use_items(materials=[[{"id": "m1", "title": "Slides v2", "materials": _drive("f1"),
+                                    "updateTime": "2026-03-05T10:00:00Z"}]])
+
+        result = await self.sync()
+        doc = await self.stored_doc(doc_id)
+        self.assertEqual((result["updated"], result["drive_doc_ids"]), (1, []))
+        self.assertEqual((doc.title, doc.raw_text, doc.s3_path, doc.drive_md5_checksum),
+                         ("Slides v2", "Extracted slide text", "/uploads/f1.pdf", "md5-f1"))
+
+    async def test_changed_drive_file_clears_cached_text_and_is_queued(self):
+        doc_id = await self.add_synced_doc()
+        self.use_items(materials=[[{"id": "m1", "title": "Slides", "materials": _drive("f2"),
+                                    "updateTime": "2026-03-05T10:00:00Z"}]])
+
+        result = await self.sync()
+        doc = await self.stored_doc(doc_id)
+        self.assertEqual(result["drive_doc_ids"], [doc_id])
+        self.assertEqual(doc.google_drive_url, "https://drive.google.com/file/d/f2/view")
+        self.assertEqual((doc.raw_text, doc.s3_path, doc.drive_file_id, doc.drive_md5_checksum), (None,) * 4)
+
+    async def test_changed_drive_file_drops_outputs_built_from_the_old_file(self):
+        doc_id = await self.add_synced_doc()
+        async with self.Session() as db:
+            chunk = Chunk(doc_id=doc_id, sequence_number=0, text="Old slide text")
+            summary = Summary(text="Old summary", method="llm")
+            fresh_quiz, taken_quiz, own_quiz = Quiz(course_id=1), Quiz(course_id=1), Quiz(course_id=1, created_by=1)
+            db.add_all([chunk, summary, fresh_quiz, taken_quiz, own_quiz])
+            await db.flush()
+            db.add(SummaryChunk(summary_id=summary.id, chunk_id=chunk.id))
+            for quiz in (fresh_quiz, taken_quiz, own_quiz):
+                db.add(QuizQuestion(quiz_id=quiz.id, question="Q?", type="mcq", options=["a", "b"], correct_answer="a"))
+                db.add(QuizDocument(quiz_id=quiz.id, doc_id=doc_id))
+            db.add(QuizAttempt(quiz_id=taken_quiz.id, user_id=2, score=3))
+            await db.commit()
+            quiz_ids = fresh_quiz.id, taken_quiz.id, own_quiz.id
+        self.use_items(materials=[[{"id": "m1", "title": "Slides", "materials": _drive("f2"),
+                                    "updateTime": "2026-03-05T10:00:00Z"}]])
+
+        await self.sync()
+        async with self.Session() as db:
+            self.assertEqual((await db.execute(select(Chunk))).scalars().all(), [])
+            self.assertEqual((await db.execute(select(Summary))).scalars().all(), [])
+            quizzes = set((await db.execute(select(Quiz.id))).scalars().all())
+            links = (await db.execute(select(QuizDocument.quiz_id))).scalars().all()
+            attempts = (await db.execute(select(QuizAttempt.quiz_id))).scalars().all()
+        fresh_id, taken_id, own_id = quiz_ids
+        # The untaken auto quiz is gone; the taken one keeps its attempts but no
+        # longer stands for this document; quizzes users made are left alone.
+        self.assertEqual(quizzes, {taken_id, own_id})
+        self.assertEqual(links, [own_id])
+        self.assertEqual(attempts, [taken_id])
+
+    async def test_title_edit_keeps_outputs(self):
+        doc_id = await self.add_synced_doc()
+        async with self.Session() as db:
+            db.add(Chunk(doc_id=doc_id, sequence_number=0, text="Slide text"))
+            await db.commit()
+        self.use_items(materials=[[{"id": "m1", "title": "Slides v2", "materials": _drive("f1"),
+                                    "updateTime": "2026-03-05T10:00:00Z"}]])
+
+        await self.sync()
+        async with self.Session() as db:
+            self.assertEqual(len((await db.execute(select(Chunk))).scalars().all()), 1)
+
+    async def test_description_edit_replaces_text_without_a_drive_file(self):
+        doc_id = await self.add_synced_doc(google_drive_url=None, raw_text="Old notes", s3_path=None,
+                                           drive_file_id=None, drive_md5_checksum=None)
+        self.use_items(materials=[[{"id": "m1", "title": "Notes", "description": "New notes",
+                                    "updateTime": "2026-03-05T10:00:00Z"}]])
+
+        result = await self.sync()
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual((await self.stored_doc(doc_id)).raw_text, "New notes")
+
+    async def test_missing_stored_update_time_is_only_backfilled(self):
+        doc_id = await self.add_synced_doc(source_updated_at=None)
+        self.use_items(materials=[[{"id": "m1", "title": "Slides v2", "materials": _drive("f2"),
+                                    "updateTime": "2026-03-05T10:00:00Z"}]])
+
+        result = await self.sync()
+        doc = await self.stored_doc(doc_id)
+        self.assertEqual((result["updated"], result["skipped"], result["drive_doc_ids"]), (0, 1, []))
+        self.assertEqual((doc.title, doc.raw_text, doc.s3_path), ("Slides", "Extracted slide text", "/uploads/f1.pdf"))
+        self.assertEqual(google_classroom._as_utc(doc.source_updated_at), datetime(2026, 3, 5, 10, tzinfo=timezone.utc))
+
+    async def test_next_sync_only_asks_for_items_newer_than_the_watermark(self):
+        async with self.Session() as db:
+            db.add(Course(classroom_id="c1", title="Course"))
+            await db.commit()
+        self.use_items(materials=[[{"id": "m1", "title": "Slides", "updateTime": "2026-03-02T10:00:00Z"}]])
+        await self.sync()
+
+        fakes = self.use_items(materials=[[{"id": "m2", "title": "Notes", "updateTime": "2026-03-06T10:00:00Z"}]])
+        await self.sync()
+        self.assertEqual(fakes["iter_course_materials"].calls, [datetime(2026, 3, 2, 10, tzinfo=timezone.utc)])
+        # Nothing was fetched for the other types yet, so they still start from scratch.
+        self.assertEqual(fakes["iter_announcements"].calls, [None])
+
+        fakes = self.use_items()
+        await self.sync()
+        self.assertEqual(fakes["iter_course_materials"].calls, [datetime(2026, 3, 6, 10, tzinfo=timezone.utc)])
+        fakes = self.use_items()
+        await self.sync(full_refresh=True)
+        self.assertEqual(fakes["iter_course_materials"].calls, [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
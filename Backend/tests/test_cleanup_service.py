@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy.future import select
+
+from DB.schemas import DriveFileText, EssayGradeCache, ExtractionJob, LectureEvalArtifact, UploadArtifact
+from services import cleanup_service
+from sqlite_helpers import SQLiteTestCase
+
+
+def _days_ago(days: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+class CacheRetentionTests(SQLiteTestCase):
+    session_modules = (cleanup_service,)
+
+    async def add_rows(self):
+        async with self.Session() as db:
+            for key, last_used in (("old", _days_ago(60)), ("recent", _days_ago(1))):
+                db.add(UploadArtifact(sha256=key, size_bytes=1, raw_text="t", last_used_at=last_used))
+                db.add(LectureEvalArtifact(
+                    lecture_hash=key, embedder="e", reference_summary="", key_points=[], terms=[],
+                    embedding_dim=1, lecture_embedding=b"", reference_embedding=b"",
+                    chunk_embeddings=b"", key_point_embeddings=b"", last_used_at=last_used,
+                ))
+                db.add(EssayGradeCache(cache_key=key, model_path="m", result={}, last_used_at=last_used))
+                db.add(DriveFileText(content_key=key, drive_file_id="f", raw_text="text", last_used_at=last_used))
+                db.add(ExtractionJob(source=key, status="done", started_at=last_used))
+            await db.commit()
+
+    async def remaining(self, column) -> list:
+        async with self.Session() as db:
+            return (await db.execute(select(column))).scalars().all()
+
+    async def test_cache_tables_purged_by_last_use(self):
+        await self.add_rows()
+
+        removed = await cleanup_service.purge_expired_rows_once()
+        self.assertEqual(removed, {label: 1 for label, _, _ in cleanup_service.RETENTION_PURGES})
+        for column in (UploadArtifact.sha256, LectureEvalArtifact.lecture_hash, EssayGradeCache.cache_key,
+                       DriveFileText.content_key, ExtractionJob.source):
+            self.assertEqual(await self.remaining(column), ["recent"])
+
+    async def test_failing_purge_does_not_skip_the_others(self):
+        await self.add_rows()
+
+        async def broken(db, cutoff):
+            raise RuntimeError("table locked")
+
+        purges = list(cleanup_service.RETENTION_PURGES)
+        purges[0] = (purges[0][0], broken, purges[0][2])
+        with mock.patch.object(cleanup_service, "RETENTION_PURGES", tuple(purges)):
+            removed = await cleanup_service.purge_expired_rows_once()
+        self.assertNotIn("upload_artifacts", removed)
+        self.assertEqual(len(await self.remaining(UploadArtifact.sha256)), 2)
+        self.assertEqual(await self.remaining(DriveFileText.content_key), ["recent"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from DB.schemas import Course, Document
+from services import drive_download_service, extraction_worker
+from sqlite_helpers import SQLiteTestCase
+
+
+class EnsureDocumentTextTests(SQLiteTestCase):
+    session_modules = (drive_download_service,)
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        fd, self.pdf_path = tempfile.mkstemp(suffix=".pdf", dir=self._tmpdir)
+        os.close(fd)
+        async with self.Session() as db:
+            db.add(Course(classroom_id="c1", title="Course"))
+            await db.commit()
+            db.add(Document(course_id=1, title="Slides", doc_type="manual_upload", s3_path=self.pdf_path))
+            await db.commit()
+
+    async def test_shared_extraction_survives_the_first_caller_going_away(self):
+        calls = []
+
+        async def fake_extraction(db, document_id, source, fn, *args):
+            calls.append(document_id)
+            await asyncio.sleep(0.1)
+            return "extracted text"
+
+        with mock.patch.object(drive_download_service, "run_document_extraction", fake_extraction):
+            first_db = self.Session()
+            first_doc = await first_db.get(Document, 1)
+            first = asyncio.create_task(drive_download_service.ensure_document_text(first_doc, first_db))
+            await asyncio.sleep(0.02)
+            # The request that started the extraction is cancelled and its session closed.
+            first.cancel()
+            await first_db.close()
+
+            async with self.Session() as db:
+                doc = await db.get(Document, 1)
+                text = await drive_download_service.ensure_document_text(doc, db)
+                self.assertEqual(text, "extracted text")
+                self.assertEqual(doc.raw_text, "extracted text")
+
+        self.assertEqual(calls, [1])
+        async with self.Session() as db:
+            self.assertEqual((await db.get(Document, 1)).raw_text, "extracted text")
+
+
+class ExtractionPoolTimeoutTests(unittest.IsolatedAsyncioTestCase):
+    async def test_timed_out_job_retires_the_pool(self):
+        stuck_pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(stuck_pool.shutdown)
+        with mock.patch.object(extraction_worker, "_pool", stuck_pool), \
+                mock.patch.object(extraction_worker.settings, "EXTRACTION_JOB_TIMEOUT_S", 0.05):
+            with self.assertRaises(asyncio.TimeoutError):
+                await extraction_worker.run_in_extraction_pool(time.sleep, 0.3)
+            # Later jobs get a fresh pool instead of queueing behind the stuck worker.
+            self.assertIsNone(extraction_worker._pool)
+        with self.assertRaises(RuntimeError):
+            stuck_pool.submit(len, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy.future import select
+
+from Core.config import settings
+from DB.schemas import Course, Document, DriveFileText
+from services import drive_download_service
+from services.drive_download_service import _same_drive_content, drive_content_key
+from sqlite_helpers import SQLiteTestCase
+
+# Kept before DriveTextReuseTests patches it out.
+fetch_drive_metadata = drive_download_service._fetch_drive_metadata
+
+FILE_ID = "file-0000001"
+COPY_ID = "file-0000002"
+
+
+def _drive_url(file_id: str) -> str:
+    return f"https://drive.google.com/file/d/{file_id}/view"
+
+
+class DriveDedupTests(unittest.TestCase):
+    def test_content_key_prefers_checksum_so_copies_share_text(self):
+        meta = {"md5Checksum": "abc", "modifiedTime": "2026-01-01T00:00:00Z"}
+        self.assertEqual(drive_content_key("file-1", meta), "md5:abc")
+        self.assertEqual(drive_content_key("file-2", meta), "md5:abc")
+
+    def test_google_docs_are_keyed_by_revision(self):
+        key = drive_content_key("doc-1", {"mimeType": "application/vnd.google-apps.document",
+                                          "modifiedTime": "2026-01-01T00:00:00Z"})
+        self.assertEqual(key, "rev:doc-1:2026-01-01T00:00:00Z")
+        self.assertIsNone(drive_content_key("doc-1", {}))
+
+    def test_same_drive_content_compares_checksum_or_modified_time(self):
+        doc = SimpleNamespace(drive_file_id="f", drive_md5_checksum="abc",
+                              drive_modified_time=datetime(2026, 1, 1))  # naive, as SQLite returns it
+        self.assertTrue(_same_drive_content(doc, "f", {"md5Checksum": "abc"}))
+        self.assertFalse(_same_drive_content(doc, "f", {"md5Checksum": "def"}))
+        self.assertFalse(_same_drive_content(doc, "other", {"md5Checksum": "abc"}))
+
+        doc.drive_md5_checksum = None
+        self.assertTrue(_same_drive_content(doc, "f", {"modifiedTime": "2026-01-01T00:00:00.000Z"}))
+        self.assertFalse(_same_drive_content(doc, "f", {"modifiedTime": "2026-02-01T00:00:00Z"}))
+        doc.drive_modified_time = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.assertTrue(_same_drive_content(doc, "f", {"modifiedTime": "2026-01-01T00:00:00Z"}))
+
+
+class DriveTextReuseTests(SQLiteTestCase):
+    session_modules = (drive_download_service,)
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.metadata = {"md5Checksum": "abc", "mimeType": "application/pdf"}
+        self.downloads = []
+        self.extractions = []
+        async with self.Session() as db:
+            db.add(Course(classroom_id="c1", title="Course"))
+            await db.commit()
+
+        async def fetch_metadata(file_id, access_token):
+            return dict(self.metadata)
+
+        async def download(file_id, is_gdoc, access_token):
+            self.downloads.append(file_id)
+            await asyncio.sleep(0.05)
+            return b"%PDF-1.4"
+
+        async def extract(db, document_id, source, fn, *args):
+            self.extractions.append((source, db))
+            return f"text from {source}"
+
+        async def access_token(doc, db):
+            return "token"
+
+        for name, fake in (("_fetch_drive_metadata", fetch_metadata), ("_download_bytes", download),
+                           ("run_document_extraction", extract), ("_drive_access_token", access_token)):
+            patcher = mock.patch.object(drive_download_service, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(settings, "PDF_UPLOAD_DIR", self._tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def add_doc(self, file_id=FILE_ID, **fields) -> int:
+        async with self.Session() as db:
+            doc = Document(course_id=1, title="Slides", doc_type="material", google_drive_url=_drive_url(file_id), **fields)
+            db.add(doc)
+            await db.commit()
+            return doc.id
+
+    async def ensure_text(self, doc_id: int) -> Document:
+        async with self.Session() as db:
+            doc = await db.get(Document, doc_id)
+            await drive_download_service.ensure_document_text(doc, db)
+            return doc
+
+    async def test_known_content_reuses_stored_text_without_downloading(self):
+        async with self.Session() as db:
+            db.add(DriveFileText(content_key="md5:abc", drive_file_id=COPY_ID, md5_checksum="abc",
+                                 raw_text="stored text", last_used_at=datetime.now(timezone.utc) - timedelta(days=10)))
+            await db.commit()
+        doc_id = await self.add_doc()
+
+        doc = await self.ensure_text(doc_id)
+        self.assertEqual((doc.raw_text, doc.drive_file_id, doc.drive_md5_checksum), ("stored text", FILE_ID, "abc"))
+        self.assertEqual((self.downloads, self.extractions), ([], []))
+        async with self.Session() as db:
+            entry = (await db.execute(select(DriveFileText))).scalars().one()
+        # SQLite hands the timestamp back naive; it is stored as UTC.
+        self.assertGreater(entry.last_used_at.replace(tzinfo=timezone.utc), datetime.now(timezone.utc) - timedelta(minutes=1))
+
+    async def test_local_pdf_is_only_trusted_while_the_drive_file_is_unchanged(self):
+        fd, pdf_path = tempfile.mkstemp(suffix=".pdf", dir=self._tmpdir)
+        os.close(fd)
+        doc_id = await self.add_doc(s3_path=pdf_path, drive_file_id=FILE_ID, drive_md5_checksum="abc")
+
+        doc = await self.ensure_text(doc_id)
+        self.assertEqual((doc.raw_text, self.downloads), ("text from local", []))
+
+        async with self.Session() as db:
+            (await db.get(Document, doc_id)).raw_text = None
+            await db.commit()
+        self.metadata["md5Checksum"] = "def"
+        doc = await self.ensure_text(doc_id)
+        self.assertEqual((doc.raw_text, doc.drive_md5_checksum, self.downloads), ("text from drive", "def", [FILE_ID]))
+
+    async def test_download_is_shared_and_runs_in_its_own_session(self):
+        first_id = await self.add_doc()
+        second_id = await self.add_doc(file_id=COPY_ID)
+
+        first_db = self.Session()
+        first_doc = await first_db.get(Document, first_id)
+        first = asyncio.create_task(drive_download_service.ensure_document_text(first_doc, first_db))
+        await asyncio.sleep(0.01)
+        # The request that started the download goes away; the identical copy
+        # still gets the text from the same flight.
+        first.cancel()
+        await first_db.close()
+        second = await self.ensure_text(second_id)
+
+        self.assertEqual(second.raw_text, "text from drive")
+        self.assertEqual(self.downloads, [FILE_ID])
+        self.assertEqual([source for source, _ in self.extractions], ["drive"])
+        self.assertIsNot(self.extractions[0][1], first_db)
+        async with self.Session() as db:
+            entries = (await db.execute(select(DriveFileText.content_key, DriveFileText.raw_text))).all()
+        self.assertEqual(entries, [("md5:abc", "text from drive")])
+        self.assertTrue(os.path.exists(second.s3_path))
+
+    async def test_unreachable_metadata_falls_back_to_a_plain_download(self):
+        async def unreachable(*args, **kwargs):
+            raise httpx.ConnectError("no route to host")
+
+        doc_id = await self.add_doc()
+        with mock.patch.object(drive_download_service, "request_with_retry", unreachable), \
+                mock.patch.object(drive_download_service, "_fetch_drive_metadata", fetch_drive_metadata):
+            doc = await self.ensure_text(doc_id)
+
+        self.assertEqual((doc.raw_text, doc.drive_md5_checksum, self.downloads), ("text from drive", None, [FILE_ID]))
+        async with self.Session() as db:
+            self.assertEqual((await db.execute(select(DriveFileText))).scalars().all(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
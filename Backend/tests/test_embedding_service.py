@@ -0,0 +1,65 @@
+import importlib.util
+import os
+import sys
+import unittest
+
+import numpy as np
+
+os.environ.setdefault("CLIENT_ID", "test-client")
+os.environ.setdefault("CLIENT_SECRET", "test-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+from services.embedding_service import MODEL_NAME, OnnxEmbedder
+
+MODEL_DIR = os.path.join(ONNXMiniLM_L6_V2.DOWNLOAD_PATH, ONNXMiniLM_L6_V2.EXTRACTED_FOLDER_NAME)
+HAS_MODEL = os.path.exists(os.path.join(MODEL_DIR, "model.onnx"))
+
+TEXTS = [
+    "Gradient descent iteratively updates the model weights to reduce the loss.",
+    "The learning rate controls the step size.",
+    "Photosynthesis converts light energy into chemical energy in plants.",
+    "short",
+    " ".join(["A very long lecture paragraph that exceeds the token limit."] * 60),
+]
+
+
+def _cosines(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+@unittest.skipUnless(HAS_MODEL, f"{MODEL_NAME} ONNX model not downloaded")
+class EmbedderParityTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.embedder = OnnxEmbedder(MODEL_DIR)
+        cls.vectors = cls.embedder.encode(TEXTS, batch_size=2)
+
+    def test_rows_are_normalised_and_in_input_order(self):
+        self.assertEqual(self.vectors.shape, (len(TEXTS), 384))
+        np.testing.assert_allclose(np.linalg.norm(self.vectors, axis=1), 1.0, atol=1e-5)
+        for i, text in enumerate(TEXTS):
+            np.testing.assert_allclose(self.embedder.encode([text])[0], self.vectors[i], atol=1e-5)
+
+    def test_matches_chroma_default_embedding_function(self):
+        reference = np.array(ONNXMiniLM_L6_V2()(TEXTS), dtype=np.float32)
+        self.assertTrue((_cosines(self.vectors, reference) > 0.9999).all())
+
+    @unittest.skipUnless(importlib.util.find_spec("sentence_transformers"), "sentence-transformers not installed")
+    def test_matches_sentence_transformers(self):
+        from sentence_transformers import SentenceTransformer
+
+        reference = SentenceTransformer(MODEL_NAME).encode(TEXTS, convert_to_numpy=True)
+        self.assertTrue((_cosines(self.vectors, reference) > 0.999).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
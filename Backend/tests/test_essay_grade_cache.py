@@ -0,0 +1,78 @@
+import importlib.util
+import os
+import sys
+import unittest
+from dataclasses import replace
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+HAS_TORCH = all(importlib.util.find_spec(name) for name in ("torch", "transformers"))
+if HAS_TORCH:
+    from services import essay_grade_cache_service
+    from services.essay_grade_cache_service import _LRU, grade_cache_key, normalize_text
+    from services.essay_grader_service import GraderConfig
+
+
+@unittest.skipUnless(HAS_TORCH, "torch / transformers not installed")
+class GradeCacheKeyTests(unittest.TestCase):
+    def use_config(self, config: "GraderConfig") -> None:
+        patcher = mock.patch.object(essay_grade_cache_service, "grader_config", return_value=config)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def setUp(self):
+        self.config = GraderConfig(model_path="model")
+        self.use_config(self.config)
+
+    def test_normalize_text_collapses_whitespace_and_unicode_forms(self):
+        self.assertEqual(normalize_text("  Cafe\u0301 \n\n is\topen. "), "Caf\u00e9 is open.")
+
+    def test_whitespace_only_differences_share_a_key(self):
+        self.assertEqual(
+            grade_cache_key("An essay.\n\nSecond  paragraph.", None),
+            grade_cache_key("  An essay. Second paragraph.", None),
+        )
+        self.assertNotEqual(grade_cache_key("An essay.", None), grade_cache_key("Another essay.", None))
+
+    def test_question_only_counts_when_the_grader_uses_it(self):
+        self.assertEqual(grade_cache_key("An essay.", "Q1"), grade_cache_key("An essay.", "Q2"))
+        self.use_config(replace(self.config, use_question_prefix=True))
+        self.assertNotEqual(grade_cache_key("An essay.", "Q1"), grade_cache_key("An essay.", "Q2"))
+
+    def test_scoring_config_changes_the_key_but_runtime_settings_do_not(self):
+        key = grade_cache_key("An essay.", None)
+        self.use_config(replace(self.config, intra_op_threads=4, device="cpu"))
+        self.assertEqual(grade_cache_key("An essay.", None), key)
+        self.use_config(replace(self.config, backend="onnx-int8"))
+        self.assertNotEqual(grade_cache_key("An essay.", None), key)
+
+
+@unittest.skipUnless(HAS_TORCH, "torch / transformers not installed")
+class LRUTests(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        lru = _LRU(2)
+        lru.put("a", {"band": 1})
+        lru.put("b", {"band": 2})
+        self.assertEqual(lru.get("a"), {"band": 1})
+        lru.put("c", {"band": 3})
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), {"band": 1})
+        self.assertEqual(lru.get("c"), {"band": 3})
+
+    def test_zero_size_disables_storage(self):
+        lru = _LRU(0)
+        lru.put("a", {"band": 1})
+        self.assertIsNone(lru.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
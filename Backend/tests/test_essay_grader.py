@@ -0,0 +1,360 @@
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+HAS_TORCH = all(importlib.util.find_spec(name) for name in ("torch", "transformers"))
+HAS_EXPORT = HAS_TORCH and all(importlib.util.find_spec(name) for name in ("onnx", "onnxruntime"))
+if HAS_TORCH:
+    import httpx
+    from fastapi import FastAPI
+
+    from Routers import ai
+    from services import essay_grader_service
+    from services.essay_grader_service import EssayBatcher, EssayGrader, GraderConfig, iter_grade_essays
+
+
+def _essay(topic: str, sentences: int = 3) -> str:
+    """Prose that passes the grader's input validation; longer with more sentences."""
+    sentence = (
+        f"The {topic} debate matters because people who study it carefully can explain "
+        f"why their cities, schools and families should care about {topic} today."
+    )
+    return " ".join(f"{sentence[:-1]} in case {i}." for i in range(sentences))
+
+
+class FakeGrader:
+    """Records each ``predict_batch`` call; grades an essay as ``"graded:<essay>"``."""
+
+    def __init__(self, error: Exception | None = None):
+        self.batches = []
+        self.error = error
+
+    def predict_batch(self, essays, questions=None):
+        self.batches.append(list(essays))
+        if self.error is not None:
+            raise self.error
+        return [f"graded:{essay}" for essay in essays]
+
+
+class FakeResult:
+    def __init__(self, essay, question):
+        self.essay, self.question = essay, question
+
+    def to_dict(self):
+        return {"predicted_band": float(len(self.essay.split()) % 9), "question": self.question}
+
+
+class FakeBulkGrader:
+    """Token length = word count; ``fail_on`` makes the batch containing that essay raise."""
+
+    def __init__(self, fail_on: str | None = None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def _build_input_text(self, essay, question):
+        return f"{question} {essay}" if question else essay
+
+    def token_lengths(self, texts):
+        return [len(text.split()) for text in texts]
+
+    def predict_batch(self, essays, questions=None):
+        self.batches.append(list(essays))
+        if self.fail_on in essays:
+            raise RuntimeError("out of memory")
+        return [FakeResult(essay, question) for essay, question in zip(essays, questions)]
+
+
+@unittest.skipUnless(HAS_TORCH, "torch / transformers not installed")
+class EssayBatcherTests(unittest.IsolatedAsyncioTestCase):
+    def use_grader(self, grader: FakeGrader) -> FakeGrader:
+        patcher = mock.patch.object(essay_grader_service, "get_essay_grader", return_value=grader)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return grader
+
+    async def test_concurrent_requests_share_one_forward_pass(self):
+        grader = self.use_grader(FakeGrader())
+        batcher = EssayBatcher(max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(f"essay {i}") for i in range(3)))
+        self.assertEqual(results, ["graded:essay 0", "graded:essay 1", "graded:essay 2"])
+        self.assertEqual(grader.batches, [["essay 0", "essay 1", "essay 2"]])
+
+    async def test_full_batch_is_flushed_without_waiting(self):
+        grader = self.use_grader(FakeGrader())
+        batcher = EssayBatcher(max_batch_size=2, max_wait_ms=60_000)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(f"essay {i}") for i in range(4))),
+            timeout=5,
+        )
+        self.assertEqual(results, [f"graded:essay {i}" for i in range(4)])
+        self.assertEqual(grader.batches, [["essay 0", "essay 1"], ["essay 2", "essay 3"]])
+
+    async def test_grader_error_reaches_every_caller_and_batcher_keeps_running(self):
+        grader = self.use_grader(FakeGrader(error=RuntimeError("model exploded")))
+        batcher = EssayBatcher(max_batch_size=8, max_wait_ms=20)
+        outcomes = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        self.assertEqual([str(e) for e in outcomes], ["model exploded", "model exploded"])
+
+        grader.error = None
+        self.assertEqual(await batcher.submit("c"), "graded:c")
+        self.assertEqual(grader.batches, [["a", "b"], ["c"]])
+
+    async def test_cancelled_callers_are_not_graded(self):
+        grader = self.use_grader(FakeGrader())
+        batcher = EssayBatcher(max_batch_size=8, max_wait_ms=100)
+        gone = asyncio.create_task(batcher.submit("gone"))
+        kept = asyncio.create_task(batcher.submit("kept"))
+        await asyncio.sleep(0.01)
+        gone.cancel()
+        self.assertEqual(await kept, "graded:kept")
+        self.assertEqual(grader.batches, [["kept"]])
+
+
+@unittest.skipUnless(HAS_TORCH, "torch / transformers not installed")
+class IterGradeEssaysTests(unittest.TestCase):
+    def use_grader(self, grader: FakeBulkGrader) -> FakeBulkGrader:
+        patcher = mock.patch.object(essay_grader_service, "get_essay_grader", return_value=grader)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return grader
+
+    def test_invalid_essays_fail_first_and_valid_ones_batch_by_length(self):
+        grader = self.use_grader(FakeBulkGrader())
+        essays = [_essay("energy", 5), "too short", _essay("trade", 2), _essay("art", 4), _essay("water", 3)]
+        outcomes = list(iter_grade_essays(essays, ["Q"] * len(essays), batch_size=2))
+
+        self.assertEqual(outcomes[0][0], 1)
+        self.assertIn("too short", outcomes[0][1]["error"])
+        self.assertEqual([index for index, _ in outcomes[1:]], [2, 4, 3, 0])
+        self.assertEqual(grader.batches, [[essays[2], essays[4]], [essays[3], essays[0]]])
+        self.assertEqual(dict(outcomes)[0], FakeResult(essays[0], "Q").to_dict())
+
+    def test_failed_batch_reports_each_essay_and_others_continue(self):
+        essays = [_essay("energy", 2), _essay("trade", 3), _essay("art", 4)]
+        self.use_grader(FakeBulkGrader(fail_on=essays[1]))
+        outcomes = dict(iter_grade_essays(essays, batch_size=2))
+
+        self.assertEqual(outcomes[0], {"error": "out of memory"})
+        self.assertEqual(outcomes[1], {"error": "out of memory"})
+        self.assertEqual(outcomes[2], FakeResult(essays[2], None).to_dict())
+
+    def test_questions_must_match_essays(self):
+        with self.assertRaises(ValueError):
+            list(iter_grade_essays([_essay("energy")], ["Q1", "Q2"]))
+
+    def test_nothing_valid_never_loads_the_grader(self):
+        with mock.patch.object(essay_grader_service, "get_essay_grader") as get_grader:
+            self.assertEqual([i for i, _ in iter_grade_essays(["no", "nope"])], [0, 1])
+        get_grader.assert_not_called()
+
+
+@unittest.skipUnless(HAS_TORCH, "torch / transformers not installed")
+class BatchGradeEndpointTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        app = FastAPI()
+        app.include_router(ai.router, prefix="/api/ai")
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.addAsyncCleanup(self.client.aclose)
+        self.grader = FakeBulkGrader()
+        patcher = mock.patch.object(essay_grader_service, "get_essay_grader", return_value=self.grader)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _events(response):
+        return [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+    async def test_batch_streams_one_event_per_essay_then_done(self):
+        body = {
+            "question": "Shared question",
+            "essays": [
+                {"essay_text": _essay("energy"), "essay_id": "a"},
+                {"essay_text": "too short", "essay_id": "b"},
+                {"essay_text": _essay("trade"), "essay_id": "c", "question": "Own question"},
+            ],
+        }
+        response = await self.client.post("/api/ai/grade-essay/batch", json=body)
+        self.assertEqual(response.status_code, 200)
+        events = self._events(response)
+
+        self.assertEqual(events[-1], {"type": "done", "graded": 2, "failed": 1})
+        by_id = {event["essay_id"]: event for event in events[:-1]}
+        self.assertEqual(by_id["b"]["type"], "error")
+        self.assertEqual(by_id["a"]["result"]["question"], "Shared question")
+        self.assertEqual(by_id["c"]["result"]["question"], "Own question")
+        self.assertEqual(by_id["c"]["index"], 2)
+
+    async def test_batch_rejects_too_many_essays(self):
+        with mock.patch.object(ai.settings, "ESSAY_BULK_MAX_ITEMS", 1):
+            response = await self.client.post(
+                "/api/ai/grade-essay/batch",
+                json={"essays": [{"essay_text": "one"}, {"essay_text": "two"}]},
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.grader.batches, [])
+
+
+class WordTokenizer:
+    """Whitespace tokenizer with the slice of the Hugging Face API windowing uses.
+
+    Word ``w<n>`` has id ``n``; [CLS] is 1 and [SEP] is 2.
+    """
+
+    def _ids(self, text):
+        return [int(word[1:]) for word in text.split()]
+
+    def __call__(self, texts, add_special_tokens=True, **kwargs):
+        ids = [self._ids(text) for text in texts]
+        if add_special_tokens:
+            ids = [self.prepare_for_model(row)["input_ids"] for row in ids]
+        return {"input_ids": ids}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    def prepare_for_model(self, ids, add_special_tokens=True, **kwargs):
+        ids = [1, *ids, 2]
+        return {"input_ids": ids, "attention_mask": [1] * len(ids)}
+
+    def pad(self, features, **kwargs):
+        return features
+
+
+@unittest.skipUnless(HAS_TORCH, "torch / transformers not installed")
+class ThreadCountTests(unittest.TestCase):
+    def test_cores_are_split_across_configured_workers(self):
+        with mock.patch.object(essay_grader_service.os, "sched_getaffinity", return_value=set(range(8)), create=True), \
+                mock.patch.object(essay_grader_service.settings, "WEB_CONCURRENCY", 3):
+            self.assertEqual(essay_grader_service.auto_thread_count(), 2)
+        with mock.patch.object(essay_grader_service.os, "sched_getaffinity", return_value={0}, create=True), \
+                mock.patch.object(essay_grader_service.settings, "WEB_CONCURRENCY", 4):
+            self.assertEqual(essay_grader_service.auto_thread_count(), 1)
+
+
+def _words(first: int, count: int) -> str:
+    return " ".join(f"w{n}" for n in range(first, first + count))
+
+
+@unittest.skipUnless(HAS_TORCH, "torch / transformers not installed")
+class WindowedGradingTests(unittest.TestCase):
+    def _grader(self, **config) -> "EssayGrader":
+        grader = EssayGrader.__new__(EssayGrader)
+        grader.config = GraderConfig(model_path="model", windowed=True, **config)
+        grader.tokenizer = WordTokenizer()
+        grader._ort_session = None
+        return grader
+
+    def test_spread_keeps_first_and_last(self):
+        self.assertEqual(EssayGrader._spread([0, 1, 2], 5), [0, 1, 2])
+        self.assertEqual(EssayGrader._spread(list(range(10)), 4), [0, 3, 6, 9])
+        self.assertEqual(EssayGrader._spread(list(range(10)), 2), [0, 9])
+        self.assertEqual(EssayGrader._spread(list(range(10)), 1), [0])
+
+    def test_every_window_starts_with_the_question(self):
+        grader = self._grader(max_length=12, window_stride=2, max_windows=8, use_question_prefix=True)
+        question, essay = _words(500, 2), _words(100, 20)
+        features, owners = grader._window_features([essay], [question])
+
+        windows = [f["input_ids"] for f in features]
+        self.assertEqual(owners, [0] * len(windows))
+        self.assertGreater(len(windows), 1)
+        for ids in windows:
+            self.assertLessEqual(len(ids), 12)
+            self.assertEqual(ids[:3], [1, 500, 501])
+            self.assertEqual(ids[-1], 2)
+        bodies = [ids[3:-1] for ids in windows]
+        self.assertEqual(bodies[0][0], 100)
+        self.assertEqual(bodies[-1][-1], 119)
+        for previous, current in zip(bodies, bodies[1:]):
+            self.assertEqual(previous[-2:], current[:2])
+
+    def test_window_count_is_capped_and_short_essays_use_one_window(self):
+        grader = self._grader(max_length=12, window_stride=2, max_windows=3)
+        features, owners = grader._window_features([_words(100, 60), _words(300, 5)], ["", ""])
+        self.assertEqual(owners, [0, 0, 0, 1])
+        self.assertEqual(features[0]["input_ids"][1], 100)
+        self.assertEqual(features[2]["input_ids"][-2], 159)
+        self.assertEqual(features[3]["input_ids"], [1, *range(300, 305), 2])
+
+    def test_bands_are_token_weighted_per_essay(self):
+        grader = self._grader(max_length=12, window_stride=2, max_windows=8)
+        bands = [4.0, 8.0, 6.0]
+        with mock.patch.object(grader, "_run_model", return_value=[[band] for band in bands]), \
+                mock.patch.object(grader, "_decode_raw_band", side_effect=lambda logits: logits[0][0]):
+            # 14 tokens -> windows of 10 and 6 body tokens (12 and 8 with specials); 3 tokens -> one window of 5.
+            result = grader._windowed_raw_bands([_words(100, 14), _words(300, 3)], ["", ""])
+        self.assertEqual(result, [((4.0 * 12 + 8.0 * 8) / 20, 2), (6.0, 1)])
+
+
+def _load_script(name: str):
+    spec = importlib.util.spec_from_file_location(name, Path(ROOT) / "scripts" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _tiny_checkpoint(directory: str, num_labels: int, texts) -> str:
+    """A two-layer BERT classifier small enough to export in a test."""
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    words = {word.strip(".,").lower() for text in texts for word in text.split()}
+    vocab = Path(directory) / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ".", ",", *sorted(words)]))
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab))
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=512,
+        num_labels=num_labels,
+    )
+    torch.manual_seed(0)
+    target = str(Path(directory) / "checkpoint")
+    BertForSequenceClassification(config).save_pretrained(target)
+    tokenizer.save_pretrained(target)
+    return target
+
+
+@unittest.skipUnless(HAS_EXPORT, "torch / transformers / onnx / onnxruntime not installed")
+class ExportParityTests(unittest.TestCase):
+    def test_export_is_checked_for_both_objectives(self):
+        from transformers import AutoConfig
+
+        export_script = _load_script("export_essay_grader")
+        original_check = export_script.check_parity
+        checked = []
+
+        def check_parity(model_path, backend, onnx_path, samples):
+            checked.append((int(AutoConfig.from_pretrained(model_path).num_labels), backend))
+            return original_check(model_path, backend, onnx_path, samples)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = _tiny_checkpoint(tmp, 1, export_script._DEFAULT_SAMPLES)
+            with mock.patch.object(export_script, "check_parity", check_parity):
+                self.assertEqual(export_script.main(model_path, quantize=False, samples_path=None), 0)
+            self.assertTrue(Path(export_script.default_onnx_path(model_path)).exists())
+
+        self.assertEqual(checked, [(1, "onnx"), (export_script.OBJECTIVE_LABELS["ordinal"], "onnx")])
+
+
+if __name__ == "__main__":
+    unittest.main()
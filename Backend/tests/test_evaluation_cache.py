@@ -0,0 +1,267 @@
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+os.environ.setdefault("CLIENT_ID", "test-client")
+os.environ.setdefault("CLIENT_SECRET", "test-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.future import select
+
+from DB.schemas import Evaluation, LectureEvalArtifact
+from Routers import ai
+from services import batch_evaluation_service, evaluation_cache_service, evaluator_service
+from services.evaluation_cache_service import artifacts_from_row, artifacts_to_fields
+from services.evaluator_service import LectureArtifacts, combine_scores, lecture_hash, score_local_metrics_batch
+from services.rouge_metrics import tokenize as rouge_tokenize
+from sqlite_helpers import SQLiteTestCase
+
+
+def _artifacts(n_chunks: int = 3, n_key_points: int = 2, dim: int = 8) -> LectureArtifacts:
+    rng = np.random.default_rng(0)
+    return LectureArtifacts(
+        lecture_hash=lecture_hash("lecture"),
+        reference_summary="reference",
+        key_points=[f"point {i}" for i in range(n_key_points)],
+        terms=["gradient", "descent"],
+        lecture_embedding=rng.random(dim, dtype=np.float32),
+        reference_embedding=rng.random(dim, dtype=np.float32),
+        chunk_embeddings=rng.random((n_chunks, dim), dtype=np.float32),
+        key_point_embeddings=rng.random((n_key_points, dim), dtype=np.float32),
+        reference_tokens=rouge_tokenize("gradient descent minimises the loss step by step"),
+    )
+
+
+def _student_vectors(n: int, dim: int = 8) -> np.ndarray:
+    vectors = np.random.default_rng(1).random((n, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+STUDENTS = [
+    "Gradient descent minimises the loss step by step.",
+    "The lecture was about cooking pasta.",
+    "Descent along the gradient reduces loss.",
+]
+LOCAL_METRICS = {"correctness", "relevance", "completeness", "conciseness", "terminology"}
+
+
+class LectureArtifactRoundTripTests(unittest.TestCase):
+    def test_vectors_survive_storage(self):
+        original = _artifacts()
+        restored = artifacts_from_row(LectureEvalArtifact(**artifacts_to_fields(original)))
+        np.testing.assert_array_equal(restored.lecture_embedding, original.lecture_embedding)
+        np.testing.assert_array_equal(restored.reference_embedding, original.reference_embedding)
+        np.testing.assert_array_equal(restored.chunk_embeddings, original.chunk_embeddings)
+        np.testing.assert_array_equal(restored.key_point_embeddings, original.key_point_embeddings)
+        self.assertEqual(restored.key_points, original.key_points)
+        self.assertEqual(restored.terms, original.terms)
+
+    def test_empty_key_points_keep_dimension(self):
+        restored = artifacts_from_row(LectureEvalArtifact(**artifacts_to_fields(_artifacts(n_key_points=0))))
+        self.assertEqual(restored.key_point_embeddings.shape, (0, 8))
+
+    def test_lecture_hash_is_content_based(self):
+        self.assertEqual(lecture_hash("same text"), lecture_hash("same text"))
+        self.assertNotEqual(lecture_hash("same text"), lecture_hash("other text"))
+
+    def test_lecture_hash_changes_with_artifact_version(self):
+        current = lecture_hash("same text")
+        with mock.patch.object(evaluator_service, "LECTURE_ARTIFACTS_VERSION", evaluator_service.LECTURE_ARTIFACTS_VERSION + 1):
+            self.assertNotEqual(lecture_hash("same text"), current)
+
+
+class CombineScoresTests(unittest.TestCase):
+    def test_batch_result_matches_single_evaluation_shape(self):
+        lecture = _artifacts()
+        result = combine_scores({"correctness": (8.0, "a"), "coherence": (6.0, "b")}, lecture)
+        self.assertEqual(result["overall"], 7.0)
+        self.assertEqual(result["scores"]["coherence"], {"score": 6.0, "detail": "b"})
+        self.assertEqual(result["reference_summary"], "reference")
+        self.assertEqual(result["key_points"], lecture.key_points)
+
+
+
+class LocalMetricsBatchTests(unittest.TestCase):
+    def test_batch_matches_one_summary_at_a_time(self):
+        lecture = _artifacts()
+        vectors = _student_vectors(len(STUDENTS))
+        batch = score_local_metrics_batch(STUDENTS, lecture, embeddings=vectors)
+        self.assertEqual(len(batch), len(STUDENTS))
+        for i, student in enumerate(STUDENTS):
+            self.assertEqual(set(batch[i]), LOCAL_METRICS)
+            self.assertEqual(batch[i], score_local_metrics_batch([student], lecture, embeddings=vectors[i:i + 1])[0])
+
+    def test_summaries_are_encoded_in_one_pass(self):
+        vectors = _student_vectors(len(STUDENTS))
+        with mock.patch.object(evaluator_service, "_encode", return_value=vectors) as encode:
+            score_local_metrics_batch(STUDENTS, _artifacts())
+        encode.assert_called_once_with(STUDENTS)
+
+    def test_terminology_counts_lecture_terms(self):
+        batch = score_local_metrics_batch(STUDENTS, _artifacts(), embeddings=_student_vectors(len(STUDENTS)))
+        self.assertEqual(batch[0]["terminology"], (10.0, "2/2 domain terms matched"))
+        self.assertEqual(batch[1]["terminology"], (0.0, "0/2 domain terms matched"))
+
+    def test_no_summaries(self):
+        with mock.patch.object(evaluator_service, "_encode") as encode:
+            self.assertEqual(score_local_metrics_batch([], _artifacts()), [])
+        encode.assert_not_called()
+
+
+class BatchEvaluationTests(unittest.IsolatedAsyncioTestCase):
+    async def _collect(self, coherence, concurrency=2):
+        lecture = _artifacts()
+        vectors = _student_vectors(len(STUDENTS))
+        with mock.patch.object(evaluator_service, "_encode", return_value=vectors), \
+                mock.patch.object(batch_evaluation_service, "score_coherence", coherence):
+            results = [
+                item async for item in batch_evaluation_service.iter_batch_evaluations(STUDENTS, lecture, concurrency)
+            ]
+        return lecture, vectors, results
+
+    async def test_every_summary_gets_local_metrics_and_coherence(self):
+        lecture, vectors, results = await self._collect(lambda student: (float(len(student) % 10), "llm"))
+        self.assertEqual(sorted(index for index, _ in results), [0, 1, 2])
+        local = score_local_metrics_batch(STUDENTS, lecture, embeddings=vectors)
+        for index, result in results:
+            expected = combine_scores({**local[index], "coherence": (float(len(STUDENTS[index]) % 10), "llm")}, lecture)
+            self.assertEqual(result, expected)
+
+    async def test_results_arrive_in_completion_order(self):
+        delays = {STUDENTS[0]: 0.15, STUDENTS[1]: 0.0, STUDENTS[2]: 0.05}
+
+        def coherence(student):
+            time.sleep(delays[student])
+            return 5.0, "ok"
+
+        _, _, results = await self._collect(coherence, concurrency=3)
+        self.assertEqual([index for index, _ in results], [1, 2, 0])
+
+    async def test_coherence_calls_are_bounded(self):
+        lock = threading.Lock()
+        active = peak = 0
+
+        def coherence(student):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return 5.0, "ok"
+
+        await self._collect(coherence, concurrency=1)
+        self.assertEqual(peak, 1)
+
+
+LECTURE = (
+    "Gradient descent iteratively updates the model weights in the direction that reduces the loss.\n\n"
+    "The learning rate controls how large each update is; too large a rate diverges and too small converges slowly."
+)
+
+
+def _fake_encode(texts):
+    rows = [np.random.default_rng(abs(hash(text)) % (2 ** 32)).random(8, dtype=np.float32) for text in texts]
+    vectors = np.array(rows, dtype=np.float32).reshape(len(texts), 8)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class StreamingEvaluationTests(unittest.TestCase):
+    def setUp(self):
+        for name, value in (
+            ("_encode", _fake_encode),
+            ("get_embedder", lambda: None),
+            ("_reference_summary_safe", lambda lecture: "Gradient descent reduces the loss with a learning rate."),
+            ("_key_points_safe", lambda lecture: ["weights follow the gradient", "learning rate sets the step"]),
+            ("score_coherence", lambda student: (7.0, "flows well")),
+        ):
+            patcher = mock.patch.object(evaluator_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_streamed_metrics_match_blocking_evaluation(self):
+        student = STUDENTS[0]
+        expected = evaluator_service.evaluate_summary(student, LECTURE)
+        events = list(evaluator_service.iter_evaluation_events(student, LECTURE))
+
+        metrics = {name: {"score": score, "detail": detail} for kind, (name, score, detail) in events[:-1]}
+        self.assertEqual(metrics, expected["scores"])
+        self.assertEqual([kind for kind, _ in events], ["metric"] * 6 + ["artifacts"])
+        # Lecture-only metrics come before those needing the reference summary.
+        self.assertEqual([name for _, (name, *_rest) in events[:2]], ["terminology", "relevance"])
+
+        streamed = events[-1][1]
+        prepared, _ = evaluator_service._prepare_lecture(LECTURE)
+        self.assertEqual(streamed.lecture_hash, prepared.lecture_hash)
+        self.assertEqual(streamed.key_points, prepared.key_points)
+        self.assertEqual(streamed.reference_tokens, prepared.reference_tokens)
+        np.testing.assert_allclose(streamed.key_point_embeddings, prepared.key_point_embeddings)
+
+    def test_cached_artifacts_skip_lecture_work(self):
+        prepared, _ = evaluator_service._prepare_lecture(LECTURE)
+        with mock.patch.object(evaluator_service, "_reference_summary_safe") as reference:
+            events = list(evaluator_service.iter_evaluation_events(STUDENTS[0], LECTURE, artifacts=prepared))
+        reference.assert_not_called()
+        self.assertIs(events[-1][1], prepared)
+        self.assertEqual(len(events), 7)
+
+
+class BatchEvaluateEndpointTests(SQLiteTestCase):
+    session_modules = (ai,)
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        app = FastAPI()
+        app.include_router(ai.router, prefix="/api/ai")
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.addAsyncCleanup(self.client.aclose)
+
+        async def evaluations(students, artifacts):
+            for index in reversed(range(len(students))):
+                yield index, {"scores": {"coherence": {"score": 5.0, "detail": "ok"}}, "overall": 5.0}
+
+        patcher = mock.patch.object(batch_evaluation_service, "iter_batch_evaluations", evaluations)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def evaluate(self, prepare):
+        body = {"lecture_text": LECTURE, "summaries": [{"student_summary": s, "student_id": f"s{i}"} for i, s in enumerate(STUDENTS)]}
+        with mock.patch.object(evaluation_cache_service, "get_lecture_artifacts", prepare):
+            response = await self.client.post("/api/ai/evaluate/batch", json=body)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+    async def test_lecture_is_prepared_inside_the_stream(self):
+        prepare = mock.AsyncMock(return_value=_artifacts())
+        events = await self.evaluate(prepare)
+
+        self.assertEqual([event["type"] for event in events], ["lecture_ready", "result", "result", "result", "done"])
+        self.assertEqual((events[0]["reference_summary"], events[0]["key_points"]), ("reference", ["point 0", "point 1"]))
+        self.assertEqual([event["student_id"] for event in events[1:4]], ["s2", "s1", "s0"])
+        self.assertEqual(events[-1]["evaluated"], 3)
+        prepare.assert_awaited_once()
+        async with self.Session() as db:
+            self.assertEqual(len((await db.execute(select(Evaluation))).scalars().all()), 3)
+
+    async def test_preparation_failure_is_streamed_as_an_error(self):
+        events = await self.evaluate(mock.AsyncMock(side_effect=RuntimeError("llm down")))
+        self.assertEqual(events, [{"type": "error", "message": "llm down", "evaluated": 0}])
+
+
+if __name__ == "__main__":
+    unittest.main()
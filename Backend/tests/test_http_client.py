@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+import httpx
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services import http_client
+
+
+def _run_with_transport(handler, coro_factory):
+    async def _run():
+        http_client.get_http_client()
+        await http_client._client.aclose()
+        http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await coro_factory()
+        finally:
+            await http_client.close_http_client()
+
+    with mock.patch.object(http_client.settings, "GOOGLE_HTTP_BACKOFF_BASE_S", 0.0), \
+            mock.patch.object(http_client.settings, "GOOGLE_HTTP_MAX_RETRIES", 2):
+        return asyncio.run(_run())
+
+
+class RequestWithRetryTests(unittest.TestCase):
+    def test_retries_transient_statuses_then_succeeds(self):
+        statuses = iter([503, 429, 200])
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(next(statuses), json={"ok": True})
+
+        response = _run_with_transport(handler, lambda: http_client.request_with_retry("GET", "https://example.test/a"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 3)
+
+    def test_client_errors_are_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            return httpx.Response(403)
+
+        response = _run_with_transport(handler, lambda: http_client.request_with_retry("GET", "https://example.test/b"))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(calls), 1)
+
+    def test_gives_up_after_max_retries(self):
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            return httpx.Response(500)
+
+        response = _run_with_transport(handler, lambda: http_client.request_with_retry("GET", "https://example.test/c"))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
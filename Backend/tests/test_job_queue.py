@@ -0,0 +1,217 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from Core.config import settings
+from DB import crud
+from DB.schemas import BackgroundJob
+from services import job_queue
+from sqlite_helpers import SQLiteTestCase
+
+
+async def _noop(doc_id, user_id):
+    return None
+
+
+class JobQueueTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(job_queue._handlers, {"a": _noop, "b": _noop, "c": _noop}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_kind_concurrency_parses_limits_and_defaults_to_one(self):
+        with mock.patch.object(settings, "JOB_KIND_CONCURRENCY", "a:3, b:0, unknown:5, c:x"):
+            self.assertEqual(job_queue.kind_concurrency(), {"a": 3, "b": 0, "c": 1})
+
+    def test_retry_delay_backs_off_exponentially(self):
+        with mock.patch.object(settings, "JOB_RETRY_BASE_S", 10.0):
+            self.assertEqual([job_queue.retry_delay(n) for n in (1, 2, 3)], [10.0, 20.0, 40.0])
+
+    def test_enqueue_rejects_unregistered_kind(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(job_queue.enqueue_jobs(None, "missing", [1]))
+
+
+class JobQueueDatabaseTests(SQLiteTestCase):
+    session_modules = (job_queue,)
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.handler_calls = []
+        self.handler = self.record
+        patcher = mock.patch.dict(job_queue._handlers, {"pack": lambda *args: self.handler(*args)}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(job_queue._priorities, {"pack": 0}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def record(self, doc_id, user_id):
+        self.handler_calls.append((doc_id, user_id))
+
+    async def enqueue(self, doc_ids, max_attempts=3):
+        async with self.Session() as db:
+            with mock.patch.object(settings, "JOB_MAX_ATTEMPTS", max_attempts):
+                return await job_queue.enqueue_jobs(db, "pack", doc_ids, user_id=7)
+
+    async def job(self, doc_id) -> BackgroundJob:
+        async with self.Session() as db:
+            jobs = (await db.execute(
+                select(BackgroundJob).where(BackgroundJob.document_id == doc_id).order_by(BackgroundJob.id)
+            )).scalars().all()
+            return jobs[-1]
+
+    async def claim(self, job_id, worker_id, lease_s=60):
+        async with self.Session() as db:
+            return await crud.claim_background_job(db, job_id, worker_id, lease_s)
+
+    async def finish(self, job_id, worker_id, **outcome):
+        async with self.Session() as db:
+            return await crud.finish_background_job(db, job_id, worker_id, **outcome)
+
+    async def test_enqueue_keeps_one_active_job_per_document(self):
+        self.assertEqual(await self.enqueue([1, 1, 2]), [1, 2])
+        self.assertEqual(await self.enqueue([1, 2, 3]), [3])
+
+        job = await self.job(1)
+        await self.claim(job.id, "w1")
+        self.assertTrue(await self.finish(job.id, "w1"))
+        # A finished job releases its dedupe key.
+        self.assertEqual(await self.enqueue([1, 2]), [1])
+
+    async def test_claim_and_finish_are_compare_and_set(self):
+        await self.enqueue([1])
+        job = await self.job(1)
+
+        self.assertIsNotNone(await self.claim(job.id, "w1"))
+        self.assertIsNone(await self.claim(job.id, "w2"))
+        self.assertFalse(await self.finish(job.id, "w2"))
+        self.assertEqual((await self.job(1)).status, "running")
+        self.assertTrue(await self.finish(job.id, "w1"))
+        self.assertEqual((await self.job(1)).status, "done")
+
+    async def test_expired_lease_is_reclaimed_and_the_old_holder_cannot_finish(self):
+        await self.enqueue([1])
+        job = await self.job(1)
+        await self.claim(job.id, "w1", lease_s=-1)
+
+        async with self.Session() as db:
+            self.assertEqual(await crud.get_claimable_background_job_ids(db, ["pack"], 10), [job.id])
+        reclaimed = await self.claim(job.id, "w2")
+        self.assertEqual((reclaimed.leased_by, reclaimed.attempts), ("w2", 2))
+        async with self.Session() as db:
+            self.assertFalse(await crud.extend_background_job_lease(db, job.id, "w1", 60))
+        self.assertFalse(await self.finish(job.id, "w1", error="late failure"))
+        self.assertTrue(await self.finish(job.id, "w2"))
+        self.assertEqual(((await self.job(1)).status, (await self.job(1)).error), ("done", None))
+
+    async def test_expired_lease_on_the_final_attempt_fails_the_job(self):
+        await self.enqueue([1], max_attempts=1)
+        job = await self.job(1)
+        await self.claim(job.id, "w1", lease_s=-1)
+
+        async with self.Session() as db:
+            self.assertEqual(await crud.get_claimable_background_job_ids(db, ["pack"], 10), [])
+        self.assertIsNone(await self.claim(job.id, "w2"))
+        async with self.Session() as db:
+            self.assertEqual(await crud.fail_exhausted_background_jobs(db), 1)
+        failed = await self.job(1)
+        self.assertEqual((failed.status, failed.attempts, failed.leased_by, failed.dedupe_key),
+                         ("failed", 1, None, None))
+        self.assertIsNotNone(failed.finished_at)
+        # The dedupe key is released, so the document can be queued again.
+        self.assertEqual(await self.enqueue([1]), [1])
+
+    async def test_failed_job_is_retried_then_marked_failed(self):
+        async def boom(doc_id, user_id):
+            raise RuntimeError("llm down")
+
+        self.handler = boom
+        await self.enqueue([1], max_attempts=2)
+        job = await self.job(1)
+
+        self.assertEqual(await job_queue.run_job(job.id), "queued")
+        retried = await self.job(1)
+        self.assertEqual((retried.status, retried.attempts, retried.leased_by, retried.error),
+                         ("queued", 1, None, "RuntimeError: llm down"))
+        async with self.Session() as db:
+            # Backing off: not claimable until run_after.
+            self.assertEqual(await crud.get_claimable_background_job_ids(db, ["pack"], 10), [])
+            await db.execute(update(BackgroundJob).values(run_after=datetime.now(timezone.utc) - timedelta(seconds=1)))
+            await db.commit()
+
+        self.assertEqual(await job_queue.run_job(job.id), "failed")
+        failed = await self.job(1)
+        self.assertEqual((failed.status, failed.attempts, failed.dedupe_key), ("failed", 2, None))
+        self.assertIsNotNone(failed.finished_at)
+
+    async def test_successful_job_runs_its_handler_once(self):
+        await self.enqueue([1])
+        job = await self.job(1)
+        self.assertEqual(await job_queue.run_job(job.id), "done")
+        self.assertIsNone(await job_queue.run_job(job.id))
+        self.assertEqual(self.handler_calls, [(1, 7)])
+
+    async def test_losing_the_lease_cancels_the_handler(self):
+        cancelled = asyncio.Event()
+
+        async def hang(doc_id, user_id):
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        self.handler = hang
+        await self.enqueue([1])
+        job = await self.job(1)
+        for renewal in (mock.AsyncMock(return_value=False), mock.AsyncMock(side_effect=OSError("db down"))):
+            with self.subTest(renewal=renewal), mock.patch.object(settings, "JOB_LEASE_S", 1.5), \
+                    mock.patch.object(job_queue.crud, "extend_background_job_lease", renewal):
+                cancelled.clear()
+                async with self.Session() as db:
+                    await db.execute(update(BackgroundJob).values(status="queued"))
+                    await db.commit()
+                self.assertIsNone(await asyncio.wait_for(job_queue.run_job(job.id), 5))
+                self.assertTrue(cancelled.is_set())
+                # The outcome is left to whoever holds the job now.
+                self.assertEqual((await self.job(1)).status, "running")
+
+    async def test_shutdown_hands_the_job_back_without_spending_an_attempt(self):
+        started = asyncio.Event()
+
+        async def hang(doc_id, user_id):
+            started.set()
+            await asyncio.sleep(30)
+
+        self.handler = hang
+        await self.enqueue([1])
+        job = await self.job(1)
+        task = asyncio.create_task(job_queue.run_job(job.id))
+        await started.wait()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        returned = await self.job(1)
+        self.assertEqual((returned.status, returned.attempts, returned.leased_by), ("queued", 0, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client")
+os.environ.setdefault("CLIENT_SECRET", "test-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+try:
+    import fitz
+    from services import pdf_processor
+    from services.pdf_processor import chunk_blocks, load_pdf_blocks, text_to_blocks
+    _IMPORT_ERROR = None
+except Exception as exc:  # pragma: no cover - environment-specific
+    _IMPORT_ERROR = exc
+
+BODY = (
+    "Gradient descent updates each weight in the direction that reduces the loss. "
+    "The learning rate controls the step size and must be tuned carefully. "
+)
+
+
+def _make_slides_pdf() -> bytes:
+    doc = fitz.open()
+    for title in ("Backpropagation", "Regularization"):
+        page = doc.new_page()
+        page.insert_text((72, 72), title, fontsize=24)
+        box = fitz.Rect(72, 110, 520, 700)
+        page.insert_textbox(box, BODY * 3, fontsize=11)
+    return doc.tobytes()
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"pdf stack not available: {_IMPORT_ERROR}")
+class LayoutChunkingTests(unittest.TestCase):
+    def test_pdf_blocks_detect_headings(self):
+        blocks = load_pdf_blocks(_make_slides_pdf(), ocr=False)
+        headings = [b["text"] for b in blocks if b["kind"] == "heading"]
+        self.assertEqual(headings, ["Backpropagation", "Regularization"])
+
+    def test_chunks_follow_slides_with_page_and_section(self):
+        chunks = chunk_blocks(load_pdf_blocks(_make_slides_pdf(), ocr=False))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0].metadata["page"], 0)
+        self.assertEqual(chunks[0].metadata["section"], "Backpropagation")
+        self.assertEqual(chunks[1].metadata["page"], 1)
+        self.assertEqual(chunks[1].metadata["section"], "Regularization")
+
+    def test_oversized_blocks_respect_max_chars(self):
+        blocks = [{"page": 0, "text": BODY * 40, "kind": "body"}]
+        chunks = chunk_blocks(blocks, max_chars=800)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(c.page_content) <= 800 for c in chunks))
+
+    def test_text_fallback_has_sections_without_pages(self):
+        text = f"Introduction\n{BODY * 4}\n\nLoss Functions\n- squared error\n- cross entropy"
+        chunks = chunk_blocks(text_to_blocks(text), min_chars=100)
+        self.assertEqual([c.metadata.get("section") for c in chunks], ["Introduction", "Loss Functions"])
+        self.assertNotIn("page", chunks[0].metadata)
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.items = {}
+
+    def delete(self, where):
+        (key, value), = where.items()
+        self.items = {i: m for i, m in self.items.items() if m.get(key) != value}
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        self.items.update(zip(ids, metadatas))
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"pdf stack not available: {_IMPORT_ERROR}")
+class TextIndexingTests(unittest.TestCase):
+    def setUp(self):
+        self.collection = _FakeCollection()
+        for target, value in (
+            ("_get_collection", lambda course_id: self.collection),
+            ("embed_for_chroma", lambda texts: [[0.0]] * len(texts)),
+        ):
+            patcher = mock.patch.object(pdf_processor, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _sources(self):
+        return {m["source"] for m in self.collection.items.values()}
+
+    def test_untracked_texts_do_not_replace_each_other(self):
+        pdf_processor.index_text_for_course(f"First handout\n{BODY * 3}", course_id=1)
+        pdf_processor.index_text_for_course(f"Second handout\n{BODY * 3}", course_id=1)
+        self.assertEqual(len(self._sources()), 2)
+
+        count = len(self.collection.items)
+        pdf_processor.index_text_for_course(f"First handout\n{BODY * 3}", course_id=1)
+        self.assertEqual(len(self.collection.items), count)
+
+    def test_reindexing_a_document_replaces_only_its_vectors(self):
+        pdf_processor.index_text_for_course(f"Notes\n{BODY * 3}", course_id=1)
+        pdf_processor.index_text_for_course(f"Slides v1\n{BODY * 6}", course_id=1, document_id=7)
+        pdf_processor.index_text_for_course("Slides v2\nShort.", course_id=1, document_id=7)
+        doc_items = [m for m in self.collection.items.values() if m.get("document_id") == 7]
+        self.assertEqual(len(doc_items), 1)
+        self.assertEqual(len(self._sources()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
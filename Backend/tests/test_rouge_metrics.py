@@ -0,0 +1,53 @@
+import os
+import random
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from rouge_score import rouge_scorer
+
+from services.rouge_metrics import ReferenceProfile, tokenize
+
+REFERENCE = (
+    "Gradient descent iteratively updates the model weights in the direction "
+    "that reduces the loss. The learning rate controls how large each update is; "
+    "too large a rate diverges, too small a rate converges slowly."
+)
+STUDENTS = [
+    "Gradient descent updates weights to reduce the loss, and the learning rate sets the step size.",
+    "The learning rate is important. If it is too large, training diverges!",
+    "Neural networks are trained with backpropagation.",
+    "",
+    REFERENCE,
+]
+
+
+class RougeParityTests(unittest.TestCase):
+    def test_batch_scores_match_rouge_score(self):
+        scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=True)
+        profile = ReferenceProfile.from_text(REFERENCE)
+        for student, ours in zip(STUDENTS, profile.score_batch(STUDENTS)):
+            expected = scorer.score(REFERENCE, student)
+            for rouge_type in ("rouge1", "rouge2", "rougeL"):
+                for got, want in zip(ours[rouge_type], expected[rouge_type]):
+                    self.assertAlmostEqual(got, want, places=12, msg=f"{rouge_type} for {student!r}")
+
+    def test_tokens_match_rouge_score_tokenizer(self):
+        scorer = rouge_scorer.RougeScorer(["rouge1"], use_stemmer=True)
+        self.assertEqual(tokenize(REFERENCE), scorer._tokenizer.tokenize(REFERENCE))
+
+    def test_bit_parallel_lcs_matches_dynamic_programming(self):
+        rng = random.Random(7)
+        vocab = ["a", "b", "c", "d", "e"]
+        for _ in range(200):
+            ref = [rng.choice(vocab) for _ in range(rng.randint(0, 30))]
+            pred = [rng.choice(vocab) for _ in range(rng.randint(0, 30))]
+            table = rouge_scorer._lcs_table(ref, pred)
+            self.assertEqual(ReferenceProfile(ref).lcs_length(pred), table[-1][-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services import study_pack_orchestrator
+from services.study_pack_orchestrator import StageSkipped, StudyPackContext, build_stages, plan_study_pack, run_stages
+
+
+def _ctx():
+    return StudyPackContext(document_id=1, course_id=1, title="t", pdf_path=None)
+
+
+def _sleep(seconds, order, name):
+    async def stage(ctx):
+        await asyncio.sleep(seconds)
+        order.append(name)
+    return stage
+
+
+class StudyPackOrchestratorTests(unittest.TestCase):
+    def test_build_stages_wires_summary_after_chunks_and_summarize(self):
+        stages = build_stages(["summary", "quiz"])
+        self.assertEqual(set(stages), {"extract", "chunks", "summarize", "save_summary", "quiz"})
+        self.assertEqual(stages["save_summary"][1], ("chunks", "summarize"))
+        self.assertNotIn("index", stages)
+
+    def test_independent_stages_run_concurrently_after_their_dependency(self):
+        order = []
+        stages = {
+            "extract": (_sleep(0.01, order, "extract"), ()),
+            "a": (_sleep(0.2, order, "a"), ("extract",)),
+            "b": (_sleep(0.2, order, "b"), ("extract",)),
+            "c": (_sleep(0.01, order, "c"), ("a", "b")),
+        }
+        started = time.perf_counter()
+        timings = asyncio.run(run_stages(stages, _ctx()))
+        self.assertLess(time.perf_counter() - started, 0.35)
+        self.assertEqual(order[0], "extract")
+        self.assertEqual(order[-1], "c")
+        self.assertTrue(all(t.status == "done" for t in timings.values()))
+
+    def test_failed_or_skipped_stage_skips_only_its_dependents(self):
+        async def boom(ctx):
+            raise RuntimeError("llm down")
+
+        async def nothing_to_do(ctx):
+            raise StageSkipped("already exists")
+
+        order = []
+        stages = {
+            "extract": (_sleep(0, order, "extract"), ()),
+            "summarize": (boom, ("extract",)),
+            "save_summary": (_sleep(0, order, "save_summary"), ("summarize",)),
+            "quiz": (nothing_to_do, ("extract",)),
+            "index": (_sleep(0, order, "index"), ("extract",)),
+        }
+        timings = asyncio.run(run_stages(stages, _ctx()))
+        self.assertEqual(timings["summarize"].status, "failed")
+        self.assertEqual(timings["save_summary"].status, "skipped")
+        self.assertEqual(timings["quiz"].status, "skipped")
+        self.assertEqual(timings["index"].status, "done")
+        self.assertNotIn("save_summary", order)
+
+    def test_llm_stages_are_skipped_once_llm_calls_are_disallowed(self):
+        async def disallowed():
+            return False
+
+        order = []
+        stages = {
+            "extract": (_sleep(0, order, "extract"), ()),
+            "summarize": (study_pack_orchestrator._summarize, ("extract",)),
+            "quiz": (study_pack_orchestrator._quiz, ("extract",)),
+            "index": (_sleep(0, order, "index"), ("extract",)),
+        }
+        ctx = _ctx()
+        ctx.allow_llm = disallowed
+        with mock.patch.object(study_pack_orchestrator, "summarize_text") as summarize, \
+                mock.patch.object(study_pack_orchestrator, "generate_quiz") as generate:
+            timings = asyncio.run(run_stages(stages, ctx))
+        self.assertEqual((timings["summarize"].status, timings["quiz"].status), ("skipped", "skipped"))
+        self.assertEqual(timings["index"].status, "done")
+        summarize.assert_not_called()
+        generate.assert_not_called()
+
+    def test_index_is_rebuilt_when_the_text_was_not_extracted_from_the_current_file(self):
+        def plan(raw_text, indexed):
+            doc = SimpleNamespace(id=1, course_id=1, doc_type="material", raw_text=raw_text,
+                                  google_drive_url="https://drive.google.com/file/d/f1/view")
+            with mock.patch.object(study_pack_orchestrator, "is_document_indexed", return_value=indexed):
+                return asyncio.run(plan_study_pack(None, doc, {"index"}))
+
+        self.assertEqual(plan("Extracted text", indexed=True), [])
+        self.assertEqual(plan("Extracted text", indexed=False), ["index"])
+        # Sync clears raw_text when the Drive file is replaced.
+        self.assertEqual(plan(None, indexed=True), ["index"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services import text_analysis
+
+
+class TextAnalysisTests(unittest.TestCase):
+    def test_word_tokens_keep_only_alphabetic_words(self):
+        self.assertEqual(
+            text_analysis.word_tokens("Backprop, in 2 steps: forward-pass & Gradients!"),
+            ["backprop", "in", "steps", "forward", "pass", "gradients"],
+        )
+
+    def test_stopwords_are_available_offline(self):
+        self.assertIsInstance(text_analysis.STOPWORDS, frozenset)
+        self.assertIn("the", text_analysis.STOPWORDS)
+        self.assertIn("because", text_analysis.STOPWORDS)
+
+    def test_top_terms_skip_stopwords_and_short_words(self):
+        text = "The gradient of the loss. The gradient step uses the learning rate and the gradient."
+        terms = text_analysis.top_terms(text, n=3)
+        self.assertEqual(terms[0], "gradient")
+        self.assertNotIn("the", terms)
+        self.assertTrue(all(len(t) >= 4 for t in terms))
+
+    def test_sentences_split_on_terminal_punctuation(self):
+        parts = text_analysis.sentences("First idea here. Second idea? Third one!")
+        self.assertEqual(len(parts), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import io
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client")
+os.environ.setdefault("CLIENT_SECRET", "test-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import httpx
+from fastapi import FastAPI, UploadFile
+from sqlalchemy.future import select
+from starlette.datastructures import Headers
+
+from DB import crud
+from DB.schemas import UploadArtifact
+from DB.session import get_db
+from Routers import ai
+from services import upload_cache_service
+from services.upload_cache_service import hash_upload, quiz_cache_key
+from sqlite_helpers import SQLiteTestCase
+
+HANDOUT = b"%PDF-1.4 handout"
+
+
+class HashUploadTests(unittest.TestCase):
+    def test_identical_bytes_share_key(self):
+        self.assertEqual(hash_upload(b"%PDF-1.4 handout"), hash_upload(b"%PDF-1.4 handout"))
+
+    def test_different_bytes_differ(self):
+        self.assertNotEqual(hash_upload(b"%PDF-1.4 a"), hash_upload(b"%PDF-1.4 b"))
+
+    def test_digest_is_sha256_hex(self):
+        self.assertEqual(len(hash_upload(b"")), 64)
+
+
+class QuizCacheKeyTests(unittest.TestCase):
+    def test_objectives_are_normalized(self):
+        self.assertEqual(
+            quiz_cache_key(5, 4, "  General   Knowledge "),
+            quiz_cache_key(5, 4, "general knowledge"),
+        )
+
+    def test_criteria_change_key(self):
+        self.assertNotEqual(quiz_cache_key(5, 4, None), quiz_cache_key(10, 4, None))
+
+
+class UploadEndpointCacheTests(SQLiteTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        app = FastAPI()
+        app.include_router(ai.router, prefix="/api/ai")
+
+        async def test_db():
+            async with self.Session() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = test_db
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.addAsyncCleanup(self.client.aclose)
+
+        self.extract = mock.AsyncMock(return_value=("Handout text about photosynthesis.", [{"page": 1, "section": None, "text": "Handout text"}]))
+        self.summarize = mock.Mock(return_value="A summary.")
+        self.quiz = mock.Mock(return_value=[{"stem": "Q?", "options": ["a", "b"], "answer_index": 0}])
+        for target, name, fake in (
+            (upload_cache_service, "run_in_extraction_pool", self.extract),
+            (ai, "summarize_text", self.summarize),
+            (ai, "gen", self.quiz),
+        ):
+            patcher = mock.patch.object(target, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def upload(self, path, payload=HANDOUT, **form):
+        return await self.client.post(path, files={"file": ("handout.pdf", payload, "application/pdf")}, data=form)
+
+    async def test_repeat_upload_reuses_extraction_and_summary(self):
+        first = await self.upload("/api/ai/summarize-upload")
+        second = await self.upload("/api/ai/summarize-upload")
+
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(first.json()["summary"], second.json()["summary"])
+        self.assertEqual((self.extract.await_count, self.summarize.call_count), (1, 1))
+        async with self.Session() as db:
+            artifact = (await db.execute(select(UploadArtifact))).scalars().one()
+        self.assertEqual((artifact.sha256, artifact.summary), (hash_upload(HANDOUT), "A summary."))
+
+    async def test_quiz_is_cached_per_criteria(self):
+        for n_items in (5, 5, 3):
+            response = await self.upload("/api/ai/generate-quiz-upload", n_items=str(n_items), objectives="Cells")
+            self.assertEqual(response.status_code, 200)
+        await self.upload("/api/ai/generate-quiz-upload", n_items="5", objectives="  cells ")
+
+        self.assertEqual(self.extract.await_count, 1)
+        self.assertEqual([call.kwargs["n_items"] for call in self.quiz.call_args_list], [5, 3])
+
+    async def test_student_submissions_are_not_stored(self):
+        file = UploadFile(io.BytesIO(b"%PDF-1.4 essay"), filename="essay.pdf", headers=Headers({"content-type": "application/pdf"}))
+        with mock.patch.object(ai, "run_in_extraction_pool", mock.AsyncMock(return_value="My essay.")) as extract:
+            self.assertEqual(await ai._extract_text_from_uploaded_pdf(file), "My essay.")
+        extract.assert_awaited_once()
+        self.extract.assert_not_awaited()
+        async with self.Session() as db:
+            self.assertEqual((await db.execute(select(UploadArtifact))).scalars().all(), [])
+
+
+class TouchUploadArtifactTests(SQLiteTestCase):
+    async def touched(self, age: timedelta) -> bool:
+        last_used = datetime.now(timezone.utc) - age
+        async with self.Session() as db:
+            artifact = UploadArtifact(sha256=hash_upload(HANDOUT), size_bytes=1, raw_text="t", last_used_at=last_used)
+            db.add(artifact)
+            await db.commit()
+            with mock.patch.object(crud.settings, "UPLOAD_CACHE_RETENTION_HOURS", 100):
+                await crud.touch_upload_artifact(db, artifact)
+            await db.delete(artifact)
+            await db.commit()
+        return artifact.last_used_at.replace(tzinfo=timezone.utc) != last_used
+
+    async def test_recent_use_is_not_rewritten_on_every_hit(self):
+        self.assertFalse(await self.touched(timedelta(hours=1)))
+        self.assertTrue(await self.touched(timedelta(hours=20)))
+
+
+if __name__ == "__main__":
+    unittest.main()
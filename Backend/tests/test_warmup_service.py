@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("TENANT_ID", "test-tenant-id")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-google-client-id")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import httpx
+
+from services import warmup_service
+
+
+def _boom():
+    raise RuntimeError("model missing")
+
+
+class WarmupServiceTests(unittest.TestCase):
+    def setUp(self):
+        warmup_service._status.clear()
+
+    def test_ready_after_warmup_even_if_a_component_fails(self):
+        warmups = {"ok": lambda: None, "broken": _boom}
+        with mock.patch.dict(warmup_service.WARMUPS, warmups, clear=True), \
+                mock.patch.object(warmup_service.settings, "WARMUP_MODELS", "ok,broken,unknown"), \
+                mock.patch.object(warmup_service.settings, "WARMUP_BLOCKING", True):
+            asyncio.run(warmup_service.start_warmup())
+
+        state = warmup_service.readiness()
+        self.assertTrue(state["ready"])
+        self.assertEqual(state["components"]["ok"]["status"], "ready")
+        self.assertEqual(state["components"]["broken"]["status"], "failed")
+        self.assertNotIn("unknown", state["components"])
+
+    def test_not_ready_while_pending(self):
+        warmup_service._status["embedder"] = {"status": "pending"}
+        self.assertFalse(warmup_service.readiness()["ready"])
+
+
+class ReadinessEndpointTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        warmup_service._status.clear()
+        self.addCleanup(warmup_service._status.clear)
+
+    async def test_ready_endpoint_is_503_until_warmup_finishes(self):
+        import main
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            warmup_service._status.update(embedder={"status": "ready"}, essay_grader={"status": "loading"})
+            pending = await client.get("/health/ready")
+            warmup_service._status["essay_grader"] = {"status": "failed", "error": "model missing"}
+            ready = await client.get("/health/ready")
+
+        self.assertEqual(pending.status_code, 503)
+        self.assertFalse(pending.json()["ready"])
+        self.assertEqual(ready.status_code, 200)
+        self.assertEqual(ready.json()["components"]["essay_grader"]["status"], "failed")
+
+
+class PreloadTests(unittest.TestCase):
+    def preload(self, backend: str) -> mock.Mock:
+        grader_module = types.ModuleType("services.essay_grader_service")
+        grader_module.get_essay_grader = mock.Mock()
+        with mock.patch.dict(sys.modules, {"services.essay_grader_service": grader_module}), \
+                mock.patch.object(warmup_service.settings, "PRELOAD_MODELS", "essay_grader,embedder"), \
+                mock.patch.object(warmup_service.settings, "ESSAY_GRADER_BACKEND", backend):
+            warmup_service.preload_shared_models()
+        return grader_module.get_essay_grader
+
+    def test_torch_grader_is_preloaded_before_fork(self):
+        self.preload("torch").assert_called_once_with()
+
+    def test_onnx_grader_is_not_preloaded_because_it_is_not_fork_safe(self):
+        self.preload("onnx-int8").assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()